@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+异步浏览器引擎
+基于 playwright.async_api，在一个事件循环里用一个浏览器同时打开多个翻译页面，
+并发抓取或提交多个游戏的翻译；所有页面共享一个令牌桶限速，每个游戏的任务单独计时，超时即取消。
+
+同一个模块的翻译页面只能通过"下一页"链接翻页，所以单个游戏内部仍按顺序翻页，并发发生在游戏之间
+"""
+
+import asyncio
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from .bga_login import BGALogin
+from .bga_translator import HARVEST_SCRIPT
+from .submitter.journal import SubmissionJournal, STATUS_CONFIRMED, STATUS_SUBMITTED
+from .submitter.translation_submitter import BATCH_FILL_SCRIPT, ORIGINALS_SCRIPT, load_submit_table
+from .translator.placeholders import validate_for_submit
+from .translator.store import TranslationStore
+from .translator.translation_files import derive_untranslated, merge_pages, save_translation_snapshot
+from .utils.async_browser import AsyncBrowserPool, AsyncPageWaiter, run_tasks
+from .utils.log_policy import LogSampler
+from .utils.metrics import metrics
+from .utils.page_waiter import SaveTracker
+from .utils.rate_limiter import AsyncTokenBucket
+from .utils.session_store import PAGE_REQUEST_TOKEN_SCRIPT, SessionStore
+
+logger = logging.getLogger(__name__)
+
+BGA_URL = "https://boardgamearena.com"
+TRANSLATION_URL = BGA_URL + "/translation?module_id={module_id}&source_locale=en_US&dest_locale=zh_CN&findtype={view}"
+
+def load_module_id(game_name: str):
+    """
+    读取游戏的 module_id
+
+    Args:
+        game_name: 游戏名称
+
+    Returns:
+        module_id
+    """
+    game_info_path = Path(f"data/games/{game_name}/metadata/game_info.json")
+    if not game_info_path.exists():
+        raise FileNotFoundError(f"找不到游戏信息文件 {game_info_path}")
+    with open(game_info_path, 'r', encoding='utf-8') as f:
+        module_id = json.load(f).get('id')
+    if not module_id:
+        raise ValueError("游戏信息中没有找到 module_id")
+    return module_id
+
+def _save_snapshot(game_name: str, all_translations: Dict[str, Dict], untranslated: Dict[str, Dict],
+                   incremental: bool):
+    """写出翻译文件和数据库快照，在工作线程中执行以免阻塞事件循环"""
+    translations_dir = Path(f"data/games/{game_name}/translations")
+    translations_dir.mkdir(parents=True, exist_ok=True)
+    store = TranslationStore.from_env()
+    try:
+        save_translation_snapshot(translations_dir, all_translations, untranslated, force=not incremental,
+                                  store=store, game=game_name)
+    finally:
+        if store is not None:
+            store.close()
+
+class AsyncTranslationEngine:
+    """异步翻译引擎"""
+
+    def __init__(self, client: BGALogin, pages: int = 4, rps: float = 2.0, wait_timeout_ms: int = 15000,
+                 headless: Optional[bool] = None, max_pages: int = 1000, save_timeout_ms: int = 5000):
+        """
+        初始化引擎
+
+        Args:
+            client: BGA 登录客户端，用于复用和保存缓存的会话
+            pages: 同时打开的翻译页面数
+            rps: 所有页面共享的每秒操作上限（页面跳转、翻页和每条译文的填写各计一次）
+            wait_timeout_ms: 等待页面就绪的上限（毫秒）
+            headless: 是否无头启动浏览器，默认读取 BGA_HEADLESS 环境变量（未设置时为无头）
+            max_pages: 每个游戏最多翻阅的页数
+            save_timeout_ms: 每批译文等待保存响应的上限（毫秒）
+        """
+        self.client = client
+        self.pool = AsyncBrowserPool(pages=pages, headless=headless)
+        self.rps = rps
+        self.rate_limiter: Optional[AsyncTokenBucket] = None
+        self.wait_timeout_ms = wait_timeout_ms
+        self.max_pages = max_pages
+        self.save_timeout_ms = save_timeout_ms
+
+    @classmethod
+    def from_env(cls, **kwargs) -> "AsyncTranslationEngine":
+        """使用 .env 中的账号信息创建引擎"""
+        return cls(BGALogin.from_env(), **kwargs)
+
+    async def start(self) -> bool:
+        """启动浏览器并登录，返回是否登录成功"""
+        # 令牌桶中的锁需要在事件循环内创建
+        self.rate_limiter = AsyncTokenBucket(self.rps)
+        await self.pool.start()
+        return await self.login()
+
+    async def login(self) -> bool:
+        """优先复用缓存的会话，否则在页面上用账号密码登录"""
+        started = time.perf_counter()
+        try:
+            return await self._login()
+        finally:
+            metrics.observe("login", time.perf_counter() - started, engine="async")
+
+    async def _login(self) -> bool:
+        store = self.client.session_store
+        if store and await asyncio.to_thread(self.client.restore_session):
+            data = {"cookies": SessionStore.cookies_from_jar(self.client.session.cookies)}
+            await self.pool.context.add_cookies(store.to_storage_state(data)["cookies"])
+            logger.info("已复用缓存的登录会话")
+            return True
+
+        try:
+            async with self.pool.page() as page:
+                await page.goto(f"{BGA_URL}/account")
+                form = page.locator("form").filter(has_text="下一个")
+                await form.get_by_placeholder("电子邮件或用户名").fill(self.client.username)
+                await page.get_by_role("link", name="下一个").click()
+                await page.get_by_role("textbox", name="密码").fill(self.client.password)
+                await page.locator("#account-module").get_by_role("link", name="登录", exact=True).click()
+                await page.wait_for_load_state("networkidle")
+                logger.info("登录成功")
+                if store:
+                    request_token = await page.evaluate(PAGE_REQUEST_TOKEN_SCRIPT)
+                    store.save_storage_state(await self.pool.context.storage_state(), request_token)
+            return True
+        except Exception as e:
+            logger.error(f"登录失败: {e}")
+            return False
+
+    async def _goto(self, waiter: AsyncPageWaiter, module_id, view: str) -> bool:
+        """跳转到某个视图的翻译页面并等待条目加载"""
+        await self.rate_limiter.acquire()
+        started = time.perf_counter()
+        await waiter.page.goto(TRANSLATION_URL.format(module_id=module_id, view=view))
+        ready = await waiter.wait_for_textareas(f"{view} 翻译页面加载")
+        metrics.observe("navigate", time.perf_counter() - started, view=view)
+        return ready
+
+    async def _next_page(self, waiter: AsyncPageWaiter) -> Optional[bool]:
+        """
+        点击下一页
+
+        Returns:
+            Optional[bool]: 没有下一页时返回 None，否则返回翻页是否在上限内完成
+        """
+        next_page = waiter.page.locator("a.pagination_next")
+        if await next_page.count() == 0 or await next_page.is_disabled():
+            return None
+        await self.rate_limiter.acquire()
+        marker = await waiter.pagination_marker()
+        await next_page.click()
+        return await waiter.wait_for_pagination_change(marker)
+
+    async def _harvest_page(self, page) -> Dict[str, Dict]:
+        """通过一次 evaluate 提取当前页面的全部翻译条目"""
+        started = time.perf_counter()
+        rows = await page.evaluate(HARVEST_SCRIPT)
+        metrics.count("strings_harvested", len(rows), engine="async")
+        entries = {original_id: {"original": original, "context": context, "translation": translation}
+                   for original_id, original, context, translation in rows}
+        metrics.observe("harvest_page", time.perf_counter() - started)
+        return entries
+
+    async def fetch_game(self, game_name: str, incremental: bool = False) -> Dict:
+        """
+        抓取一个游戏的全部翻译并写出翻译文件
+
+        Args:
+            game_name: 游戏名称
+            incremental: 是否增量保存，内容与上次相比无变化时不重写翻译文件
+
+        Returns:
+            Dict: 翻译内容，all 为全部条目，untranslated 为未翻译条目
+        """
+        module_id = load_module_id(game_name)
+        async with self.pool.page() as page:
+            waiter = AsyncPageWaiter(page, timeout_ms=self.wait_timeout_ms)
+            await self._goto(waiter, module_id, "all")
+            pages = [await self._harvest_page(page)]
+            while len(pages) < self.max_pages:
+                moved = await self._next_page(waiter)
+                if moved is None:
+                    break
+                if not moved:
+                    logger.warning(f"{game_name} 第 {len(pages) + 1} 页加载超时，停止翻页")
+                    break
+                pages.append(await self._harvest_page(page))
+
+        all_translations = merge_pages(pages)
+        untranslated = derive_untranslated(all_translations)
+        logger.info(f"{game_name}: 共翻阅 {len(pages)} 页，{len(all_translations)} 条翻译内容，"
+                    f"其中 {len(untranslated)} 条未翻译")
+        started = time.perf_counter()
+        await asyncio.to_thread(_save_snapshot, game_name, all_translations, untranslated, incremental)
+        metrics.observe("export", time.perf_counter() - started, game=game_name)
+        return {"all": all_translations, "untranslated": untranslated}
+
+    async def _fill_page(self, page, waiter: AsyncPageWaiter, tracker: SaveTracker, translations: Dict[str, str],
+                         journal: SubmissionJournal, page_number: int, batch_size: int,
+                         missing_log: LogSampler) -> int:
+        """批量填写当前页的译文，每条译文先取一个令牌，返回确认保存的条数"""
+        started = time.perf_counter()
+        mapping = {}
+        for original_id, original_text in await page.evaluate(ORIGINALS_SCRIPT):
+            if original_text not in translations:
+                missing_log.warning("未找到原文的翻译: %s", original_text)
+            elif not journal.is_confirmed(original_id.split("_")[1], translations[original_text]):
+                mapping[original_id.replace("toTranslate_", "translated_")] = translations[original_text]
+
+        confirmed_total = 0
+        items = list(mapping.items())
+        for start in range(0, len(items), batch_size):
+            chunk = dict(items[start:start + batch_size])
+            for _ in chunk:
+                await self.rate_limiter.acquire()
+            failed_before, seen_before = tracker.failed, tracker.seen
+            filled_ids = await page.evaluate(BATCH_FILL_SCRIPT, chunk)
+            # 整批都收到成功响应才记为已确认，否则记为已提交，下次运行会重新填写
+            confirmed = await waiter.wait_for_saves(tracker, seen_before + len(filled_ids), self.save_timeout_ms) \
+                and tracker.failed == failed_before
+            status = STATUS_CONFIRMED if confirmed else STATUS_SUBMITTED
+            for translated_id in filled_ids:
+                journal.record(translated_id.split("_")[1], status, page_number, chunk[translated_id])
+            metrics.count("strings_submitted", len(filled_ids), engine="async", status=status)
+            confirmed_total += len(filled_ids) if confirmed else 0
+        metrics.observe("fill", time.perf_counter() - started)
+        return confirmed_total
+
+    async def submit_game(self, game_name: str, restart: bool = False, table_path: Optional[str] = None,
+                          tm_threshold: Optional[float] = None, check_placeholders: bool = True,
+                          batch_size: int = 20) -> bool:
+        """
+        提交一个游戏的译文
+
+        Args:
+            game_name: 游戏名称
+            restart: 是否忽略提交日志从头提交
+            table_path: 填写好译文的翻译表，默认为 untranslated.md
+            tm_threshold: 翻译表中没有译文的条目，使用相似度不低于该值的翻译记忆译文，默认不使用
+            check_placeholders: 提交前检查占位符和标签，不一致时不提交
+            batch_size: 每批同时写入的条数
+
+        Returns:
+            bool: 是否处理完所有页面
+        """
+        module_id = load_module_id(game_name)
+        game_dir = Path(f"data/games/{game_name}")
+        translations = load_submit_table(game_dir, Path(table_path) if table_path else
+                                         game_dir / "translations/untranslated.md", tm_threshold)
+        if not translations:
+            logger.error(f"{game_name}: 没有可用的翻译内容")
+            return False
+        if check_placeholders and not validate_for_submit(
+                game_name, ((game_name, original, original, translation)
+                            for original, translation in translations.items())):
+            return False
+
+        journal = SubmissionJournal(game_name, restart=restart)
+        missing_log = LogSampler(logger, per_second=5)
+        confirmed = 0
+        try:
+            async with self.pool.page() as page:
+                waiter = AsyncPageWaiter(page, timeout_ms=self.wait_timeout_ms)
+                tracker = SaveTracker(page)
+                try:
+                    await self._goto(waiter, module_id, "untranslated")
+                    page_number = 1
+                    while page_number <= self.max_pages:
+                        confirmed += await self._fill_page(page, waiter, tracker, translations, journal,
+                                                           page_number, max(1, batch_size), missing_log)
+                        moved = await self._next_page(waiter)
+                        if moved is None:
+                            break
+                        if not moved:
+                            logger.warning(f"{game_name} 第 {page_number + 1} 页加载超时，停止提交")
+                            return False
+                        page_number += 1
+                finally:
+                    tracker.detach()
+        finally:
+            journal.close()
+            missing_log.flush(f"{game_name}: 另有 %d 条未找到译文的原文未逐条输出")
+        logger.info(f"{game_name}: 确认保存 {confirmed} 条")
+        return True
+
+    async def close(self):
+        """关闭浏览器"""
+        await self.pool.close()
+
+def run_games(action: str, games: List[str], pages: int = 4, rps: float = 2.0, task_timeout: Optional[float] = None,
+              wait_timeout_ms: int = 15000, headless: Optional[bool] = None, max_pages: int = 1000,
+              **options) -> List:
+    """
+    启动事件循环，用一个浏览器并发抓取或提交多个游戏
+
+    Args:
+        action: fetch 或 submit
+        games: 游戏名列表
+        pages: 同时打开的翻译页面数，即同时处理的游戏数
+        rps: 所有页面共享的每秒操作上限
+        task_timeout: 每个游戏的超时（秒），超时后取消该游戏的任务，None 表示不限
+        wait_timeout_ms: 等待页面就绪的上限（毫秒）
+        headless: 是否无头启动浏览器
+        max_pages: 每个游戏最多翻阅的页数
+        **options: 传给 fetch_game 或 submit_game 的参数
+
+    Returns:
+        List: 按游戏顺序排列的 (游戏, 结果, 异常)
+    """
+    async def main():
+        engine = AsyncTranslationEngine.from_env(pages=pages, rps=rps, wait_timeout_ms=wait_timeout_ms,
+                                                 headless=headless, max_pages=max_pages)
+        try:
+            if not await engine.start():
+                error = Exception("登录失败")
+                return [(game, None, error) for game in games]
+            handler = engine.fetch_game if action == "fetch" else engine.submit_game
+            return await run_tasks(games, lambda game: handler(game, **options), concurrency=pages,
+                                   timeout=task_timeout)
+        finally:
+            await engine.close()
+
+    return asyncio.run(main())
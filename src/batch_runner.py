@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+批量任务模块
+对多个游戏执行同一个步骤，共享一个已登录的会话和全局限速，并输出包含每个游戏耗时和失败原因的汇总报告
+"""
+
+import fnmatch
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from .utils.rate_limiter import TokenBucket, throttle_session
+
+logger = logging.getLogger(__name__)
+
+BATCH_STEPS = ("fetch-game-info", "fetch-translation", "submit", "process-rulebook")
+# 需要登录 BGA 的步骤
+NETWORK_STEPS = ("fetch-game-info", "fetch-translation", "submit")
+# 使用浏览器引擎时会为每个游戏启动浏览器的步骤
+BROWSER_STEPS = ("fetch-translation", "submit")
+
+def resolve_games(patterns: Iterable[str], games_dir: str = "data/games") -> List[str]:
+    """
+    把游戏名和通配符展开为游戏列表
+
+    Args:
+        patterns: 游戏名或通配符（如 "a*"），通配符按 games_dir 下已有的游戏目录匹配
+        games_dir: 游戏数据目录
+
+    Returns:
+        List[str]: 去重后保持原顺序的游戏名列表
+    """
+    existing = sorted(p.name for p in Path(games_dir).iterdir() if p.is_dir()) if Path(games_dir).exists() else []
+    games = []
+    for pattern in patterns:
+        pattern = pattern.strip()
+        if not pattern or pattern.startswith("#"):
+            continue
+        if any(ch in pattern for ch in "*?["):
+            matched = fnmatch.filter(existing, pattern)
+            if not matched:
+                logger.warning(f"通配符 {pattern} 没有匹配到任何游戏")
+            games.extend(matched)
+        else:
+            games.append(pattern)
+    return list(dict.fromkeys(games))
+
+class BatchRunner:
+    """多游戏批量执行器"""
+
+    def __init__(self, step: str, games: List[str], workers: int = 4, rps: float = 2.0, engine: str = "http",
+                 submit_workers: int = 2, restart: bool = False, report_path: Optional[str] = None,
+                 incremental: bool = False, page_workers: int = 2):
+        """
+        初始化批量执行器
+
+        Args:
+            step: 执行的步骤，见 BATCH_STEPS
+            games: 游戏名列表
+            workers: 同时处理的游戏数；浏览器引擎的 fetch-translation 和 submit 固定逐个处理
+            rps: 所有游戏共享的每秒请求上限，浏览器引擎的页面操作不受其限制
+            engine: fetch-translation 和 submit 使用的引擎，http 或 browser
+            submit_workers: HTTP 提交时每个游戏内部的并发数
+            restart: submit 时是否忽略提交日志从头提交
+            report_path: 汇总报告路径，默认写入 data/batch/ 目录
+            incremental: fetch-translation 时是否增量抓取
+            page_workers: fetch-translation 时每个游戏内部并发请求分页的线程数
+        """
+        if step not in BATCH_STEPS:
+            raise ValueError(f"不支持的步骤: {step}")
+        if engine == "browser" and step in BROWSER_STEPS:
+            # 每个游戏线程都会启动自己的浏览器，并发时同时运行多个 Chromium；需要并发请使用 --async 引擎
+            if workers > 1:
+                logger.warning("浏览器引擎的批量任务逐个处理游戏，忽略 --workers；需要并发请使用 --async")
+            workers = 1
+            logger.info("浏览器引擎的页面操作按各自的节流设置进行，不受 --rps 限制")
+        self.step = step
+        self.games = games
+        self.workers = max(1, workers)
+        self.rps = rps
+        self.rate_limiter = TokenBucket(rps)
+        self.engine = engine
+        self.submit_workers = max(1, submit_workers)
+        self.restart = restart
+        self.incremental = incremental
+        self.page_workers = max(1, page_workers)
+        self.report_path = Path(report_path) if report_path else \
+            Path("data/batch") / f"{step}_{time.strftime('%Y%m%d-%H%M%S')}.json"
+        self.client = None
+        self.ocr_manager = None
+
+    def _prepare(self):
+        """登录一次并为共享会话加上全局限速；OCR 步骤则创建共享的 OCR 管理器"""
+        if self.step in NETWORK_STEPS:
+            from .bga_login import BGALogin
+            self.client = BGALogin.from_env()
+            # 连接池要能容纳所有游戏线程及其内部的提交/分页线程同时使用会话
+            per_game = max(self.submit_workers, self.page_workers)
+            throttle_session(self.client.session, self.rate_limiter, pool_size=self.workers * per_game + 2)
+            if not self.client.login():
+                raise Exception("BGALogin登录失败")
+        elif self.step == "process-rulebook":
+            from .ocr import OCRManager
+            self.ocr_manager = OCRManager()
+
+    def _run_step(self, game: str):
+        """对单个游戏执行步骤，失败时抛出异常"""
+        from .main import GameManager
+        manager = GameManager(game)
+
+        if self.step == "fetch-game-info":
+            manager.fetch_game_info(client=self.client)
+        elif self.step == "fetch-translation":
+            manager.fetch_translations(engine=self.engine, client=self.client, incremental=self.incremental,
+                                       page_workers=self.page_workers)
+        elif self.step == "process-rulebook":
+            manager.process_rulebook(ocr_manager=self.ocr_manager)
+        elif self.engine == "http":
+            from .submitter.http_submitter import HTTPTranslationSubmitter
+            # 共用批量任务的令牌桶，某个游戏触发服务端限速时所有游戏一起退避
+            submitter = HTTPTranslationSubmitter(game, self.client, workers=self.submit_workers,
+                                                 restart=self.restart, rate_limiter=self.rate_limiter)
+            if not submitter.submit_translations():
+                raise Exception("翻译提交失败")
+        else:
+            from .submitter.translation_submitter import TranslationSubmitter
+            submitter = TranslationSubmitter(game, restart=self.restart, client=self.client)
+            try:
+                if not submitter.submit_translations():
+                    raise Exception("翻译提交失败")
+            finally:
+                submitter.close()
+
+    def _run_one(self, game: str) -> Dict:
+        """执行单个游戏并记录耗时和结果"""
+        started = time.monotonic()
+        try:
+            self._run_step(game)
+            result = {"game": game, "status": "ok"}
+        except Exception as e:
+            result = {"game": game, "status": "failed", "error": str(e)}
+        result["seconds"] = round(time.monotonic() - started, 3)
+        return result
+
+    def run(self) -> Dict:
+        """
+        执行批量任务并写出汇总报告
+
+        Returns:
+            Dict: 汇总报告
+        """
+        started = time.monotonic()
+        started_at = time.strftime('%Y-%m-%d %H:%M:%S')
+        logger.info(f"批量执行 {self.step}：共 {len(self.games)} 个游戏，并发 {self.workers}，全局限速 {self.rps} 次/秒")
+
+        results: List[Dict] = []
+        try:
+            self._prepare()
+        except Exception as e:
+            logger.error(f"批量任务初始化失败: {e}")
+            results = [{"game": game, "status": "failed", "error": f"初始化失败: {e}", "seconds": 0.0}
+                       for game in self.games]
+        else:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="batch") as executor:
+                futures = {executor.submit(self._run_one, game): game for game in self.games}
+                for future in as_completed(futures):
+                    result = future.result()
+                    results.append(result)
+                    done = len(results)
+                    if result["status"] == "ok":
+                        logger.info(f"[{done}/{len(self.games)}] {result['game']} 完成，耗时 {result['seconds']:.1f} 秒")
+                    else:
+                        logger.error(f"[{done}/{len(self.games)}] {result['game']} 失败: {result['error']}")
+
+        order = {game: index for index, game in enumerate(self.games)}
+        results.sort(key=lambda item: order[item["game"]])
+        failed = [item for item in results if item["status"] != "ok"]
+        report = {
+            "step": self.step,
+            "engine": self.engine,
+            "started_at": started_at,
+            "total_seconds": round(time.monotonic() - started, 3),
+            "workers": self.workers,
+            "rps": self.rps,
+            "games": len(self.games),
+            "succeeded": len(results) - len(failed),
+            "failed": len(failed),
+            "results": results
+        }
+
+        self.report_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+        logger.info(f"批量任务完成：成功 {report['succeeded']} 个，失败 {report['failed']} 个，"
+                    f"总耗时 {report['total_seconds']:.1f} 秒")
+        for item in failed:
+            logger.info(f"- {item['game']}: {item['error']}")
+        logger.info(f"汇总报告已保存至: {self.report_path}")
+        return report
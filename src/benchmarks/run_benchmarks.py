@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+离线基准测试脚本
+在本地模拟服务器上按不同的字符串数、页数、延迟和限速运行登录、HTTP 抓取和 HTTP 提交，
+记录端到端耗时、各接口请求次数和峰值内存，结果保存为 JSON，可与之前的结果对比找出性能回退
+
+每个用例在单独的子进程中运行，峰值内存（ru_maxrss）只统计该用例；模拟服务器运行在主进程中，不计入内存
+
+只覆盖 HTTP 引擎：模拟服务器只提供登录、字符串和保存接口，没有浏览器引擎操作的翻译页面，
+因此不包含 Playwright 用例，也不统计浏览器 IPC 往返次数；浏览器引擎的各阶段耗时可用 --trace 在真实运行中记录
+
+用法:
+    python -m src.benchmarks.run_benchmarks --quick
+    python -m src.benchmarks.run_benchmarks --sizes 100,5000,20000 --pages 1,50,200 --latency 0.02
+    python -m src.benchmarks.run_benchmarks --compare data/benchmarks/baseline.json
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import queue
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.utils.fake_bga_server import FakeBGAServer, load_recorded_strings, make_strings, page_size_for
+
+logger = logging.getLogger(__name__)
+
+ENGINES = ("login", "fetch-http", "submit-http")
+DEFAULT_SIZES = (100, 1000, 5000, 20000)
+DEFAULT_PAGES = (1, 20, 200)
+QUICK_SIZES = (100, 1000)
+QUICK_PAGES = (1, 20)
+RESULTS_DIR = "data/benchmarks"
+GAME = "bench"
+# 单个用例的默认超时（秒）
+DEFAULT_CASE_TIMEOUT = 1800
+
+def _peak_rss_kb() -> int:
+    """当前进程的峰值常驻内存（KB），macOS 上 ru_maxrss 的单位是字节"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+def _prepare_game(workdir: Path, engine: str, strings: List[Dict]):
+    """在工作目录中准备用例需要的游戏文件，不计入耗时"""
+    game_dir = workdir / "data/games" / GAME
+    (game_dir / "metadata").mkdir(parents=True, exist_ok=True)
+    (game_dir / "translations").mkdir(parents=True, exist_ok=True)
+    with open(game_dir / "metadata/game_info.json", "w", encoding="utf-8") as f:
+        json.dump({"id": 1}, f)
+    if engine != "submit-http":
+        return
+    from src.translator.exporters import escape_cell
+    untranslated = {f"toTranslate_{item['id']}": {"original": item["original"], "context": item["context"],
+                                                  "translation": ""} for item in strings}
+    with open(game_dir / "translations/untranslated.json", "w", encoding="utf-8") as f:
+        json.dump(untranslated, f, ensure_ascii=False)
+    with open(game_dir / "translations/untranslated.md", "w", encoding="utf-8") as f:
+        f.write("| 原文 | 原文出处 | 译文 |\n|------|----------|------|\n")
+        for item in strings:
+            # 译文保留原文的占位符，避免被提交前的占位符检查拦下
+            translation = escape_cell(f"译 {item['original']}")
+            f.write(f"| {escape_cell(item['original'])} | {escape_cell(item['context'])} | {translation} |\n")
+
+def _run_case(engine: str, url: str, workdir: str, options: Dict, results):
+    """子进程入口：运行一个用例并通过队列返回指标"""
+    os.chdir(workdir)
+    os.environ["TRANSLATION_STORE_PATH"] = str(Path(workdir) / "data/translations.db")
+    logging.basicConfig(level=logging.WARNING)
+    from src.bga_login import BGALogin
+
+    baseline_rss = _peak_rss_kb()
+    client = BGALogin(username="bench", password="bench", base_url=url)
+    ok = False
+    # 登录带有模拟人工操作的随机等待，抓取和提交用例先登录再计时，登录耗时由 login 用例单独记录
+    if engine != "login" and not client.login():
+        results.put({"ok": False, "seconds": 0.0, "peak_rss_kb": _peak_rss_kb(), "baseline_rss_kb": baseline_rss})
+        return
+    started = time.perf_counter()
+    try:
+        if engine == "login":
+            ok = client.login()
+        elif engine == "fetch-http":
+            from src.crawler.http_fetcher import HTTPTranslationFetcher
+            fetcher = HTTPTranslationFetcher(client, min_interval=0, page_workers=options["page_workers"])
+            ok = fetcher.get_translations(GAME) is not None
+        elif engine == "submit-http":
+            from src.submitter.http_submitter import HTTPTranslationSubmitter
+            submitter = HTTPTranslationSubmitter(GAME, client, workers=options["submit_workers"],
+                                                 rps=options["submit_rps"], backoff=0.1, restart=True)
+            ok = submitter.submit_translations()
+    except Exception as e:
+        logger.error(f"{engine} 运行失败: {e}")
+    seconds = time.perf_counter() - started
+    results.put({"ok": bool(ok), "seconds": seconds, "peak_rss_kb": _peak_rss_kb(),
+                 "baseline_rss_kb": baseline_rss})
+
+def _wait_result(process, results, timeout: float) -> Dict:
+    """
+    等待子进程返回指标；子进程提前退出或超时时记为失败，而不是一直等待
+
+    Args:
+        process: 运行用例的子进程
+        results: 子进程返回指标的队列
+        timeout: 最长等待秒数
+
+    Returns:
+        Dict: 子进程返回的指标，失败时包含 error
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return results.get(timeout=min(1.0, max(0.0, deadline - time.monotonic())))
+        except queue.Empty:
+            pass
+        if not process.is_alive():
+            # 子进程可能在退出前刚写入结果
+            try:
+                return results.get(timeout=0.5)
+            except queue.Empty:
+                error = f"子进程异常退出（exitcode={process.exitcode}）"
+                break
+        if time.monotonic() >= deadline:
+            process.terminate()
+            error = f"超过 {timeout:g} 秒未完成"
+            break
+    logger.error(f"用例运行失败: {error}")
+    return {"ok": False, "seconds": 0.0, "peak_rss_kb": 0, "baseline_rss_kb": 0, "error": error}
+
+def run_case(engine: str, strings: List[Dict], pages: int, options: Dict) -> Dict:
+    """
+    启动模拟服务器，在子进程中运行一次用例
+
+    Args:
+        engine: login、fetch-http 或 submit-http
+        strings: 模拟服务器上的字符串
+        pages: 字符串接口的总页数
+        options: 延迟、限速和并发参数，可用 case_timeout 指定单个用例的超时（秒）
+
+    Returns:
+        Dict: 耗时、请求次数、限速次数和峰值内存
+    """
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as workdir:
+        _prepare_game(Path(workdir), engine, strings)
+        # 提交会修改服务器上的译文，每次运行都使用新的服务器和字符串副本
+        server = FakeBGAServer([dict(item) for item in strings], page_size=page_size_for(len(strings), pages),
+                               latency=options["latency"], strings_rate_limit=options["strings_rate_limit"],
+                               save_rate_limit=options["save_rate_limit"])
+        with server:
+            results = context.Queue()
+            process = context.Process(target=_run_case, args=(engine, server.url, workdir, options, results))
+            process.start()
+            result = _wait_result(process, results, options.get("case_timeout", DEFAULT_CASE_TIMEOUT))
+            process.join()
+        result["requests"] = dict(Counter(path for _, path in server.requests))
+        result["request_count"] = len(server.requests)
+        result["rate_limited"] = server.rate_limited
+    return result
+
+def _case_key(case: Dict) -> str:
+    return f"{case['engine']}/{case['strings']}x{case['pages']}p/{case['latency']}s"
+
+def run_suite(engines, sizes, pages_list, options: Dict, repeat: int, recorded: Optional[str] = None) -> List[Dict]:
+    """
+    按引擎、字符串数和页数的组合运行所有用例
+
+    Returns:
+        List[Dict]: 每个用例的汇总结果，耗时取中位数，峰值内存取最大值
+    """
+    cases = []
+    for size in sizes:
+        strings = load_recorded_strings(recorded, size) if recorded else make_strings(size, translated_ratio=0.5)
+        for engine in engines:
+            # 登录与字符串数和页数无关，只测一次
+            if engine == "login" and size != sizes[0]:
+                continue
+            # HTTP 提交逐条调用保存接口，与字符串接口的分页无关
+            for pages in (pages_list if engine == "fetch-http" else pages_list[:1]):
+                if pages > size:
+                    continue
+                case = {"engine": engine, "strings": size, "pages": pages, "latency": options["latency"]}
+                runs = [run_case(engine, strings, pages, options) for _ in range(repeat)]
+                seconds = [run["seconds"] for run in runs]
+                case.update({
+                    "ok": all(run["ok"] for run in runs),
+                    "seconds": round(statistics.median(seconds), 4),
+                    "seconds_min": round(min(seconds), 4),
+                    "runs": [round(value, 4) for value in seconds],
+                    "request_count": runs[0]["request_count"],
+                    "requests": runs[0]["requests"],
+                    "rate_limited": max(run["rate_limited"] for run in runs),
+                    "peak_rss_kb": max(run["peak_rss_kb"] for run in runs),
+                    "baseline_rss_kb": min(run["baseline_rss_kb"] for run in runs)
+                })
+                errors = [run["error"] for run in runs if run.get("error")]
+                if errors:
+                    case["errors"] = errors
+                logger.info(f"{_case_key(case)}: {case['seconds']:.3f} 秒，{case['request_count']} 次请求，"
+                            f"峰值内存 {case['peak_rss_kb'] / 1024:.1f} MB{'' if case['ok'] else '（失败）'}")
+                cases.append(case)
+    return cases
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def compare_results(current: List[Dict], baseline_path: str, threshold: float) -> List[str]:
+    """
+    与之前保存的结果对比
+
+    Args:
+        current: 本次的用例结果
+        baseline_path: 之前保存的结果文件
+        threshold: 耗时或峰值内存增加超过该比例时视为回退
+
+    Returns:
+        List[str]: 回退的用例说明
+    """
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {_case_key(case): case for case in json.load(f)["cases"]}
+    regressions = []
+    for case in current:
+        key = _case_key(case)
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        for metric in ("seconds", "peak_rss_kb", "request_count"):
+            before, after = previous[metric], case[metric]
+            change = (after - before) / before if before else 0.0
+            logger.info(f"{key} {metric}: {before} -> {after}（{change:+.1%}）")
+            if change > threshold:
+                regressions.append(f"{key} {metric} 增加 {change:.1%}（{before} -> {after}）")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="离线基准测试")
+    parser.add_argument("--engines", default=",".join(ENGINES), help=f"逗号分隔的引擎列表，可选 {', '.join(ENGINES)}")
+    parser.add_argument("--sizes", help="逗号分隔的字符串数，默认 100,1000,5000,20000")
+    parser.add_argument("--pages", help="逗号分隔的页数，默认 1,20,200（超过字符串数的组合跳过）")
+    parser.add_argument("--quick", action="store_true", help="只运行 100 和 1000 条、1 和 20 页的用例")
+    parser.add_argument("--recorded", help="回放抓取保存的 all_translations.json，而不是生成的字符串")
+    parser.add_argument("--latency", type=float, default=0.0, help="模拟服务器每个请求的延迟（秒）")
+    parser.add_argument("--strings-rate-limit", type=int, default=None, help="字符串接口每秒允许的请求数")
+    parser.add_argument("--save-rate-limit", type=int, default=None, help="保存接口每秒允许的请求数")
+    parser.add_argument("--page-workers", type=int, default=4, help="抓取时并发请求分页的线程数")
+    parser.add_argument("--submit-workers", type=int, default=8, help="提交时的并发数")
+    parser.add_argument("--submit-rps", type=float, default=1000.0, help="提交时的每秒请求上限")
+    parser.add_argument("--repeat", type=int, default=1, help="每个用例重复次数，耗时取中位数")
+    parser.add_argument("--case-timeout", type=float, default=DEFAULT_CASE_TIMEOUT,
+                        help="单个用例的超时（秒），超时或子进程异常退出时记为失败")
+    parser.add_argument("--output", help="结果文件路径，默认写入 data/benchmarks/<时间>.json")
+    parser.add_argument("--compare", help="与之前保存的结果文件对比")
+    parser.add_argument("--threshold", type=float, default=0.1, help="对比时视为回退的增加比例")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    engines = [engine.strip() for engine in args.engines.split(",") if engine.strip()]
+    unknown = set(engines) - set(ENGINES)
+    if unknown:
+        parser.error(f"未知的引擎: {', '.join(sorted(unknown))}")
+    sizes = [int(v) for v in args.sizes.split(",")] if args.sizes else list(QUICK_SIZES if args.quick else DEFAULT_SIZES)
+    pages = [int(v) for v in args.pages.split(",")] if args.pages else list(QUICK_PAGES if args.quick else DEFAULT_PAGES)
+    options = {
+        "latency": args.latency,
+        "strings_rate_limit": args.strings_rate_limit,
+        "save_rate_limit": args.save_rate_limit,
+        "page_workers": args.page_workers,
+        "submit_workers": args.submit_workers,
+        "submit_rps": args.submit_rps,
+        "case_timeout": args.case_timeout
+    }
+
+    started = time.monotonic()
+    cases = run_suite(engines, sizes, pages, options, max(1, args.repeat), args.recorded)
+    report = {
+        "created_at": time.strftime('%Y-%m-%d %H:%M:%S'),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "options": dict(options, repeat=args.repeat, recorded=args.recorded),
+        "cases": cases
+    }
+    output = Path(args.output or f"{RESULTS_DIR}/{time.strftime('%Y%m%d-%H%M%S')}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    logger.info(f"共 {len(cases)} 个用例，耗时 {time.monotonic() - started:.1f} 秒，结果已保存至 {output}")
+
+    failed = [case for case in cases if not case["ok"]]
+    if failed:
+        logger.error(f"{len(failed)} 个用例运行失败: {', '.join(_case_key(case) for case in failed)}")
+    regressions = []
+    if args.compare:
+        regressions = compare_results(cases, args.compare, args.threshold)
+        for regression in regressions:
+            logger.warning(f"性能回退: {regression}")
+    if regressions or failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
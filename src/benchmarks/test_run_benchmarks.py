@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+基准测试的冒烟测试：结果对比、在模拟服务器上端到端运行一个用例，以及子进程异常退出的处理
+
+用法:
+    python -m pytest src/benchmarks/test_run_benchmarks.py
+"""
+
+import json
+import queue
+from src.benchmarks.run_benchmarks import _wait_result, compare_results, run_case
+from src.utils.fake_bga_server import make_strings
+
+def make_case(engine="fetch-http", strings=100, pages=1, seconds=1.0, peak_rss_kb=1000, request_count=10):
+    return {"engine": engine, "strings": strings, "pages": pages, "latency": 0.0, "seconds": seconds,
+            "peak_rss_kb": peak_rss_kb, "request_count": request_count}
+
+def write_baseline(tmp_path, cases):
+    path = tmp_path / "baseline.json"
+    path.write_text(json.dumps({"cases": cases}), encoding="utf-8")
+    return str(path)
+
+def test_no_regression_within_threshold(tmp_path):
+    baseline = write_baseline(tmp_path, [make_case()])
+    assert compare_results([make_case(seconds=1.05, peak_rss_kb=900)], baseline, 0.1) == []
+
+def test_reports_each_regressed_metric(tmp_path):
+    baseline = write_baseline(tmp_path, [make_case()])
+    regressions = compare_results([make_case(seconds=1.5, request_count=20)], baseline, 0.1)
+    assert len(regressions) == 2
+    assert regressions[0].startswith("fetch-http/100x1p/0.0s seconds 增加 50.0%")
+    assert regressions[1].startswith("fetch-http/100x1p/0.0s request_count 增加 100.0%")
+
+def test_new_cases_and_zero_baselines_are_not_regressions(tmp_path):
+    baseline = write_baseline(tmp_path, [make_case(engine="login", seconds=0.0, request_count=0)])
+    current = [make_case(engine="login", seconds=3.0, request_count=2), make_case(pages=20, seconds=100.0)]
+    assert compare_results(current, baseline, 0.1) == []
+
+def test_fetch_case_end_to_end():
+    options = {"latency": 0.0, "strings_rate_limit": None, "save_rate_limit": None, "page_workers": 2,
+               "submit_workers": 1, "submit_rps": 100.0, "case_timeout": 120}
+    result = run_case("fetch-http", make_strings(20), 2, options)
+    assert result["ok"] and "error" not in result
+    assert result["requests"]["/translation/translation/getmodulestrings.html"] == 2
+    assert result["peak_rss_kb"] > 0
+
+class DeadProcess:
+    exitcode = 1
+
+    def is_alive(self):
+        return False
+
+def test_dead_child_is_a_failed_case():
+    result = _wait_result(DeadProcess(), queue.Queue(), timeout=60)
+    assert result["ok"] is False
+    assert "exitcode=1" in result["error"]
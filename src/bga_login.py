@@ -1,23 +1,67 @@
 import requests
 from typing import Dict, Optional
 import json
+import logging
+import os
 import re
 import uuid
 import time
 import random
 from datetime import datetime
+from .utils.metrics import metrics
+from .utils.session_store import SessionStore
+
+logger = logging.getLogger(__name__)
 
 class BGALogin:
-    def __init__(self, username: str = None, password: str = None):
-        self.base_url = "https://zh-cn.boardgamearena.com"
-        self.session = requests.Session()
+    def __init__(self, username: str = None, password: str = None, base_url: str = "https://zh-cn.boardgamearena.com",
+                 session_store: Optional[SessionStore] = None):
+        self.base_url = base_url.rstrip('/')
+        self._session = None
         self._setup_headers()
         self.request_token = None
-        self._setup_cookies()
         self.retry_delay = 60  # 重试等待时间（秒）
         self.max_retries = 3   # 最大重试次数
         self.username = username
         self.password = password
+        self.session_store = session_store
+    
+    @classmethod
+    def from_env(cls, base_url: Optional[str] = None) -> "BGALogin":
+        """
+        使用 .env 中的账号信息创建登录客户端
+        
+        Args:
+            base_url: BGA 站点地址，默认读取 BGA_BASE_URL 环境变量，未设置时使用默认地址
+            
+        Returns:
+            BGALogin: 登录客户端
+        """
+        from dotenv import load_dotenv, find_dotenv
+        
+        env_path = find_dotenv()
+        if not env_path:
+            raise ValueError("未找到 .env 文件")
+        load_dotenv(env_path)
+        
+        username = os.getenv('BGA_USERNAME')
+        password = os.getenv('BGA_PASSWORD')
+        if not username or not password:
+            raise ValueError("请在 .env 文件中配置 BGA_USERNAME 和 BGA_PASSWORD")
+        
+        session_store = SessionStore.from_env(username, password)
+        base_url = base_url or os.getenv('BGA_BASE_URL')
+        if base_url:
+            return cls(username=username, password=password, base_url=base_url, session_store=session_store)
+        return cls(username=username, password=password, session_store=session_store)
+    
+    @property
+    def session(self) -> requests.Session:
+        """HTTP 会话，首次使用时才创建并写入初始 cookies"""
+        if self._session is None:
+            self._session = requests.Session()
+            self._setup_cookies()
+        return self._session
     
     def _setup_headers(self):
         """设置基本的请求头"""
@@ -67,7 +111,8 @@ class BGALogin:
         """更新请求令牌"""
         self.request_token = token
         self.headers['x-request-token'] = token
-        print(f"已更新 request_token: {token}")
+        # 令牌可用于代表账号发请求，日志中只保留末尾几位
+        logger.debug(f"已更新 request_token: ***{token[-4:]}")
     
     def _handle_rate_limit(self, response_data: Dict) -> int:
         """
@@ -254,31 +299,96 @@ class BGALogin:
         
         return {"status": 0, "error": "超过最大重试次数"}
         
-    def login(self) -> bool:
+    def validate_session(self) -> bool:
         """
-        执行登录流程
+        用一次请求检查当前会话是否仍处于登录状态，并刷新 request_token
         
         Returns:
-            bool: 登录是否成功
+            bool: 会话是否有效
         """
         try:
-            # 获取 request_token
-            if not self.get_request_token():
-                print("获取 request_token 失败")
+            response = self.session.get(f"{self.base_url}/welcome", headers=self.headers, allow_redirects=True, timeout=30)
+            if response.status_code != 200:
                 return False
             
-            # 执行登录
-            login_result = self.login_with_password(self.username, self.password)
-            
-            # 检查登录结果
-            if login_result.get('status') == 1:
-                print("登录成功")
-                return True
-            else:
-                error_msg = login_result.get('error', '未知错误')
-                print(f"登录失败: {error_msg}")
+            player_match = re.search(r'current_player_id["\']?\s*[:=]\s*["\']?(\d+)', response.text)
+            if not player_match or player_match.group(1) == '0':
                 return False
-                
+            
+            token_match = re.search(r'requestToken:\s*["\']([^"\']+)["\']', response.text, re.IGNORECASE)
+            if token_match:
+                self._update_request_token(token_match.group(1))
+            return bool(self.request_token)
         except Exception as e:
-            print(f"登录过程中发生错误: {str(e)}")
-            return False 
\ No newline at end of file
+            print(f"检查会话状态失败: {str(e)}")
+            return False
+    
+    def restore_session(self) -> bool:
+        """
+        从会话缓存恢复登录状态，恢复后校验一次
+        
+        Returns:
+            bool: 是否成功恢复有效会话
+        """
+        if not self.session_store:
+            return False
+        
+        data = self.session_store.load()
+        if not data:
+            return False
+        
+        SessionStore.apply_to_jar(self.session.cookies, data["cookies"])
+        if data.get("request_token"):
+            self._update_request_token(data["request_token"])
+        
+        if self.validate_session():
+            print("已复用缓存的登录会话")
+            return True
+        
+        print("缓存的登录会话已失效，重新登录")
+        self.session_store.clear()
+        return False
+    
+    def save_session(self):
+        """将当前会话写入会话缓存"""
+        if self.session_store:
+            self.session_store.save(SessionStore.cookies_from_jar(self.session.cookies), self.request_token)
+    
+    def login(self) -> bool:
+        """
+        执行登录流程，优先复用缓存的会话
+        
+        Returns:
+            bool: 登录是否成功
+        """
+        with metrics.span("login", engine="http"):
+            try:
+                if self.restore_session():
+                    metrics.count("logins", result="cached")
+                    return True
+                
+                # 获取 request_token
+                if not self.get_request_token():
+                    print("获取 request_token 失败")
+                    metrics.count("logins", result="failed")
+                    return False
+                
+                # 执行登录
+                login_result = self.login_with_password(self.username, self.password)
+                
+                # 检查登录结果
+                if login_result.get('status') == 1:
+                    print("登录成功")
+                    self.save_session()
+                    metrics.count("logins", result="password")
+                    return True
+                else:
+                    error_msg = login_result.get('error', '未知错误')
+                    print(f"登录失败: {error_msg}")
+                    metrics.count("logins", result="failed")
+                    return False
+                    
+            except Exception as e:
+                print(f"登录过程中发生错误: {str(e)}")
+                metrics.count("logins", result="failed")
+                return False 
\ No newline at end of file
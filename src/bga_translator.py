@@ -1,14 +1,47 @@
 import os
-from typing import Dict, Optional, List
+from typing import TYPE_CHECKING, Callable, Dict, Optional, List
 from dotenv import load_dotenv, find_dotenv
 from .bga_login import BGALogin
+from .translator.translation_files import derive_untranslated, merge_pages, save_translation_snapshot
+from .translator.store import TranslationStore
+from .utils.browser_pool import BrowserPool
+from .utils.log_policy import LazyJSON
+from .utils.metrics import metrics
+from .utils.page_waiter import PageWaiter
+from .utils.session_store import SessionStore, restore_browser_session, save_browser_session
+import bisect
 import json
 import logging
-from playwright.sync_api import sync_playwright, Page, Browser
+import random
 from pathlib import Path
 
+if TYPE_CHECKING:
+    from playwright.sync_api import Page
+
+# 在页面内一次性收集所有翻译条目，返回紧凑的 [ID, 原文, 原文出处, 译文] 数组，
+# 避免对每个条目分别发起多次 Playwright 调用
+HARVEST_SCRIPT = """
+() => Array.from(document.querySelectorAll("textarea[id^='toTranslate_']"), node => {
+    const key = node.id.split('_')[1];
+    const context = document.getElementById(`context_${key}`);
+    const translation = document.getElementById(`translation_${key}`);
+    return [
+        node.id,
+        node.value,
+        context ? context.innerText : "",
+        translation ? (translation.value || "") : ""
+    ];
+}).filter(row => row[0] && row[1])
+"""
+
+def _string_number(key: str) -> Optional[int]:
+    """条目键 toTranslate_<id> 中的数字 ID，非数字时返回 None"""
+    suffix = key.rsplit("_", 1)[-1]
+    return int(suffix) if suffix.isdigit() else None
+
 class BGATranslator:
-    def __init__(self, game_name: str):
+    def __init__(self, game_name: str, wait_timeout_ms: int = 15000, headless: Optional[bool] = None,
+                 client: Optional[BGALogin] = None, max_pages: int = 1000):
         # 加载环境变量
         env_path = find_dotenv()
         if not env_path:
@@ -20,14 +53,20 @@ class BGATranslator:
         self.username = os.getenv('BGA_USERNAME')
         self.password = os.getenv('BGA_PASSWORD')
         self.game_name = game_name
+        self.wait_timeout_ms = wait_timeout_ms
+        self.max_pages = max_pages
         
         if not self.username or not self.password:
             raise ValueError("请在 .env 文件中配置 BGA_USERNAME 和 BGA_PASSWORD")
             
         print(f"已加载配置: 用户名={self.username}")
             
-        # 初始化登录客户端
-        self.client = BGALogin(username=self.username, password=self.password)
+        # 初始化登录客户端，批量任务中可传入共享的已登录客户端
+        self.client = client or BGALogin(
+            username=self.username,
+            password=self.password,
+            session_store=SessionStore.from_env(self.username, self.password)
+        )
         
         # 创建游戏数据目录
         self.games_dir = "data/games"
@@ -37,29 +76,33 @@ class BGATranslator:
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
         
-        # 初始化 Playwright
-        self.init_browser()
+        # Playwright 在首次访问 page/context 时才启动，只走 HTTP 接口的命令不会打开浏览器
+        self.headless = headless
+        self._pool = None
+        self._context = None
+        self._page = None
+        self._waiter = None
         
     def init_browser(self):
         """初始化 Playwright 浏览器"""
         try:
-            self.playwright = sync_playwright().start()
-            self.browser = self.playwright.chromium.launch(
-                headless=False,
-                args=['--start-maximized']
-            )
-            self.context = self.browser.new_context(
-                viewport={'width': 1920, 'height': 1080}
-            )
-            self.page = self.context.new_page()
+            self._pool = BrowserPool(headless=self.headless).start()
+            self._context = self._pool.acquire_context()
+            self._page = self._context.new_page()
+            self._waiter = PageWaiter(self._page, timeout_ms=self.wait_timeout_ms)
             print("成功初始化浏览器")
         except Exception as e:
             print(f"初始化浏览器失败: {e}")
             raise
             
+    @metrics.timed("login")
     def login(self) -> bool:
-        """使用 Playwright 登录 BGA"""
+        """使用 Playwright 登录 BGA，优先复用缓存的会话"""
         try:
+            if restore_browser_session(self.client, self.context):
+                print("已复用缓存的登录会话")
+                return True
+            
             # 打开登录页面
             self.page.goto("https://boardgamearena.com/account")
             print("已打开登录页面")
@@ -85,20 +128,44 @@ class BGATranslator:
             # 等待登录成功
             self.page.wait_for_load_state("networkidle")
             print("登录成功！")
+            save_browser_session(self.client, self.context, self.page)
             
             return True
         except Exception as e:
             print(f"登录失败: {str(e)}")
             return False
             
+    @property
+    def context(self):
+        """浏览器上下文，首次访问时启动浏览器"""
+        if self._context is None:
+            self.init_browser()
+        return self._context
+    
+    @property
+    def page(self) -> "Page":
+        """当前页面，首次访问时启动浏览器"""
+        if self._page is None:
+            self.init_browser()
+        return self._page
+    
+    @property
+    def waiter(self) -> PageWaiter:
+        """页面等待器，首次访问时启动浏览器"""
+        if self._waiter is None:
+            self.init_browser()
+        return self._waiter
+    
+    def close(self):
+        """关闭浏览器；Playwright 对象只能在创建它的线程中关闭，多线程使用时应显式调用"""
+        if getattr(self, '_pool', None):
+            self._pool.close()
+            self._pool = None
+            self._context = self._page = self._waiter = None
+    
     def __del__(self):
         """析构函数，确保关闭浏览器"""
-        if hasattr(self, 'context'):
-            self.context.close()
-        if hasattr(self, 'browser'):
-            self.browser.close()
-        if hasattr(self, 'playwright'):
-            self.playwright.stop()
+        self.close()
     
     def get_game_list(self) -> List[Dict]:
         """获取所有游戏列表"""
@@ -128,8 +195,8 @@ class BGATranslator:
         try:
             url = "https://boardgamearena.com/gamelist/gamelist/gameDetails.html"
             self.logger.info(f"正在获取游戏 {game_id} 的详情...")
-            self.logger.info(f"请求 URL: {url}")
-            self.logger.info(f"请求头: {self.client.request_token}")
+            self.logger.debug("请求 URL: %s", url)
+            self.logger.debug("请求令牌: ***%s", (self.client.request_token or "")[-4:])
             
             response = self.client.session.post(url, headers={
                 'x-request-token': self.client.request_token,
@@ -149,7 +216,7 @@ class BGATranslator:
             
             if response.status_code == 200:
                 data = response.json()
-                self.logger.info(f"响应内容: {json.dumps(data, ensure_ascii=False, indent=2)}")
+                self.logger.debug("响应内容: %s", LazyJSON(data, indent=2))
                 
                 # 检查响应状态
                 if data.get('status') == 1:
@@ -197,12 +264,133 @@ class BGATranslator:
             self.logger.error(f"保存游戏数据时发生错误: {str(e)}")
             return False
     
-    def get_translations(self, game_id: str) -> Optional[Dict]:
+    @metrics.timed("harvest_page")
+    def _harvest_page(self, with_translation: bool = True) -> Dict[str, Dict]:
+        """
+        通过一次 page.evaluate 提取当前页面的全部翻译条目
+        
+        Args:
+            with_translation: 是否保留已有译文（未翻译视图中译文恒为空）
+            
+        Returns:
+            Dict[str, Dict]: 以原文输入框 ID 为键的翻译条目
+        """
+        rows = self.page.evaluate(HARVEST_SCRIPT)
+        metrics.count("strings_harvested", len(rows), engine="browser")
+        
+        entries = {}
+        for original_id, original_text, context, translation in rows:
+            entries[original_id] = {
+                "original": original_text,
+                "context": context,
+                "translation": translation if with_translation else ""
+            }
+        return entries
+    
+    @metrics.timed("harvest")
+    def _harvest_all_pages(self, max_pages: Optional[int] = None,
+                           stop_when: Optional[Callable[[List[Dict[str, Dict]]], bool]] = None) -> Dict[str, Dict]:
+        """
+        依次点击 a.pagination_next 翻页，收集所有页的翻译条目
+        
+        Args:
+            max_pages: 最多翻页数，防止分页异常时无限循环，默认使用 self.max_pages
+            stop_when: 每收集一页后调用，参数为已收集的各页条目（按页面顺序），返回 True 时不再翻页
+            
+        Returns:
+            Dict[str, Dict]: 按字符串 ID 排序的翻译条目
+        """
+        max_pages = max_pages or self.max_pages
+        pages = [self._harvest_page()]
+        while len(pages) < max_pages:
+            if stop_when is not None and stop_when(pages):
+                self.logger.info(f"已收集足够的条目，在第 {len(pages)} 页停止翻页")
+                break
+            next_page = self.page.locator("a.pagination_next")
+            if next_page.count() == 0 or next_page.is_disabled():
+                break
+            marker = self.waiter.pagination_marker()
+            next_page.click()
+            if not self.waiter.wait_for_pagination_change(marker):
+                self.logger.warning(f"第 {len(pages) + 1} 页加载超时，停止翻页")
+                break
+            pages.append(self._harvest_page())
+            self.logger.info(f"第 {len(pages)} 页获取到 {len(pages[-1])} 条")
+        
+        self.logger.info(f"共翻阅 {len(pages)} 页")
+        return merge_pages(pages)
+    
+    def _verify_untranslated(self, module_id, derived: Dict[str, Dict], sample_size: int) -> Dict[str, Dict]:
+        """
+        抽样核对本地筛选的未翻译集合与服务器未翻译视图是否一致
+
+        服务器视图按字符串 ID 升序分页时，收集到 sample_size 条、且本地已有足够多的条目落在已翻阅的 ID 范围内
+        就停止翻页：ID 不超过已翻阅最大 ID 的本地条目若不在已翻阅的页中，就一定不在服务器视图中。
+        页面顺序不是 ID 升序时无法据此判断，会翻完所有页
+        
+        Args:
+            module_id: 模块 ID
+            derived: 本地筛选出的未翻译内容
+            sample_size: 双向各抽查的条目数
+            
+        Returns:
+            Dict[str, Dict]: 一致时返回本地结果，不一致时改用服务器视图
+        """
+        self.logger.info(f"正在抽样核对未翻译内容（{sample_size} 条）...")
+        derived_numbers = sorted(number for number in map(_string_number, derived) if number is not None)
+        state = {"stopped_early": False}
+
+        def enough(pages: List[Dict[str, Dict]]) -> bool:
+            keys = [key for page in pages for key in page]
+            numbers = [_string_number(key) for key in keys]
+            if len(keys) < sample_size or None in numbers or numbers != sorted(numbers):
+                return False
+            covered = bisect.bisect_right(derived_numbers, numbers[-1])
+            state["stopped_early"] = covered >= min(sample_size, len(derived))
+            return state["stopped_early"]
+
+        server_view = self._harvest_untranslated_view(module_id, enough)
+        if state["stopped_early"]:
+            last = max(_string_number(key) for key in server_view)
+            candidates = [key for key in derived if (_string_number(key) or 0) <= last]
+        else:
+            candidates = list(derived)
+        
+        server_sample = random.sample(sorted(server_view), min(sample_size, len(server_view)))
+        derived_sample = random.sample(sorted(candidates), min(sample_size, len(candidates)))
+        missing = [key for key in server_sample if key not in derived]
+        extra = [key for key in derived_sample if key not in server_view]
+        
+        if not missing and not extra:
+            scope = f"已翻阅 {len(server_view)} 条" if state["stopped_early"] else f"{len(server_view)} 条"
+            self.logger.info(f"抽样核对通过：服务器视图{scope}，本地筛选 {len(derived)} 条")
+            return derived
+        
+        self.logger.warning(f"抽样核对发现不一致：服务器有而本地缺少 {len(missing)} 条，本地多出 {len(extra)} 条，改用服务器视图")
+        for key in (missing + extra)[:10]:
+            self.logger.warning(f"- {key}")
+        if state["stopped_early"]:
+            # 改用服务器视图需要完整的未翻译列表，重新翻阅所有页
+            server_view = self._harvest_untranslated_view(module_id)
+        return server_view
+
+    def _harvest_untranslated_view(self, module_id,
+                                   stop_when: Optional[Callable[[List[Dict[str, Dict]]], bool]] = None) -> Dict[str, Dict]:
+        """打开服务器的未翻译视图并收集条目，stop_when 见 _harvest_all_pages"""
+        untranslated_url = f"https://boardgamearena.com/translation?module_id={module_id}&source_locale=en_US&dest_locale=zh_CN&findtype=untranslated"
+        with metrics.span("navigate", view="untranslated"):
+            self.page.goto(untranslated_url)
+            self.waiter.wait_for_textareas("未翻译页面加载")
+        return {key: dict(item, translation="") for key, item in self._harvest_all_pages(stop_when=stop_when).items()}
+    
+    def get_translations(self, game_id: str, incremental: bool = False, verify_sample: int = 0) -> Optional[Dict]:
         """
         获取游戏的翻译内容
         
         Args:
             game_id: 游戏ID
+            incremental: 是否增量保存，内容与上次相比无变化时不重写翻译文件
+            verify_sample: 大于 0 时加载服务器的未翻译视图，抽样核对本地筛选结果
             
         Returns:
             Optional[Dict]: 翻译内容，如果获取失败则返回 None
@@ -232,107 +420,28 @@ class BGATranslator:
             # 1. 获取所有翻译内容
             self.logger.info("正在获取所有翻译内容...")
             all_translations_url = f"https://boardgamearena.com/translation?module_id={module_id}&source_locale=en_US&dest_locale=zh_CN&findtype=all"
-            self.page.goto(all_translations_url)
-            self.page.wait_for_load_state("networkidle")
-            self.page.wait_for_timeout(5000)  # 等待5秒确保页面加载完成
-            
-            all_translations = {}
-            all_textareas = self.page.locator("textarea[id^='toTranslate_']").all()
-            
-            for textarea in all_textareas:
-                try:
-                    original_id = textarea.get_attribute("id")
-                    if not original_id:
-                        continue
-                        
-                    original_text = textarea.evaluate("node => node.value")
-                    if not original_text:
-                        continue
-                        
-                    # 获取原文出处
-                    context_elem = self.page.locator(f"#context_{original_id.split('_')[1]}")
-                    context = context_elem.inner_text() if context_elem.count() > 0 else ""
-                    
-                    # 获取已有的翻译（如果有）
-                    translation_textarea = self.page.locator(f"#translation_{original_id.split('_')[1]}")
-                    translation = translation_textarea.evaluate("node => node.value") if translation_textarea.count() > 0 else ""
-                    
-                    all_translations[original_id] = {
-                        "original": original_text,
-                        "context": context,
-                        "translation": translation
-                    }
-                    
-                except Exception as e:
-                    self.logger.error(f"处理翻译项时出错: {e}")
-                    continue
+            with metrics.span("navigate", view="all"):
+                self.page.goto(all_translations_url)
+                self.waiter.wait_for_textareas("全部翻译页面加载")
             
-            # 2. 获取未翻译内容
-            self.logger.info("正在获取未翻译内容...")
-            untranslated_url = f"https://boardgamearena.com/translation?module_id={module_id}&source_locale=en_US&dest_locale=zh_CN&findtype=untranslated"
-            self.page.goto(untranslated_url)
-            self.page.wait_for_load_state("networkidle")
-            self.page.wait_for_timeout(5000)
-            
-            untranslated = {}
-            untranslated_textareas = self.page.locator("textarea[id^='toTranslate_']").all()
-            
-            for textarea in untranslated_textareas:
-                try:
-                    original_id = textarea.get_attribute("id")
-                    if not original_id:
-                        continue
-                        
-                    original_text = textarea.evaluate("node => node.value")
-                    if not original_text:
-                        continue
-                        
-                    context_elem = self.page.locator(f"#context_{original_id.split('_')[1]}")
-                    context = context_elem.inner_text() if context_elem.count() > 0 else ""
-                    
-                    untranslated[original_id] = {
-                        "original": original_text,
-                        "context": context,
-                        "translation": ""
-                    }
-                    
-                except Exception as e:
-                    self.logger.error(f"处理未翻译项时出错: {e}")
-                    continue
-            
-            # 保存所有翻译内容
-            all_json_path = translations_dir / "all_translations.json"
-            with open(all_json_path, "w", encoding="utf-8") as f:
-                json.dump(all_translations, f, ensure_ascii=False, indent=2)
-                
-            # 保存未翻译内容
-            untranslated_json_path = translations_dir / "untranslated.json"
-            with open(untranslated_json_path, "w", encoding="utf-8") as f:
-                json.dump(untranslated, f, ensure_ascii=False, indent=2)
-                
-            # 生成所有翻译的对照表
-            all_md_content = "| 原文 | 原文出处 | 当前译文 |\n|------|----------|----------|\n"
-            for item in all_translations.values():
-                all_md_content += f"| {item['original']} | {item['context']} | {item['translation']} |\n"
-                
-            all_md_path = translations_dir / "all_translations.md"
-            with open(all_md_path, "w", encoding="utf-8") as f:
-                f.write(all_md_content)
-                
-            # 生成未翻译内容的对照表
-            untranslated_md_content = "| 原文 | 原文出处 | 译文 |\n|------|----------|------|\n"
-            for item in untranslated.values():
-                untranslated_md_content += f"| {item['original']} | {item['context']} | |\n"
-                
-            untranslated_md_path = translations_dir / "untranslated.md"
-            with open(untranslated_md_path, "w", encoding="utf-8") as f:
-                f.write(untranslated_md_content)
-                
-            self.logger.info(f"成功保存翻译内容到 {translations_dir}")
-            self.logger.info(f"- 所有翻译JSON：{all_json_path}")
-            self.logger.info(f"- 所有翻译Markdown：{all_md_path}")
-            self.logger.info(f"- 未翻译JSON：{untranslated_json_path}")
-            self.logger.info(f"- 未翻译Markdown：{untranslated_md_path}")
+            all_translations = self._harvest_all_pages()
+            self.logger.info(f"共获取 {len(all_translations)} 条翻译内容")
+            
+            # 2. 未翻译内容直接从全部内容中筛选，无需再加载一次未翻译视图
+            untranslated = derive_untranslated(all_translations)
+            self.logger.info(f"共 {len(untranslated)} 条未翻译内容")
+            
+            if verify_sample > 0:
+                untranslated = self._verify_untranslated(module_id, untranslated, verify_sample)
+            
+            store = TranslationStore.from_env()
+            try:
+                save_translation_snapshot(translations_dir, all_translations, untranslated, force=not incremental,
+                                          store=store, game=game_id)
+            finally:
+                if store is not None:
+                    store.close()
+            self.waiter.log_summary()
             
             return {"all": all_translations, "untranslated": untranslated}
             
@@ -351,8 +460,8 @@ class BGATranslator:
             bool: 更新是否成功
         """
         try:
-            # 使用BGALogin进行登录
-            if not self.client.login():
+            # 使用BGALogin进行登录，共享的客户端已登录时直接复用
+            if not self.client.request_token and not self.client.login():
                 self.logger.error("BGALogin登录失败")
                 return False
                 
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+HTTP 翻译抓取模块
+直接通过 BGALogin 的已认证会话分页请求模块字符串接口，无需启动浏览器
+"""
+
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import requests
+from bs4 import BeautifulSoup
+from ..bga_login import BGALogin
+from ..translator.translation_files import derive_untranslated, merge_pages, load_fingerprints, load_previous_translations, save_translation_snapshot
+from ..translator.store import TranslationStore
+from ..utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# 与 http_submitter 的保存接口一样，该路径和参数是推断的，目前只在 FakeBGAServer 上验证；接口不同时请改用浏览器引擎
+MODULE_STRINGS_PATH = "/translation/translation/getmodulestrings.html"
+# 单次请求的超时（秒），超时与其他网络错误一样计入重试次数
+REQUEST_TIMEOUT = 30
+
+def _entry_key(string_id) -> str:
+    """与浏览器引擎保持一致，使用原文输入框 ID 作为条目键"""
+    return f"toTranslate_{string_id}"
+
+def _parse_html_strings(html: str) -> Dict[str, Dict]:
+    """
+    解析翻译页面（或片段）中的字符串
+
+    Args:
+        html: HTML 内容
+
+    Returns:
+        Dict[str, Dict]: 以原文输入框 ID 为键的翻译条目
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    # 一次性建立 ID 到元素的索引，避免对每个条目在整页中查找；ID 重复时与 soup.find 一样取第一个
+    elements = {}
+    for element in soup.find_all(id=True):
+        elements.setdefault(element["id"], element)
+
+    entries = {}
+    for textarea in soup.select("textarea[id^='toTranslate_']"):
+        original_id = textarea.get("id")
+        original_text = textarea.get_text()
+        if not original_id or not original_text:
+            continue
+
+        string_id = original_id.split("_")[1]
+        context_elem = elements.get(f"context_{string_id}")
+        translation_elem = elements.get(f"translated_{string_id}") or elements.get(f"translation_{string_id}")
+
+        entries[original_id] = {
+            "original": original_text,
+            "context": context_elem.get_text() if context_elem else "",
+            "translation": translation_elem.get_text() if translation_elem else ""
+        }
+    return entries
+
+def _parse_json_strings(items) -> Dict[str, Dict]:
+    """
+    解析 JSON 接口返回的字符串列表
+
+    Args:
+        items: 字符串列表，或以字符串 ID 为键的字典
+
+    Returns:
+        Dict[str, Dict]: 以原文输入框 ID 为键的翻译条目
+    """
+    if isinstance(items, dict):
+        items = [dict(item, id=item.get("id", key)) for key, item in items.items()]
+
+    entries = {}
+    for item in items:
+        string_id = item.get("id", item.get("string_id"))
+        original_text = item.get("original", item.get("src", item.get("text")))
+        if string_id is None or not original_text:
+            continue
+
+        entries[_entry_key(string_id)] = {
+            "original": original_text,
+            "context": item.get("context") or "",
+            "translation": item.get("translation", item.get("dest")) or ""
+        }
+    return entries
+
+def parse_module_strings(content: str) -> Tuple[Dict[str, Dict], Optional[int]]:
+    """
+    解析模块字符串接口的响应，兼容 JSON 与 HTML 两种返回格式
+
+    Args:
+        content: 响应内容
+
+    Returns:
+        Tuple[Dict[str, Dict], Optional[int]]: (翻译条目, 总页数；未知时为 None)
+    """
+    try:
+        payload = json.loads(content)
+    except ValueError:
+        return _parse_html_strings(content), None
+
+    if not isinstance(payload, dict):
+        raise ValueError("无法识别的响应格式")
+    if payload.get("status") in (0, "0", "error"):
+        raise ValueError(f"接口返回错误: {payload.get('error', '未知错误')}")
+
+    data = payload.get("data", payload)
+    if isinstance(data, list):
+        return _parse_json_strings(data), None
+
+    page_count = data.get("nbpages", data.get("page_count"))
+    page_count = int(page_count) if page_count is not None else None
+
+    if "strings" in data:
+        return _parse_json_strings(data["strings"]), page_count
+    if "html" in data:
+        return _parse_html_strings(data["html"]), page_count
+    return {}, page_count
+
+class HTTPTranslationFetcher:
+    """HTTP 翻译抓取器"""
+
+    def __init__(self, client: BGALogin, language: str = "zh", min_interval: float = 1.0, max_pages: int = 1000,
+                 page_workers: int = 4):
+        """
+        初始化抓取器
+
+        Args:
+            client: BGA 登录客户端，使用其会话和 request_token 发送请求
+            language: 目标语言
+            min_interval: 两次分页请求之间的最小间隔（秒）
+            max_pages: 最多请求的页数，防止接口异常时无限翻页
+            page_workers: 并发请求分页的线程数
+        """
+        self.client = client
+        self.language = language
+        self.min_interval = min_interval
+        self.max_pages = max_pages
+        self.page_workers = max(1, page_workers)
+        self._last_request_time = 0.0
+        self._throttle_lock = threading.Lock()
+        self.pages: Dict[str, Dict] = {}
+        self.not_modified_pages = 0
+
+    @classmethod
+    def from_env(cls, base_url: Optional[str] = None, **kwargs) -> "HTTPTranslationFetcher":
+        """
+        使用 .env 中的账号信息创建抓取器
+
+        Args:
+            base_url: BGA 站点地址，默认读取 BGA_BASE_URL 环境变量，未设置时使用 BGALogin 的地址
+
+        Returns:
+            HTTPTranslationFetcher: 抓取器实例
+        """
+        return cls(BGALogin.from_env(base_url), **kwargs)
+
+    def login(self) -> bool:
+        """使用 BGALogin 登录，客户端已登录（如批量任务共享的会话）时直接复用"""
+        return bool(self.client.request_token) or self.client.login()
+
+    def _throttle(self):
+        """保证分页请求之间的最小间隔，多个页面工作线程共享同一间隔"""
+        with self._throttle_lock:
+            wait_seconds = self._last_request_time + self.min_interval - time.time()
+            self._last_request_time = max(time.time(), self._last_request_time + self.min_interval)
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
+
+    def _request_page(self, module_id, page: int, etag: Optional[str] = None):
+        """
+        请求某一页，失败时按需重试
+
+        Args:
+            module_id: 模块 ID
+            page: 页码，从 1 开始
+            etag: 上一次该页返回的 ETag，提供时发送条件请求
+
+        Returns:
+            requests.Response: 状态码为 200 或 304 的响应
+        """
+        url = f"{self.client.base_url}{MODULE_STRINGS_PATH}"
+        params = {"id": module_id, "language": self.language, "page": page}
+        headers = {
+            'x-request-token': self.client.request_token or '',
+            'accept': 'application/json, text/html, */*',
+            'x-requested-with': 'XMLHttpRequest'
+        }
+        if etag:
+            headers['If-None-Match'] = etag
+
+        for attempt in range(self.client.max_retries):
+            self._throttle()
+            try:
+                response = self.client.session.get(url, params=params, headers=headers, timeout=REQUEST_TIMEOUT)
+            except requests.RequestException as e:
+                response = None
+                logger.warning(f"获取第 {page} 页失败: {e}")
+            else:
+                if response.status_code in (200, 304):
+                    return response
+                logger.warning(f"获取第 {page} 页失败，状态码: {response.status_code}")
+
+            if attempt < self.client.max_retries - 1:
+                wait_seconds = self.client.retry_delay * (attempt + 1)
+                if response is not None:
+                    try:
+                        wait_seconds = self.client._handle_rate_limit(response.json())
+                    except ValueError:
+                        pass
+                logger.info(f"等待 {wait_seconds} 秒后重试...")
+                time.sleep(wait_seconds)
+
+        raise Exception(f"获取第 {page} 页失败，已超过最大重试次数")
+
+    @metrics.timed("harvest_page")
+    def _fetch_page_entries(self, module_id, page: int, previous_pages: Dict,
+                            previous_entries: Dict[str, Dict]) -> Tuple[Dict[str, Dict], Optional[int], Dict, bool]:
+        """
+        获取一页条目，上一次该页的条目都还在时发送条件请求
+
+        Returns:
+            Tuple[Dict[str, Dict], Optional[int], Dict, bool]: (翻译条目, 总页数, 分页信息, 是否未变化)
+        """
+        previous = previous_pages.get(str(page))
+        etag = None
+        if previous and previous.get("etag") and all(key in previous_entries for key in previous.get("ids", [])):
+            etag = previous["etag"]
+
+        response = self._request_page(module_id, page, etag)
+        not_modified = response.status_code == 304
+        if not_modified:
+            page_entries = {key: previous_entries[key] for key in previous["ids"]}
+            reported_count = previous.get("page_count")
+        else:
+            page_entries, reported_count = parse_module_strings(response.text)
+
+        meta = {
+            "etag": response.headers.get("ETag") or etag,
+            "ids": list(page_entries),
+            "page_count": reported_count
+        }
+        metrics.count("pages_fetched", engine="http", status="not_modified" if not_modified else "ok")
+        metrics.count("strings_harvested", len(page_entries), engine="http")
+        logger.info(f"第 {page} 页获取到 {len(page_entries)} 条字符串" + ("（未变化）" if not_modified else ""))
+        return page_entries, reported_count, meta, not_modified
+
+    @metrics.timed("harvest")
+    def fetch_all(self, module_id, previous_pages: Optional[Dict] = None,
+                  previous_entries: Optional[Dict[str, Dict]] = None) -> Dict[str, Dict]:
+        """
+        获取模块的全部字符串
+
+        第一页返回总页数时，其余各页由 page_workers 个线程并发请求；不知道总页数时按 page_workers 页一批
+        向后请求，直到出现空页。结果按字符串 ID 合并，与请求完成的顺序无关。
+
+        提供上一次的分页信息和翻译内容时，对每页发送带 ETag 的条件请求，
+        服务器返回 304 的页直接沿用上一次的条目；每页的 ETag 和条目键记录在 self.pages 中
+
+        Args:
+            module_id: 模块 ID
+            previous_pages: 上一次抓取的分页信息
+            previous_entries: 上一次抓取的所有翻译内容
+
+        Returns:
+            Dict[str, Dict]: 以原文输入框 ID 为键、按字符串 ID 排序的翻译条目
+        """
+        previous_pages = previous_pages or {}
+        previous_entries = previous_entries or {}
+        results: Dict[int, Tuple] = {}
+
+        def fetch(pages: List[int]):
+            if not pages:
+                return
+            with ThreadPoolExecutor(max_workers=min(self.page_workers, len(pages))) as executor:
+                futures = {page: executor.submit(self._fetch_page_entries, module_id, page,
+                                                 previous_pages, previous_entries) for page in pages}
+                for page, future in futures.items():
+                    results[page] = future.result()
+
+        fetch([1])
+        page_count = results[1][1]
+        last_page = 1
+        if results[1][0]:
+            if page_count is not None:
+                last_page = min(page_count, self.max_pages)
+                fetch(list(range(2, last_page + 1)))
+            else:
+                # 总页数未知：一批一批向后请求，遇到空页即停止
+                while last_page < self.max_pages:
+                    batch = list(range(last_page + 1, min(last_page + self.page_workers, self.max_pages) + 1))
+                    fetch(batch)
+                    empty = [page for page in batch if not results[page][0]]
+                    if empty:
+                        last_page = min(empty)
+                        break
+                    last_page = batch[-1]
+
+        pages = sorted(page for page in results if page <= last_page)
+        self.pages = {str(page): results[page][2] for page in pages}
+        self.not_modified_pages = sum(1 for page in pages if results[page][3])
+        return merge_pages([results[page][0] for page in pages])
+
+    def get_translations(self, game_id: str, incremental: bool = False) -> Optional[Dict]:
+        """
+        获取游戏的翻译内容，并写出与浏览器引擎相同的文件
+
+        Args:
+            game_id: 游戏ID
+            incremental: 是否增量抓取，跳过上次之后未变化的页，内容无变化时不重写翻译文件
+
+        Returns:
+            Optional[Dict]: 翻译内容，如果获取失败则返回 None
+        """
+        try:
+            logger.info(f"开始通过 HTTP 获取游戏 {game_id} 的翻译内容...")
+
+            game_info_path = Path(f"data/games/{game_id}/metadata/game_info.json")
+            if not game_info_path.exists():
+                logger.error(f"错误：找不到游戏信息文件 {game_info_path}")
+                return None
+
+            with open(game_info_path, 'r', encoding='utf-8') as f:
+                module_id = json.load(f).get('id')
+            if not module_id:
+                logger.error("错误：游戏信息中没有找到 module_id")
+                return None
+
+            translations_dir = Path(f"data/games/{game_id}/translations")
+            if incremental:
+                previous = load_fingerprints(translations_dir)
+                all_translations = self.fetch_all(module_id, previous["pages"], load_previous_translations(translations_dir))
+                logger.info(f"增量抓取：{len(self.pages)} 页中 {self.not_modified_pages} 页未变化")
+            else:
+                all_translations = self.fetch_all(module_id)
+            untranslated = derive_untranslated(all_translations)
+            logger.info(f"共获取 {len(all_translations)} 条翻译内容，其中 {len(untranslated)} 条未翻译")
+
+            store = TranslationStore.from_env()
+            try:
+                save_translation_snapshot(translations_dir, all_translations, untranslated, pages=self.pages,
+                                          force=not incremental, store=store, game=game_id, language=self.language)
+            finally:
+                if store is not None:
+                    store.close()
+
+            return {"all": all_translations, "untranslated": untranslated}
+
+        except Exception as e:
+            logger.error(f"通过 HTTP 获取翻译内容时发生错误: {str(e)}")
+            return None
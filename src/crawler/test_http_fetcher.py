@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+HTTP 抓取引擎离线测试脚本
+使用本地模拟服务器验证字符串接口的解析和分页
+
+用法:
+    python -m src.crawler.test_http_fetcher
+"""
+
+import json
+import logging
+import requests
+from src.bga_login import BGALogin
+from src.crawler.http_fetcher import HTTPTranslationFetcher, parse_module_strings
+from src.utils.fake_bga_server import FAKE_REQUEST_TOKEN, FakeBGAServer, make_strings
+
+def main():
+    # 配置日志
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    logger = logging.getLogger(__name__)
+    
+    strings = make_strings(250, translated_ratio=0.4)
+    
+    for response_format in ["json", "html"]:
+        with FakeBGAServer(strings, page_size=100, response_format=response_format) as server:
+            client = BGALogin(username="tester", password="secret", base_url=server.url)
+            fetcher = HTTPTranslationFetcher(client, min_interval=0)
+            
+            if not fetcher.login():
+                logger.error("登录模拟服务器失败")
+                continue
+            
+            entries = fetcher.fetch_all(module_id=1)
+            untranslated = [item for item in entries.values() if not item["translation"]]
+            page_requests = [path for method, path in server.requests if "getmodulestrings" in path]
+            
+            logger.info(f"[{response_format}] 共获取 {len(entries)} 条字符串，未翻译 {len(untranslated)} 条，请求 {len(page_requests)} 页")
+            if len(entries) != len(strings) or len(untranslated) != 150:
+                logger.error(f"[{response_format}] 解析结果与模拟数据不一致")
+
+def test_fetch_all_formats(tmp_path, monkeypatch):
+    """JSON 和 HTML 两种返回格式都能翻完所有分页"""
+    # 登录时会在当前目录保存登录页，切换到临时目录
+    monkeypatch.chdir(tmp_path)
+    strings = make_strings(250, translated_ratio=0.4)
+    for response_format in ["json", "html"]:
+        with FakeBGAServer(strings, page_size=100, response_format=response_format) as server:
+            client = BGALogin(username="tester", password="secret", base_url=server.url)
+            fetcher = HTTPTranslationFetcher(client, min_interval=0)
+            assert fetcher.login()
+            
+            entries = fetcher.fetch_all(module_id=1)
+            assert len(entries) == len(strings)
+            assert sum(1 for item in entries.values() if not item["translation"]) == 150
+
+def test_html_lookup_by_id():
+    """HTML 片段按 ID 查找出处和译文：translated_ 优先于 translation_，ID 重复时取第一个"""
+    html = (
+        '<textarea id="toTranslate_1">One</textarea><div id="context_1">ctx</div>'
+        '<textarea id="translation_1">旧</textarea><textarea id="translated_1">一</textarea>'
+        '<textarea id="toTranslate_2">Two</textarea><textarea id="translation_2">二</textarea>'
+        '<textarea id="translation_2">重复</textarea>'
+        '<textarea id="toTranslate_3"></textarea>'
+    )
+    entries, page_count = parse_module_strings(html)
+    assert page_count is None
+    assert entries == {
+        "toTranslate_1": {"original": "One", "context": "ctx", "translation": "一"},
+        "toTranslate_2": {"original": "Two", "context": "", "translation": "二"}
+    }
+
+def test_timeouts_are_retried(monkeypatch):
+    """请求带超时，超时与失败状态码一样重试"""
+    with FakeBGAServer(make_strings(30), page_size=100) as server:
+        client = BGALogin(username="tester", password="secret", base_url=server.url)
+        client.request_token = FAKE_REQUEST_TOKEN
+        client.retry_delay = 0
+        timeouts = []
+        original_get = client.session.get
+
+        def flaky_get(url, **kwargs):
+            timeouts.append(kwargs["timeout"])
+            if len(timeouts) == 1:
+                raise requests.Timeout("read timed out")
+            return original_get(url, **kwargs)
+
+        monkeypatch.setattr(client.session, "get", flaky_get)
+        entries = HTTPTranslationFetcher(client, min_interval=0).fetch_all(module_id=1)
+    assert len(entries) == 30
+    assert timeouts == [30, 30]
+
+def test_incremental(tmp_path, monkeypatch):
+    """增量抓取：未变化的页返回 304，修改一条译文并新增一条后只重新下载变化的页"""
+    # 抓取器按当前目录下的 data/games 读写，切换到临时目录，测试结束后自动恢复
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("TRANSLATION_STORE", "0")
+    game_id = "demo_incremental"
+    game_dir = tmp_path / "data/games" / game_id
+    (game_dir / "metadata").mkdir(parents=True)
+    (game_dir / "metadata/game_info.json").write_text(json.dumps({"id": 1}), encoding="utf-8")
+    
+    with FakeBGAServer(make_strings(250, translated_ratio=0.4), page_size=100) as server:
+        client = BGALogin(username="tester", password="secret", base_url=server.url)
+        fetcher = HTTPTranslationFetcher(client, min_interval=0)
+        assert fetcher.login()
+        
+        assert fetcher.get_translations(game_id, incremental=True)
+        assert fetcher.get_translations(game_id, incremental=True)
+        assert (fetcher.not_modified_pages, len(fetcher.pages)) == (3, 3)
+        
+        server.strings[120]["translation"] = "新的译文"
+        server.strings.append({"id": 9999, "original": "New string", "context": "", "translation": ""})
+        assert fetcher.get_translations(game_id, incremental=True)
+        delta = json.loads((game_dir / "translations/delta.json").read_text(encoding="utf-8"))
+        assert (fetcher.not_modified_pages, len(fetcher.pages)) == (1, 3)
+        assert len(delta["added"]) == 1
+        assert len(delta["changed"]) == 1
+
+if __name__ == "__main__":
+    main()
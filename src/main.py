@@ -6,12 +6,14 @@ BGA 翻译助手主程序
 """
 
 import os
+import sys
 import logging
 import argparse
 from pathlib import Path
-from .ocr import OCRManager
-from .bga_translator import BGATranslator
-from .submitter.translation_submitter import TranslationSubmitter
+from .utils.metrics import metrics
+
+# 各子命令依赖的模块（Playwright、mistralai、requests 等）在命令内部按需导入，
+# 避免 init-game 这类轻量命令承担全部依赖的导入开销
 
 # 配置日志
 logging.basicConfig(
@@ -35,11 +37,8 @@ class GameManager:
         self.rules_dir = self.base_dir / "rules"
         self.translations_dir = self.base_dir / "translations"
         self.metadata_dir = self.base_dir / "metadata"
-        
-        # 创建必要的目录
-        self._create_directories()
     
-    def _create_directories(self):
+    def create_directories(self):
         """创建必要的目录"""
         try:
             os.makedirs(self.rules_dir, exist_ok=True)
@@ -50,15 +49,18 @@ class GameManager:
             logger.error(f"创建游戏目录失败: {e}")
             raise
     
-    def fetch_game_info(self):
-        """获取游戏信息"""
+    def fetch_game_info(self, client=None):
+        """
+        获取游戏信息
+        
+        Args:
+            client: 共享的已登录 BGALogin 客户端，默认根据 .env 新建
+        """
         try:
-            # 初始化翻译器
-            translator = BGATranslator(self.game_name)
+            from .bga_translator import BGATranslator
             
-            # 登录 BGA
-            if not translator.login():
-                raise Exception("登录失败")
+            # 初始化翻译器；游戏信息只通过 HTTP 接口获取，update_game_info 会自行登录，无需启动浏览器
+            translator = BGATranslator(self.game_name, client=client)
             
             # 获取游戏信息
             if translator.update_game_info(self.game_name):
@@ -70,18 +72,46 @@ class GameManager:
             logger.error(f"获取游戏信息失败: {e}")
             raise
     
-    def fetch_translations(self):
-        """获取翻译内容"""
+    def fetch_translations(self, engine: str = "browser", wait_timeout: float = 15.0, headed: bool = False,
+                           client=None, incremental: bool = False, verify_untranslated: int = 0,
+                           page_workers: int = 4, max_pages: int = 1000):
+        """
+        获取翻译内容
+        
+        Args:
+            engine: 抓取引擎，browser 使用 Playwright，http 直接请求字符串接口
+            wait_timeout: 浏览器引擎等待页面就绪的上限（秒）
+            headed: 浏览器引擎是否以有头模式启动，默认由 BGA_HEADLESS 决定
+            client: 共享的已登录 BGALogin 客户端，默认根据 .env 新建
+            incremental: 是否增量抓取，跳过未变化的页，内容无变化时不重写翻译文件
+            verify_untranslated: 浏览器引擎抽样核对未翻译集合的条目数，0 表示不核对
+            page_workers: HTTP 引擎并发请求分页的线程数
+            max_pages: 最多抓取的页数
+        """
+        translator = None
         try:
             # 初始化翻译器
-            translator = BGATranslator(self.game_name)
+            if engine == "http":
+                from .crawler.http_fetcher import HTTPTranslationFetcher
+                options = {"page_workers": page_workers, "max_pages": max_pages}
+                translator = HTTPTranslationFetcher(client, **options) if client else \
+                    HTTPTranslationFetcher.from_env(**options)
+            else:
+                from .bga_translator import BGATranslator
+                translator = BGATranslator(self.game_name, wait_timeout_ms=int(wait_timeout * 1000),
+                                           headless=False if headed else None, client=client,
+                                           max_pages=max_pages)
             
             # 登录 BGA
             if not translator.login():
                 raise Exception("登录失败")
             
             # 获取翻译内容
-            translations = translator.get_translations(self.game_name)
+            if engine == "http":
+                translations = translator.get_translations(self.game_name, incremental=incremental)
+            else:
+                translations = translator.get_translations(self.game_name, incremental=incremental,
+                                                           verify_sample=verify_untranslated)
             if translations:
                 logger.info(f"成功获取游戏 {self.game_name} 的翻译内容")
                 return True
@@ -91,9 +121,22 @@ class GameManager:
         except Exception as e:
             logger.error(f"获取翻译内容失败: {e}")
             raise
+        finally:
+            if translator is not None and hasattr(translator, "close"):
+                translator.close()
     
-    def process_rulebook(self):
-        """处理规则书"""
+    def process_rulebook(self, workers: int = 4, rps: float = 0.2, max_in_flight: int = 2, use_cache: bool = True,
+                         ocr_manager=None):
+        """
+        处理规则书
+        
+        Args:
+            workers: 提取和预处理页面的进程数
+            rps: 每秒最多发起的 OCR 请求数
+            max_in_flight: 同时进行中的 OCR 请求上限
+            use_cache: 是否使用 OCR 结果缓存
+            ocr_manager: 共享的 OCR 管理器，批量处理时多个游戏共用同一个 OCR 限速，默认新建
+        """
         try:
             # 检查规则书是否存在
             rulebook_path = self.rules_dir / "original.pdf"
@@ -101,7 +144,9 @@ class GameManager:
                 raise FileNotFoundError(f"规则书不存在: {rulebook_path}")
             
             # 初始化 OCR 管理器
-            ocr_manager = OCRManager()
+            if ocr_manager is None:
+                from .ocr import OCRManager
+                ocr_manager = OCRManager(workers=workers, rps=rps, max_in_flight=max_in_flight, use_cache=use_cache)
             
             # 处理规则书
             logger.info("开始处理规则书...")
@@ -118,22 +163,303 @@ class GameManager:
             logger.error(f"处理规则书失败: {e}")
             raise
 
-def submit_translations(args):
-    """提交翻译内容到BGA平台"""
+def submit_translations(args) -> bool:
+    """
+    提交翻译内容到BGA平台
+    
+    Returns:
+        bool: 是否全部提交成功；占位符检查拦下或有条目提交失败时返回 False
+    """
     try:
         logger.info(f"开始提交游戏 {args.game_name} 的翻译内容...")
-        submitter = TranslationSubmitter(args.game_name)
-        if submitter.submit_translations():
+        if args.engine == "http":
+            from .submitter.http_submitter import HTTPTranslationSubmitter
+            submitter = HTTPTranslationSubmitter.from_env(
+                args.game_name,
+                workers=args.workers,
+                rps=args.rps,
+                restart=args.restart,
+                table_path=args.table,
+                tm_threshold=args.tm_threshold,
+                check_placeholders=not args.skip_placeholder_check
+            )
+        else:
+            from .submitter.translation_submitter import TranslationSubmitter
+            submitter = TranslationSubmitter(
+                args.game_name,
+                wait_timeout_ms=int(args.wait_timeout * 1000),
+                mode=args.mode,
+                batch_size=args.batch_size,
+                max_per_minute=args.max_per_minute,
+                restart=args.restart,
+                headless=False if args.headed else None,
+                table_path=args.table,
+                tm_threshold=args.tm_threshold,
+                check_placeholders=not args.skip_placeholder_check
+            )
+        succeeded = submitter.submit_translations()
+        if succeeded:
             logger.info("翻译提交成功！")
         else:
             logger.error("翻译提交失败，请查看日志了解详情。")
+        return bool(succeeded)
     except Exception as e:
         logger.error(f"提交翻译时发生错误: {e}")
         raise
 
+def add_async_arguments(command_parser):
+    """为 fetch-translation 和 submit-translations 添加异步引擎的参数"""
+    command_parser.add_argument("--async", dest="use_async", action="store_true",
+                                help="使用异步浏览器引擎：一个浏览器同时打开多个翻译页面，并发处理所有列出的游戏")
+    command_parser.add_argument("--concurrency", type=int, default=4, help="--async 时同时打开的翻译页面数（默认 4）")
+    command_parser.add_argument("--task-timeout", type=float, default=0,
+                                help="--async 时每个游戏的超时（秒），超时后取消该游戏，0 表示不限")
+
+def run_async_engine(args) -> bool:
+    """
+    用异步浏览器引擎并发抓取或提交多个游戏
+    
+    Returns:
+        bool: 是否所有游戏都成功完成；有游戏出错、超时被取消或提交失败时返回 False
+    """
+    from .async_engine import run_games
+    games = [args.game_name] + args.more_games
+    if args.command == "fetch-translation":
+        action = "fetch"
+        options = {"incremental": args.incremental}
+    else:
+        action = "submit"
+        options = {"restart": args.restart, "table_path": args.table, "tm_threshold": args.tm_threshold,
+                   "check_placeholders": not args.skip_placeholder_check, "batch_size": args.batch_size}
+        if args.table and len(games) > 1:
+            raise ValueError("--table 只能用于单个游戏")
+    
+    logger.info(f"异步引擎开始处理 {len(games)} 个游戏，同时打开 {args.concurrency} 个页面")
+    results = run_games(action, games, pages=args.concurrency, rps=args.rps, task_timeout=args.task_timeout or None,
+                        wait_timeout_ms=int(args.wait_timeout * 1000), headless=False if args.headed else None,
+                        max_pages=getattr(args, "max_pages", 1000), **options)
+    for game, result, error in results:
+        if error is not None:
+            logger.error(f"{game}: 失败: {error}")
+        elif result is False:
+            logger.error(f"{game}: 翻译提交失败，请查看日志了解详情。")
+        else:
+            logger.info(f"{game}: 完成")
+    return all(error is None and result is not False for _, result, error in results)
+
+def ocr_cache_command(args):
+    """查看或清理 OCR 结果缓存"""
+    from .ocr.ocr_cache import OCRCache
+    cache = OCRCache.from_env() or OCRCache()
+    if args.action == "stats":
+        stats = cache.stats()
+        logger.info(f"OCR 缓存目录: {stats['dir']}")
+        logger.info(f"条目数: {stats['entries']}，占用 {stats['bytes'] / 1024 / 1024:.1f} MB / 上限 {stats['max_bytes'] / 1024 / 1024:.0f} MB")
+        if stats["entries"]:
+            logger.info(f"最早使用: {stats['oldest']}，最近使用: {stats['newest']}")
+    else:
+        removed = cache.purge(args.older_than)
+        logger.info(f"已删除 {removed} 条 OCR 缓存")
+
+def store_command(args):
+    """导入、导出或查看翻译数据库"""
+    from .batch_runner import resolve_games
+    from .translator.store import TranslationStore
+    with TranslationStore(args.db or os.getenv("TRANSLATION_STORE_PATH", "data/translations.db")) as store:
+        if args.action == "stats":
+            rows = store.stats(args.language)
+            for row in rows:
+                logger.info(f"{row['game']}: 共 {row['strings']} 条，已翻译 {row['translated']} 条，"
+                            f"已确认提交 {row['confirmed']} 条")
+            if not rows:
+                logger.info("翻译数据库为空")
+            return
+
+        if args.games:
+            games = resolve_games(args.games)
+        else:
+            # 导入默认处理 data/games 下的所有游戏，导出默认处理数据库中的所有游戏
+            games = resolve_games(["*"]) if args.action == "import" else store.games()
+        for game in games:
+            translations_dir = Path(f"data/games/{game}/translations")
+            if args.action == "import":
+                if not (translations_dir / "all_translations.json").exists():
+                    logger.warning(f"跳过 {game}：没有 all_translations.json")
+                    continue
+                store.import_game(game, translations_dir, args.language)
+            else:
+                output_dir = Path(args.output) / game if args.output else translations_dir
+                with metrics.span("export", game=game):
+                    if args.format == "tables":
+                        store.export_game(game, output_dir, args.language)
+                    else:
+                        name = "untranslated" if args.untranslated else "all_translations"
+                        path = output_dir / f"{name}.{args.format}"
+                        count = store.export_file(game, path, args.format, args.language,
+                                                  untranslated_only=args.untranslated)
+                        logger.info(f"已导出 {game} 的 {count} 条到 {path}")
+
+def tm_command(args):
+    """建立或查询翻译记忆"""
+    from .translator.translation_memory import build_memory, load_memory
+    if args.action == "build":
+        build_memory(args.games_dir, args.index)
+        return
+    
+    if not args.text:
+        raise ValueError("query 需要提供要查询的原文")
+    tm = load_memory(args.games_dir, args.index)
+    matches = tm.query(args.text, k=args.top, min_score=args.min_score)
+    if not matches:
+        logger.info("没有找到相似的译文")
+    for match in matches:
+        logger.info(f"[{match['score']:.2f}] {match['original']} -> {match['translation']}"
+                    f"（{', '.join(match['games'][:3])}{' 等' if len(match['games']) > 3 else ''}）")
+
+def glossary_command(args):
+    """检查译文是否使用了术语表规定的译法"""
+    from itertools import chain
+    from .batch_runner import resolve_games
+    from .translator.glossary import Glossary, iter_game_pairs, iter_table_pairs, write_report
+    glossary = Glossary.load(args.glossary)
+    sources = []
+    if args.table:
+        sources.append(iter_table_pairs(args.table))
+    if args.games or not args.table:
+        games = resolve_games(args.games or ["*"], args.games_dir)
+        sources.append(iter_game_pairs(games, args.games_dir))
+    report = glossary.check(chain.from_iterable(sources))
+    path = write_report(report, args.output)
+    logger.info(f"检查 {report['checked']} 条译文，{report['inconsistent']} 条未使用规定译法，"
+                f"耗时 {report['seconds']} 秒，报告已保存至 {path}")
+    for term, count in list(report["by_term"].items())[:args.top]:
+        logger.info(f"  {term}: {count} 条")
+    return report["inconsistent"] == 0
+
+def placeholders_command(args):
+    """检查译文的占位符和标签是否与原文一致"""
+    from itertools import chain
+    from .batch_runner import resolve_games
+    from .translator.glossary import iter_game_pairs, iter_table_pairs
+    from .translator.placeholders import check_pairs, log_issues, write_report
+    sources = []
+    if args.table:
+        sources.append(iter_table_pairs(args.table))
+    if args.games or not args.table:
+        games = resolve_games(args.games or ["*"], args.games_dir)
+        sources.append(iter_game_pairs(games, args.games_dir))
+    report = check_pairs(chain.from_iterable(sources))
+    path = write_report(report, args.output)
+    logger.info(f"检查 {report['checked']} 条译文，{report['mismatched']} 条占位符或标签不一致，"
+                f"耗时 {report['seconds']} 秒，报告已保存至 {path}")
+    log_issues(report)
+    return report["mismatched"] == 0
+
+def batch_command(args):
+    """对多个游戏批量执行同一个步骤"""
+    from .batch_runner import BatchRunner, resolve_games
+    patterns = list(args.games)
+    if args.games_file:
+        with open(args.games_file, "r", encoding="utf-8") as f:
+            patterns.extend(f.read().splitlines())
+    games = resolve_games(patterns)
+    if not games:
+        raise ValueError("没有需要处理的游戏")
+    
+    runner = BatchRunner(
+        args.step,
+        games,
+        workers=args.workers,
+        rps=args.rps,
+        engine=args.engine,
+        submit_workers=args.submit_workers,
+        restart=args.restart,
+        report_path=args.report,
+        incremental=args.incremental,
+        page_workers=args.page_workers
+    )
+    report = runner.run()
+    return report["failed"] == 0
+
+def run_command(args, parser) -> bool:
+    """
+    执行解析好的子命令
+    
+    Returns:
+        bool: 命令是否通过；检查类命令发现问题时返回 False，main 以非零状态退出
+    """
+    if args.command == "ocr-cache":
+        ocr_cache_command(args)
+        return
+    
+    if args.command == "store":
+        store_command(args)
+        return
+    
+    if args.command == "tm":
+        tm_command(args)
+        return
+    
+    if args.command == "glossary":
+        return glossary_command(args)
+    
+    if args.command == "placeholders":
+        return placeholders_command(args)
+    
+    if args.command == "batch":
+        return batch_command(args)
+    
+    if not args.command:
+        parser.print_help()
+        return
+    
+    if getattr(args, "more_games", None) and not args.use_async:
+        parser.error("同时处理多个游戏需要 --async")
+    
+    if getattr(args, "use_async", False):
+        return run_async_engine(args)
+    
+    game_manager = GameManager(args.game_name)
+    
+    if args.command == "init-game":
+        game_manager.create_directories()
+        logger.info(f"游戏 {args.game_name} 初始化完成")
+        
+    elif args.command == "process-rulebook":
+        game_manager.process_rulebook(workers=args.workers, rps=args.rps, max_in_flight=args.max_in_flight,
+                                      use_cache=not args.no_cache)
+        
+    elif args.command == "fetch-game-info":
+        game_manager.fetch_game_info()
+        
+    elif args.command == "fetch-translation":
+        game_manager.fetch_translations(engine=args.engine, wait_timeout=args.wait_timeout, headed=args.headed,
+                                       incremental=args.incremental,
+                                       verify_untranslated=args.verify_untranslated,
+                                       page_workers=args.page_workers, max_pages=args.max_pages)
+        
+    elif args.command == "submit-translations":
+        return submit_translations(args)
+        
+    else:
+        parser.print_help()
+
 def main():
     """主函数"""
+    # 在构建解析器之前开始统计，使参数解析和 --debug-dom 等早期导入也计入耗时
+    profiler = None
+    if "--profile-startup" in sys.argv[1:]:
+        from .utils.startup_profile import ImportProfiler
+        profiler = ImportProfiler().install()
+    
     parser = argparse.ArgumentParser(description="BGA 翻译助手")
+    parser.add_argument("--profile-startup", action="store_true", help="命令结束后输出各模块的导入耗时")
+    parser.add_argument("--trace", action="store_true",
+                        help="把各阶段的耗时写入 JSON Lines 跟踪文件，并在结束时输出按阶段汇总的耗时")
+    parser.add_argument("--trace-file", help="跟踪文件路径，默认为 data/traces/<命令>-<时间>.jsonl")
+    parser.add_argument("--debug-dom", action="store_true",
+                        help="页面跳转失败时在日志中输出整页 HTML（也可设置 BGA_DEBUG_DOM=1），默认不读取页面 HTML")
+    parser.add_argument("--metrics-file", help="结束时把各阶段耗时和计数器以 Prometheus 文本格式写入该文件")
     subparsers = parser.add_subparsers(dest="command", help="命令")
     
     # 初始化游戏命令
@@ -143,6 +469,15 @@ def main():
     # 处理规则书命令
     process_parser = subparsers.add_parser("process-rulebook", help="处理规则书")
     process_parser.add_argument("game_name", help="游戏名称")
+    process_parser.add_argument("--workers", type=int, default=4, help="提取和预处理页面的进程数")
+    process_parser.add_argument("--rps", type=float, default=0.2, help="每秒最多发起的 OCR 请求数（默认每 5 秒一次）")
+    process_parser.add_argument("--max-in-flight", type=int, default=2, help="同时进行中的 OCR 请求上限")
+    process_parser.add_argument("--no-cache", action="store_true", help="不使用 OCR 结果缓存")
+    
+    # OCR 缓存管理命令
+    ocr_cache_parser = subparsers.add_parser("ocr-cache", help="查看或清理 OCR 结果缓存")
+    ocr_cache_parser.add_argument("action", choices=["stats", "purge"], help="stats 查看统计，purge 清理缓存")
+    ocr_cache_parser.add_argument("--older-than", type=float, default=None, help="purge 时只删除超过指定天数未使用的条目")
     
     # 获取游戏信息命令
     fetch_info_parser = subparsers.add_parser("fetch-game-info", help="获取游戏信息")
@@ -151,37 +486,143 @@ def main():
     # 获取翻译内容命令
     fetch_trans_parser = subparsers.add_parser("fetch-translation", help="获取翻译内容")
     fetch_trans_parser.add_argument("game_name", help="游戏名称")
+    fetch_trans_parser.add_argument("more_games", nargs="*", metavar="GAME", help="--async 时同时抓取的其他游戏")
+    fetch_trans_parser.add_argument("--engine", choices=["browser", "http"], default="browser",
+                                    help="抓取引擎：browser 使用浏览器，http 直接请求接口（无需浏览器）")
+    fetch_trans_parser.add_argument("--wait-timeout", type=float, default=15.0, help="等待页面就绪的上限（秒）")
+    fetch_trans_parser.add_argument("--incremental", action="store_true",
+                                    help="增量抓取：HTTP 引擎跳过未变化的页，内容无变化时不重写翻译文件")
+    fetch_trans_parser.add_argument("--verify-untranslated", type=int, default=0, metavar="N",
+                                    help="浏览器引擎额外加载未翻译视图，抽样核对 N 条本地筛选结果（默认不核对）")
+    fetch_trans_parser.add_argument("--page-workers", type=int, default=4,
+                                    help="HTTP 引擎并发请求分页的线程数（默认 4）")
+    fetch_trans_parser.add_argument("--max-pages", type=int, default=1000, help="最多抓取的页数（默认 1000）")
+    fetch_trans_parser.add_argument("--headed", action="store_true", help="以有头模式启动浏览器，便于观察（默认无头）")
+    add_async_arguments(fetch_trans_parser)
+    fetch_trans_parser.add_argument("--rps", type=float, default=2.0, help="--async 时所有页面共享的每秒跳转和翻页上限")
     
     # 添加提交翻译命令
     submit_parser = subparsers.add_parser('submit-translations', help='提交翻译内容')
     submit_parser.add_argument('game_name', help='游戏名称')
+    submit_parser.add_argument('more_games', nargs='*', metavar='GAME', help='--async 时同时提交的其他游戏')
+    submit_parser.add_argument('--engine', choices=['browser', 'http'], default='browser',
+                               help='提交引擎：browser 在页面中填写，http 直接调用保存接口（实验性，无需浏览器）')
+    submit_parser.add_argument('--workers', type=int, default=4, help='HTTP 引擎的并发工作线程数')
+    submit_parser.add_argument('--rps', type=float, default=2.0, help='HTTP 引擎每秒最多请求数；--async 时为所有页面共享的每秒填写和翻页上限')
+    resume_group = submit_parser.add_mutually_exclusive_group()
+    resume_group.add_argument('--resume', dest='restart', action='store_false',
+                              help='跳过提交日志中已确认的条目，从中断处继续（默认）')
+    resume_group.add_argument('--restart', dest='restart', action='store_true',
+                              help='清空提交日志，从头提交')
+    submit_parser.add_argument('--table', help='填写好译文的翻译表，支持 .md/.csv/.tsv/.jsonl/.xliff，默认为 untranslated.md')
+    submit_parser.add_argument('--tm-threshold', type=float, default=None, metavar='SCORE',
+                               help='对照表中没有译文的条目，使用相似度不低于 SCORE（0-1，建议 0.9 以上）的翻译记忆译文')
+    submit_parser.add_argument('--skip-placeholder-check', action='store_true',
+                               help='不检查译文的占位符和标签是否与原文一致（默认不一致时停止提交）')
+    submit_parser.add_argument('--wait-timeout', type=float, default=15.0, help='等待页面就绪的上限（秒）')
+    submit_parser.add_argument('--headed', action='store_true', help='以有头模式启动浏览器，便于观察（默认无头）')
+    submit_parser.add_argument('--mode', choices=['sequential', 'batch'], default='sequential',
+                               help='填写模式：sequential 逐条填写，batch 在页面内批量填写')
+    submit_parser.add_argument('--batch-size', type=int, default=20, help='批量模式下每批同时写入的条数')
+    submit_parser.add_argument('--max-per-minute', type=int, default=300, help='批量模式下每分钟最多填写的条数')
+    add_async_arguments(submit_parser)
     submit_parser.set_defaults(func=submit_translations)
     
+    # 翻译数据库命令
+    store_parser = subparsers.add_parser("store", help="导入、导出或查看翻译数据库")
+    store_parser.add_argument("action", choices=["import", "export", "stats"],
+                              help="import 导入已有的 JSON 文件，export 从数据库生成 JSON/Markdown 对照表，stats 查看统计")
+    store_parser.add_argument("games", nargs="*", help="游戏名或通配符，默认为所有游戏")
+    store_parser.add_argument("--db", help="数据库路径，默认读取 TRANSLATION_STORE_PATH（未设置时为 data/translations.db）")
+    store_parser.add_argument("--language", default="zh", help="译文语言")
+    store_parser.add_argument("--output", help="export 的输出目录，默认写回各游戏的 translations 目录")
+    store_parser.add_argument("--format", choices=["tables", "json", "md", "jsonl"], default="tables",
+                              help="export 的格式：tables 生成全部四个对照文件（默认），json/md/jsonl 只导出一个文件")
+    store_parser.add_argument("--untranslated", action="store_true", help="export 单个文件时只导出未翻译条目")
+    
+    # 翻译记忆命令
+    tm_parser = subparsers.add_parser("tm", help="建立或查询翻译记忆")
+    tm_parser.add_argument("action", choices=["build", "query"], help="build 根据所有游戏的译文建立索引，query 查询相似译文")
+    tm_parser.add_argument("text", nargs="?", help="query 时要查询的原文")
+    tm_parser.add_argument("-k", "--top", type=int, default=5, help="最多返回的条数")
+    tm_parser.add_argument("--min-score", type=float, default=0.5, help="最低相似度（0-1）")
+    tm_parser.add_argument("--games-dir", default="data/games", help="游戏数据目录")
+    tm_parser.add_argument("--index", default="data/tm/index.json", help="索引文件路径")
+    
+    # 术语检查命令
+    glossary_parser = subparsers.add_parser("glossary", help="检查译文是否使用了术语表规定的译法")
+    glossary_parser.add_argument("action", choices=["check"], help="check 检查译文并生成报告")
+    glossary_parser.add_argument("games", nargs="*", help="游戏名或通配符，默认为所有游戏（指定 --table 时默认不检查游戏）")
+    glossary_parser.add_argument("--glossary", default="data/glossary.md",
+                                 help="术语表，原文列为术语、译文列为规定译法（多个可接受的译法用 / 分隔）")
+    glossary_parser.add_argument("--table", help="同时检查一个已填写的翻译表")
+    glossary_parser.add_argument("--games-dir", default="data/games", help="游戏数据目录")
+    glossary_parser.add_argument("--output", default="data/glossary_report.json", help="报告路径")
+    glossary_parser.add_argument("--top", type=int, default=20, help="日志中列出问题最多的术语数")
+    
+    # 占位符检查命令
+    placeholders_parser = subparsers.add_parser("placeholders", help="检查译文的占位符和标签是否与原文一致")
+    placeholders_parser.add_argument("action", choices=["check"], help="check 检查译文并生成报告")
+    placeholders_parser.add_argument("games", nargs="*", help="游戏名或通配符，默认为所有游戏（指定 --table 时默认不检查游戏）")
+    placeholders_parser.add_argument("--table", help="同时检查一个已填写的翻译表")
+    placeholders_parser.add_argument("--games-dir", default="data/games", help="游戏数据目录")
+    placeholders_parser.add_argument("--output", default="data/placeholder_report.json", help="报告路径")
+    
+    # 批量执行命令
+    batch_parser = subparsers.add_parser("batch", help="对多个游戏批量执行同一个步骤")
+    batch_parser.add_argument("step", choices=["fetch-game-info", "fetch-translation", "submit", "process-rulebook"],
+                              help="执行的步骤")
+    batch_parser.add_argument("games", nargs="*", help="游戏名或通配符（如 'a*'，按 data/games 下的目录匹配）")
+    batch_parser.add_argument("--games-file", help="游戏列表文件，每行一个游戏名或通配符")
+    batch_parser.add_argument("--workers", type=int, default=4,
+                              help="同时处理的游戏数；--engine browser 的 fetch-translation 和 submit 逐个处理")
+    batch_parser.add_argument("--rps", type=float, default=2.0, help="所有游戏共享的每秒请求上限（仅 HTTP 请求）")
+    batch_parser.add_argument("--engine", choices=["http", "browser"], default="http",
+                              help="fetch-translation 和 submit 使用的引擎")
+    batch_parser.add_argument("--submit-workers", type=int, default=2, help="HTTP 提交时每个游戏内部的并发数")
+    batch_parser.add_argument("--restart", action="store_true", help="submit 时清空提交日志从头提交")
+    batch_parser.add_argument("--incremental", action="store_true", help="fetch-translation 时增量抓取")
+    batch_parser.add_argument("--page-workers", type=int, default=2,
+                              help="fetch-translation 时每个游戏内部并发请求分页的线程数")
+    batch_parser.add_argument("--report", help="汇总报告路径，默认写入 data/batch/")
+    
     args = parser.parse_args()
     
-    try:
-        game_manager = GameManager(args.game_name)
-        
-        if args.command == "init-game":
-            logger.info(f"游戏 {args.game_name} 初始化完成")
-            
-        elif args.command == "process-rulebook":
-            game_manager.process_rulebook()
-            
-        elif args.command == "fetch-game-info":
-            game_manager.fetch_game_info()
-            
-        elif args.command == "fetch-translation":
-            game_manager.fetch_translations()
-            
-        elif args.command == "submit-translations":
-            submit_translations(args)
-            
+    if profiler:
+        # 参数值恰好是 --profile-startup 时并未启用该选项
+        if args.profile_startup:
+            profiler.mark("参数解析")
         else:
-            parser.print_help()
-            
+            profiler.uninstall()
+            profiler = None
+    
+    if args.debug_dom:
+        from .utils.log_policy import enable_dom_dump
+        enable_dom_dump()
+    
+    if args.trace or args.trace_file:
+        import time
+        metrics.configure(args.trace_file or f"data/traces/{args.command or 'main'}-{time.strftime('%Y%m%d-%H%M%S')}.jsonl")
+    
+    succeeded = True
+    try:
+        with metrics.span(args.command or "main"):
+            succeeded = run_command(args, parser) is not False
     except Exception as e:
         logger.error(f"操作失败: {e}")
+    finally:
+        if profiler:
+            profiler.mark(args.command or "无命令")
+            profiler.uninstall()
+            print(profiler.report(), file=sys.stderr)
+        metrics.close()
+        if args.metrics_file:
+            metrics.write_prometheus(args.metrics_file)
+        if args.trace or args.trace_file:
+            print(metrics.summary(), file=sys.stderr)
+            print(f"跟踪文件: {metrics.trace_path}", file=sys.stderr)
+    if not succeeded:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -6,18 +6,45 @@ OCR 模块入口
 提供统一的 OCR 处理接口
 """
 
-from .pdf_processor import PDFProcessor
-from .ocr_processor import OCRProcessor
-from .text_formatter import TextFormatter
+import importlib
+
+# 子模块按需导入：导入 src.ocr 或其中的 ocr_cache 时不会加载 mistralai、PyPDF2 等重量级依赖
+_LAZY_ATTRS = {
+    "PDFProcessor": ".pdf_processor",
+    "OCRProcessor": ".ocr_processor",
+    "TextFormatter": ".text_formatter",
+    "OCRPipeline": ".pipeline",
+    "OCRCache": ".ocr_cache",
+}
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module_name, __name__), name)
 
 class OCRManager:
     """OCR 管理器类"""
     
-    def __init__(self):
-        """初始化 OCR 管理器"""
+    def __init__(self, workers: int = 4, rps: float = 0.2, max_in_flight: int = 2, use_cache: bool = True):
+        """
+        初始化 OCR 管理器
+        
+        Args:
+            workers: 提取和预处理页面的进程数
+            rps: 每秒最多发起的 OCR 请求数
+            max_in_flight: 同时进行中的 OCR 请求上限
+            use_cache: 是否使用 OCR 结果缓存
+        """
+        from .ocr_processor import OCRProcessor
+        from .text_formatter import TextFormatter
+        from .pipeline import OCRPipeline
+        from .ocr_cache import OCRCache
+        
         self.pdf_processor = None
-        self.ocr_processor = OCRProcessor()
+        self.ocr_processor = OCRProcessor(cache=OCRCache.from_env() if use_cache else None)
         self.text_formatter = TextFormatter()
+        self.pipeline = OCRPipeline(self.ocr_processor, workers=workers, rps=rps, max_in_flight=max_in_flight)
     
     def process_pdf(self, pdf_path: str) -> str:
         """
@@ -30,24 +57,9 @@ class OCRManager:
             str: 提取并格式化后的文本
         """
         try:
-            # 初始化 PDF 处理器
-            self.pdf_processor = PDFProcessor(pdf_path)
-            
-            # 获取总页数
-            total_pages = self.pdf_processor.get_page_count()
-            
-            # 处理每一页
+            # 并发提取、预处理并识别各页，结果按页码排序
             all_text = []
-            for page_num in range(total_pages):
-                # 尝试直接提取文本
-                text = self.pdf_processor.extract_text(page_num)
-                
-                # 如果文本为空，尝试使用 OCR
-                if not text.strip():
-                    image = self.pdf_processor.extract_page_image(page_num)
-                    if image:
-                        text = self.ocr_processor.process_image(image)
-                
+            for page_num, text in self.pipeline.run(pdf_path):
                 # 格式化文本
                 if text:
                     formatted_text = self.text_formatter.format_text(text)
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+OCR 结果缓存模块
+以预处理后 PNG 内容、模型名称和预处理参数的哈希为键，把 OCR 结果保存到磁盘，重复处理相同页面时无需再次调用接口
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = "data/cache/ocr"
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+class OCRCache:
+    """按内容寻址的 OCR 结果缓存"""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        初始化缓存
+
+        Args:
+            cache_dir: 缓存目录
+            max_bytes: 缓存总大小上限，超出时按最近使用时间淘汰
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._total_bytes: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional["OCRCache"]:
+        """
+        根据环境变量创建缓存
+
+        OCR_CACHE=0 时禁用缓存；OCR_CACHE_DIR 指定目录；OCR_CACHE_MAX_MB 指定大小上限（MB）
+
+        Returns:
+            Optional[OCRCache]: 缓存实例，禁用时返回 None
+        """
+        if os.getenv("OCR_CACHE", "1") == "0":
+            return None
+        max_mb = float(os.getenv("OCR_CACHE_MAX_MB", DEFAULT_MAX_BYTES / 1024 / 1024))
+        return cls(os.getenv("OCR_CACHE_DIR", DEFAULT_CACHE_DIR), max_bytes=int(max_mb * 1024 * 1024))
+
+    @staticmethod
+    def make_key(png_bytes: bytes, model: str, params: Dict) -> str:
+        """
+        计算缓存键
+
+        Args:
+            png_bytes: 预处理后的 PNG 字节
+            model: OCR 模型名称
+            params: 预处理参数
+
+        Returns:
+            str: 十六进制 sha256 摘要
+        """
+        digest = hashlib.sha256(png_bytes)
+        digest.update(b"\0" + model.encode("utf-8"))
+        digest.update(b"\0" + json.dumps(params, sort_keys=True).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _entries(self) -> List[Path]:
+        if not self.cache_dir.exists():
+            return []
+        return list(self.cache_dir.glob("*/*.json"))
+
+    def get(self, key: str) -> Optional[Tuple[str, List[str]]]:
+        """
+        读取缓存
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            Optional[Tuple[str, List[str]]]: (markdown 文本, 图像描述列表)，未命中时返回 None
+        """
+        path = self._path(key)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        # 更新修改时间作为最近使用时间，供淘汰时排序
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return data["markdown"], data.get("image_descriptions", [])
+
+    def put(self, key: str, markdown: str, image_descriptions: List[str], model: str = ""):
+        """
+        写入缓存，必要时淘汰最久未使用的条目
+
+        Args:
+            key: 缓存键
+            markdown: OCR 返回的 markdown 文本
+            image_descriptions: 图像描述列表
+            model: OCR 模型名称，仅用于记录
+        """
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = json.dumps({
+            "markdown": markdown,
+            "image_descriptions": image_descriptions,
+            "model": model,
+            "created_at": round(time.time(), 3)
+        }, ensure_ascii=False).encode("utf-8")
+
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(payload)
+
+        with self._lock:
+            # 覆盖已有条目时先减去旧文件的大小，否则重复写入同一个键会让统计的总大小只增不减
+            try:
+                replaced_bytes = path.stat().st_size
+            except OSError:
+                replaced_bytes = 0
+            os.replace(tmp_path, path)
+            if self._total_bytes is None:
+                self._total_bytes = sum(p.stat().st_size for p in self._entries())
+            else:
+                self._total_bytes += len(payload) - replaced_bytes
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """按最近使用时间淘汰条目，直到总大小降到上限的 90% 以下"""
+        entries = []
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        removed = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        self._total_bytes = total
+        if removed:
+            logger.info(f"OCR 缓存超过上限，已淘汰 {removed} 条")
+
+    def stats(self) -> Dict:
+        """
+        统计缓存信息
+
+        Returns:
+            Dict: 包含 entries、bytes、max_bytes、oldest、newest
+        """
+        entries = self._entries()
+        mtimes = [p.stat().st_mtime for p in entries]
+        return {
+            "dir": str(self.cache_dir),
+            "entries": len(entries),
+            "bytes": sum(p.stat().st_size for p in entries),
+            "max_bytes": self.max_bytes,
+            "oldest": time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(min(mtimes))) if mtimes else None,
+            "newest": time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(max(mtimes))) if mtimes else None
+        }
+
+    def purge(self, older_than_days: Optional[float] = None) -> int:
+        """
+        清理缓存
+
+        Args:
+            older_than_days: 只删除超过指定天数未使用的条目，None 表示全部删除
+
+        Returns:
+            int: 删除的条目数
+        """
+        cutoff = time.time() - older_than_days * 86400 if older_than_days is not None else None
+        removed = 0
+        for path in self._entries():
+            try:
+                if cutoff is None or path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                continue
+        with self._lock:
+            self._total_bytes = None
+        return removed
@@ -14,28 +14,81 @@ import io
 from pathlib import Path
 from typing import Optional, Tuple, List
 from PIL import Image
-from mistralai import Mistral
 from PIL import ImageEnhance
 from dotenv import load_dotenv
+from .ocr_cache import OCRCache
+from ..utils.metrics import metrics
 
 # 加载环境变量
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_OCR_MODEL = "mistral-ocr-latest"
+
+# 预处理参数，参与 OCR 缓存键的计算
+PREPROCESS_PARAMS = {"mode": "L", "contrast": 2.0, "brightness": 1.5}
+
+def preprocess_image(image: Image.Image) -> Image.Image:
+    """
+    图像预处理
+    
+    Args:
+        image: 原始图像
+        
+    Returns:
+        Image.Image: 预处理后的图像
+    """
+    # 转换为灰度图像
+    if image.mode != PREPROCESS_PARAMS["mode"]:
+        image = image.convert(PREPROCESS_PARAMS["mode"])
+    
+    # 增强对比度
+    enhancer = ImageEnhance.Contrast(image)
+    image = enhancer.enhance(PREPROCESS_PARAMS["contrast"])  # 增强对比度
+    
+    # 增强亮度
+    enhancer = ImageEnhance.Brightness(image)
+    image = enhancer.enhance(PREPROCESS_PARAMS["brightness"])  # 增强亮度
+    
+    return image
+
+def encode_png(image: Image.Image) -> bytes:
+    """
+    将图像编码为 PNG 字节
+    
+    Args:
+        image: 图像
+        
+    Returns:
+        bytes: PNG 字节
+    """
+    img_byte_arr = io.BytesIO()
+    image.save(img_byte_arr, format='PNG')
+    return img_byte_arr.getvalue()
+
 class OCRProcessor:
     """OCR 处理器类"""
     
-    def __init__(self):
-        """初始化 OCR 处理器"""
+    def __init__(self, model: str = DEFAULT_OCR_MODEL, cache: Optional[OCRCache] = None):
+        """
+        初始化 OCR 处理器
+        
+        Args:
+            model: Mistral OCR 模型名称
+            cache: OCR 结果缓存，None 表示不使用缓存
+        """
         try:
             # 获取 API 密钥
             api_key = os.getenv("MISTRAL_API_KEY")
             if not api_key:
                 raise ValueError("未设置 MISTRAL_API_KEY 环境变量，请在 .env 文件中配置")
             
-            # 初始化 Mistral 客户端
-            self.client = Mistral(api_key=api_key)
+            # Mistral 客户端在首次调用接口时才创建，全部命中缓存时无需加载 mistralai
+            self._api_key = api_key
+            self._client = None
+            self.model = model
+            self.cache = cache
             logger.info("OCR 处理器初始化完成")
             
             # 初始化请求计时器
@@ -46,6 +99,14 @@ class OCRProcessor:
             logger.error(f"OCR 处理器初始化失败: {e}")
             raise
     
+    @property
+    def client(self):
+        """Mistral 客户端，首次使用时创建"""
+        if self._client is None:
+            from mistralai import Mistral
+            self._client = Mistral(api_key=self._api_key)
+        return self._client
+    
     def process_image(self, image: Image.Image, page_number: int) -> Tuple[Optional[str], List[str]]:
         """
         处理图像并提取文本和图像信息
@@ -58,6 +119,11 @@ class OCRProcessor:
             Tuple[Optional[str], List[str]]: (提取的文本, 图像描述列表)
         """
         try:
+            png_bytes = encode_png(preprocess_image(image))
+            cached = self.get_cached(png_bytes, page_number)
+            if cached is not None:
+                return cached
+            
             # 等待请求间隔
             current_time = time.time()
             time_since_last_request = current_time - self.last_request_time
@@ -66,57 +132,129 @@ class OCRProcessor:
                 logger.info(f"等待 {wait_time:.1f} 秒后继续处理...")
                 time.sleep(wait_time)
             
-            # 将图像转换为适合 OCR 的格式
-            processed_image = self._preprocess_image(image)
+            return self.process_png(png_bytes, page_number, check_cache=False)
+            
+        except Exception as e:
+            logger.error(f"OCR 处理失败: {e}")
+            metrics.count("ocr_calls", status="failed")
+            return None, []
+    
+    def cache_key(self, png_bytes: bytes) -> str:
+        """
+        计算页面图像的缓存键
+        
+        Args:
+            png_bytes: 预处理后的 PNG 图像字节
             
-            # 将图像保存到内存中的字节流
-            img_byte_arr = io.BytesIO()
-            processed_image.save(img_byte_arr, format='PNG')
-            img_byte_arr.seek(0)
+        Returns:
+            str: 缓存键
+        """
+        return OCRCache.make_key(png_bytes, self.model, PREPROCESS_PARAMS)
+    
+    def get_cached(self, png_bytes: bytes, page_number: int) -> Optional[Tuple[str, List[str]]]:
+        """
+        从缓存读取页面的 OCR 结果
+        
+        Args:
+            png_bytes: 预处理后的 PNG 图像字节
+            page_number: 页面编号
             
+        Returns:
+            Optional[Tuple[str, List[str]]]: (提取的文本, 图像描述列表)，未启用缓存或未命中时返回 None
+        """
+        if not self.cache:
+            return None
+        cached = self.cache.get(self.cache_key(png_bytes))
+        metrics.count("ocr_cache", result="miss" if cached is None else "hit")
+        if cached is None:
+            return None
+        markdown, descriptions = cached
+        logger.info(f"第 {page_number} 页命中 OCR 缓存")
+        return self._build_result(markdown, descriptions, page_number)
+    
+    def process_png(self, png_bytes: bytes, page_number: int, check_cache: bool = True) -> Tuple[Optional[str], List[str]]:
+        """
+        对已预处理的 PNG 图像调用 OCR 接口，不做请求间隔控制（由调用方限速）
+        
+        Args:
+            png_bytes: 预处理后的 PNG 图像字节
+            page_number: 页面编号
+            check_cache: 是否先查缓存，调用方已查过时传 False
+            
+        Returns:
+            Tuple[Optional[str], List[str]]: (提取的文本, 图像描述列表)
+        """
+        if check_cache:
+            cached = self.get_cached(png_bytes, page_number)
+            if cached is not None:
+                return cached
+        
+        try:
             # 将图像转换为 base64
-            image_base64 = base64.b64encode(img_byte_arr.getvalue()).decode('utf-8')
+            image_base64 = base64.b64encode(png_bytes).decode('utf-8')
             
             # 使用 Mistral OCR API 进行文本识别
-            response = self.client.ocr.process(
-                model="mistral-ocr-latest",
-                document={
-                    "type": "image_url",
-                    "image_url": f"data:image/png;base64,{image_base64}"
-                },
-                include_image_base64=True
-            )
+            with metrics.span("ocr", page=page_number):
+                response = self.client.ocr.process(
+                    model=self.model,
+                    document={
+                        "type": "image_url",
+                        "image_url": f"data:image/png;base64,{image_base64}"
+                    },
+                    include_image_base64=True
+                )
+            metrics.count("ocr_calls", status="ok")
             
             # 更新请求时间
             self.last_request_time = time.time()
             
-            # 提取文本和图像信息
-            text = ""
-            image_descriptions = []
+            # 提取文本和图像描述
+            markdown = ""
+            descriptions = []
             
             if response.pages:
                 # 处理文本内容
-                text = response.pages[0].markdown
+                markdown = response.pages[0].markdown
                 
                 # 处理图像
                 if hasattr(response.pages[0], 'images') and response.pages[0].images:
-                    for img_idx, img in enumerate(response.pages[0].images):
-                        # 为每个图像添加描述
-                        img_desc = f"\n[图像 {page_number}-{img_idx + 1}]\n"
-                        if hasattr(img, 'description') and img.description:
-                            img_desc += f"描述: {img.description}\n"
-                        image_descriptions.append(img_desc)
+                    for img in response.pages[0].images:
+                        descriptions.append(getattr(img, 'description', None) or "")
             
-            # 格式化文本
-            text = self._format_text(text, page_number, image_descriptions)
+            if self.cache:
+                self.cache.put(self.cache_key(png_bytes), markdown, descriptions, model=self.model)
             
             logger.info(f"成功完成第 {page_number} 页 OCR 文本识别")
-            return text, image_descriptions
+            return self._build_result(markdown, descriptions, page_number)
             
         except Exception as e:
             logger.error(f"OCR 处理失败: {e}")
             return None, []
     
+    def _build_result(self, markdown: str, descriptions: List[str], page_number: int) -> Tuple[str, List[str]]:
+        """
+        根据 OCR 原始结果生成带页码的文本和图像描述
+        
+        Args:
+            markdown: OCR 返回的 markdown 文本
+            descriptions: 每个图像的描述，没有描述时为空字符串
+            page_number: 页面编号
+            
+        Returns:
+            Tuple[str, List[str]]: (格式化后的文本, 图像描述列表)
+        """
+        image_descriptions = []
+        for img_idx, description in enumerate(descriptions):
+            # 为每个图像添加描述
+            img_desc = f"\n[图像 {page_number}-{img_idx + 1}]\n"
+            if description:
+                img_desc += f"描述: {description}\n"
+            image_descriptions.append(img_desc)
+        
+        # 格式化文本
+        text = self._format_text(markdown, page_number, image_descriptions)
+        return text, image_descriptions
+    
     def _format_text(self, text: str, page_number: int, image_descriptions: List[str]) -> str:
         """
         格式化提取的文本
@@ -152,25 +290,5 @@ class OCRProcessor:
         return formatted_text
     
     def _preprocess_image(self, image: Image.Image) -> Image.Image:
-        """
-        图像预处理
-        
-        Args:
-            image: 原始图像
-            
-        Returns:
-            Image.Image: 预处理后的图像
-        """
-        # 转换为灰度图像
-        if image.mode != 'L':
-            image = image.convert('L')
-        
-        # 增强对比度
-        enhancer = ImageEnhance.Contrast(image)
-        image = enhancer.enhance(2.0)  # 增强对比度
-        
-        # 增强亮度
-        enhancer = ImageEnhance.Brightness(image)
-        image = enhancer.enhance(1.5)  # 增强亮度
-        
-        return image 
\ No newline at end of file
+        """图像预处理，见 preprocess_image"""
+        return preprocess_image(image)
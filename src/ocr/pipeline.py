@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+OCR 流水线模块
+在进程池中并行提取和预处理 PDF 页面，在线程池中以令牌桶限速并发调用 OCR 接口，最后按页码顺序汇总结果
+"""
+
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+from .pdf_processor import PDFProcessor
+from .ocr_processor import preprocess_image, encode_png
+from ..utils.rate_limiter import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# 每个工作进程缓存已打开的 PDF，避免每页重复解析文件
+_pdf_cache: Dict[str, PDFProcessor] = {}
+
+def prepare_page(pdf_path: str, page_num: int) -> Tuple[int, str, Optional[bytes]]:
+    """
+    在工作进程中处理一页：优先直接提取文本，无文本时提取页面图像并预处理
+
+    Args:
+        pdf_path: PDF 文件路径
+        page_num: 页码（从0开始）
+
+    Returns:
+        Tuple[int, str, Optional[bytes]]: (页码, 直接提取的文本, 需要 OCR 时的预处理后 PNG 字节)
+    """
+    pdf = _pdf_cache.get(pdf_path)
+    if pdf is None:
+        pdf = _pdf_cache[pdf_path] = PDFProcessor(pdf_path)
+
+    text = pdf.extract_text(page_num) or ""
+    if text.strip():
+        return page_num, text, None
+
+    image = pdf.extract_page_image(page_num)
+    if image is None:
+        return page_num, "", None
+    return page_num, "", encode_png(preprocess_image(image))
+
+class OCRPipeline:
+    """并发 OCR 流水线"""
+
+    def __init__(self, ocr_processor, workers: int = 4, rps: float = 0.2, max_in_flight: int = 2):
+        """
+        初始化流水线
+
+        Args:
+            ocr_processor: OCR 处理器，需提供 get_cached 和 process_png
+            workers: 提取和预处理页面的进程数
+            rps: 每秒最多发起的 OCR 请求数，默认 0.2 即每 5 秒一次
+            max_in_flight: 同时进行中的 OCR 请求上限
+        """
+        self.ocr_processor = ocr_processor
+        self.workers = max(1, workers)
+        self.rate_limiter = TokenBucket(rps)
+        self.max_in_flight = max(1, max_in_flight)
+
+    def _ocr_page(self, page_num: int, png_bytes: bytes) -> Tuple[int, str, bool]:
+        """对一页调用 OCR，命中缓存时不占用限速配额，返回 (页码, 文本, 是否命中缓存)"""
+        cached = self.ocr_processor.get_cached(png_bytes, page_num + 1)
+        if cached is not None:
+            return page_num, cached[0], True
+
+        waited = self.rate_limiter.acquire()
+        if waited:
+            logger.debug(f"第 {page_num + 1} 页等待限速 {waited:.1f} 秒")
+        text, _ = self.ocr_processor.process_png(png_bytes, page_num + 1, check_cache=False)
+        return page_num, text or "", False
+
+    def run(self, pdf_path: str) -> List[Tuple[int, str]]:
+        """
+        处理整个 PDF
+
+        Args:
+            pdf_path: PDF 文件路径
+
+        Returns:
+            List[Tuple[int, str]]: 按页码排序的 (页码, 文本)，页码从0开始
+        """
+        total_pages = PDFProcessor(pdf_path).get_page_count()
+        logger.info(f"共 {total_pages} 页，使用 {self.workers} 个进程预处理，OCR 并发上限 {self.max_in_flight}")
+
+        results: Dict[int, str] = {}
+        ocr_pages = cache_hits = failed = 0
+        started = time.monotonic()
+        with ProcessPoolExecutor(max_workers=self.workers) as processes, \
+                ThreadPoolExecutor(max_workers=self.max_in_flight) as threads:
+            prepared = {processes.submit(prepare_page, str(pdf_path), page_num): page_num
+                        for page_num in range(total_pages)}
+            ocr_futures = {}
+            # 页面一准备好就进入 OCR 队列，预处理与 OCR 请求重叠进行
+            for future in as_completed(prepared):
+                # 单页失败只记为空页，不影响其他页
+                try:
+                    page_num, text, png_bytes = future.result()
+                except Exception as e:
+                    logger.error(f"第 {prepared[future] + 1} 页预处理失败: {e}")
+                    results[prepared[future]] = ""
+                    failed += 1
+                    continue
+                if png_bytes is None:
+                    results[page_num] = text
+                else:
+                    ocr_pages += 1
+                    ocr_futures[threads.submit(self._ocr_page, page_num, png_bytes)] = page_num
+
+            for future in as_completed(ocr_futures):
+                try:
+                    page_num, text, cached = future.result()
+                except Exception as e:
+                    logger.error(f"第 {ocr_futures[future] + 1} 页 OCR 失败: {e}")
+                    results[ocr_futures[future]] = ""
+                    failed += 1
+                    continue
+                cache_hits += cached
+                if not text:
+                    logger.warning(f"第 {page_num + 1} 页 OCR 未返回文本")
+                results[page_num] = text
+
+        elapsed = time.monotonic() - started
+        logger.info(f"流水线处理完成：{total_pages} 页，其中 {ocr_pages} 页使用 OCR（{cache_hits} 页命中缓存），"
+                    f"{failed} 页失败，耗时 {elapsed:.1f} 秒")
+        return sorted(results.items())
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+OCR 结果缓存测试
+
+用法:
+    python -m pytest src/ocr/test_ocr_cache.py
+"""
+
+import os
+from src.ocr.ocr_cache import OCRCache
+
+def entry_size(cache, key):
+    return cache._path(key).stat().st_size
+
+def test_make_key():
+    key = OCRCache.make_key(b"png", "model", {"dpi": 300})
+    assert key == OCRCache.make_key(b"png", "model", {"dpi": 300})
+    assert key != OCRCache.make_key(b"png", "other", {"dpi": 300})
+    assert key != OCRCache.make_key(b"png", "model", {"dpi": 200})
+
+def test_round_trip_and_hit_counts(tmp_path):
+    cache = OCRCache(tmp_path)
+    assert cache.get("ab" * 32) is None
+    cache.put("ab" * 32, "# 标题", ["图片"], model="m")
+    assert cache.get("ab" * 32) == ("# 标题", ["图片"])
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_overwriting_a_key_does_not_grow_total(tmp_path):
+    cache = OCRCache(tmp_path)
+    cache.put("aa" * 32, "first", [])
+    for _ in range(20):
+        cache.put("bb" * 32, "x" * 100, [])
+    assert cache._total_bytes == entry_size(cache, "aa" * 32) + entry_size(cache, "bb" * 32)
+    assert cache._total_bytes == cache.stats()["bytes"]
+
+def test_rewrites_of_one_key_never_evict_other_entries(tmp_path):
+    cache = OCRCache(tmp_path)
+    cache.put("aa" * 32, "a" * 200, [])
+    cache.max_bytes = 3 * entry_size(cache, "aa" * 32)
+    for _ in range(50):
+        cache.put("bb" * 32, "b" * 200, [])
+    assert cache.get("aa" * 32) is not None
+    assert cache.stats()["entries"] == 2
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = OCRCache(tmp_path)
+    keys = [f"{index:02x}" * 32 for index in range(5)]
+    for offset, key in enumerate(keys):
+        cache.put(key, "x" * 500, [])
+        os.utime(cache._path(key), (1000 + offset, 1000 + offset))
+    # 读取会刷新最近使用时间，最早写入的条目因此保留
+    assert cache.get(keys[0]) is not None
+    cache.max_bytes = 4 * entry_size(cache, keys[0])
+    cache.put("ff" * 32, "x" * 500, [])
+    remaining = {key for key in keys + ["ff" * 32] if cache._path(key).exists()}
+    assert remaining == {keys[0], keys[4], "ff" * 32}
+    assert cache._total_bytes == cache.stats()["bytes"] <= cache.max_bytes * 0.9
+
+def test_purge(tmp_path):
+    cache = OCRCache(tmp_path)
+    cache.put("aa" * 32, "old", [])
+    cache.put("bb" * 32, "new", [])
+    os.utime(cache._path("aa" * 32), (0, 0))
+    assert cache.purge(older_than_days=1) == 1
+    assert cache.stats()["entries"] == 1
+    assert cache.purge() == 1
+    assert cache.stats()["entries"] == 0
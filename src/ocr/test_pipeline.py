@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+OCR 流水线测试，用假的 PDF 和 OCR 处理器代替 PDF 解析和 Mistral 接口；
+预处理改在线程池中运行，使测试中替换的函数对工作线程可见
+
+用法:
+    python -m pytest src/ocr/test_pipeline.py
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from src.ocr import pipeline
+from src.ocr.pipeline import OCRPipeline
+
+PAGES = 8
+
+class FakePDF:
+    def __init__(self, path):
+        self.path = path
+
+    def get_page_count(self):
+        return PAGES
+
+def fake_prepare(pdf_path, page_num):
+    """偶数页有文本层，奇数页需要 OCR；页码越小完成得越晚"""
+    time.sleep((PAGES - page_num) * 0.005)
+    if page_num % 2 == 0:
+        return page_num, f"text {page_num}", None
+    return page_num, "", f"png {page_num}".encode()
+
+class FakeOCR:
+    """记录同时进行中的请求数；页码越小返回得越晚"""
+
+    def __init__(self, cached=(), failing=()):
+        self.cached = set(cached)
+        self.failing = set(failing)
+        self.calls = []
+        self.in_flight = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def get_cached(self, png_bytes, page_number):
+        return ("cached %d" % page_number, []) if page_number in self.cached else None
+
+    def process_png(self, png_bytes, page_number, check_cache=True):
+        with self.lock:
+            self.calls.append(page_number)
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            time.sleep(0.02 + (PAGES - page_number) * 0.01)
+            if page_number in self.failing:
+                raise RuntimeError("接口错误")
+            return f"ocr {page_number}", []
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+@pytest.fixture(autouse=True)
+def fake_pdf(monkeypatch):
+    monkeypatch.setattr(pipeline, "PDFProcessor", FakePDF)
+    monkeypatch.setattr(pipeline, "prepare_page", fake_prepare)
+    monkeypatch.setattr(pipeline, "ProcessPoolExecutor", ThreadPoolExecutor)
+
+def test_results_are_ordered_by_page():
+    ocr = FakeOCR(cached={4})
+    results = OCRPipeline(ocr, workers=4, rps=1000, max_in_flight=4).run("rules.pdf")
+    assert results == [(0, "text 0"), (1, "ocr 2"), (2, "text 2"), (3, "cached 4"),
+                       (4, "text 4"), (5, "ocr 6"), (6, "text 6"), (7, "ocr 8")]
+    # 命中缓存的页不调用 OCR 接口
+    assert sorted(ocr.calls) == [2, 6, 8]
+
+def test_in_flight_cap():
+    ocr = FakeOCR()
+    OCRPipeline(ocr, workers=4, rps=1000, max_in_flight=2).run("rules.pdf")
+    assert len(ocr.calls) == 4
+    assert ocr.peak == 2
+
+def test_failed_page_does_not_stop_the_run():
+    ocr = FakeOCR(failing={4})
+    results = dict(OCRPipeline(ocr, workers=2, rps=1000, max_in_flight=2).run("rules.pdf"))
+    assert len(results) == PAGES
+    assert results[3] == ""
+    assert results[5] == "ocr 6"
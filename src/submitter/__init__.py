@@ -1,3 +1,15 @@
-from .translation_submitter import TranslationSubmitter
+import importlib
 
-__all__ = ['TranslationSubmitter'] 
\ No newline at end of file
+# 按需导入：HTTP 引擎不需要加载 Playwright
+_LAZY_ATTRS = {
+    'TranslationSubmitter': '.translation_submitter',
+    'HTTPTranslationSubmitter': '.http_submitter',
+}
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module_name, __name__), name)
+
+__all__ = ['TranslationSubmitter', 'HTTPTranslationSubmitter']
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+HTTP 翻译提交模块（实验性）
+通过 BGALogin 的已认证会话直接调用保存接口提交译文，无需启动浏览器
+"""
+
+import json
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional
+from ..bga_login import BGALogin
+from ..translator.placeholders import validate_for_submit
+from ..translator.table_reader import read_table
+from .journal import SubmissionJournal, STATUS_CONFIRMED, STATUS_FAILED
+from ..utils.log_policy import LogSampler
+from ..utils.metrics import metrics
+from ..utils.rate_limiter import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# 保存接口的路径和参数是按翻译页面 AJAX 请求的命名方式推断的，没有对照真实请求核实过，
+# 目前只在 FakeBGAServer 上验证；接口不同时请改用浏览器引擎
+SAVE_TRANSLATION_PATH = "/translation/translation/savetranslation.html"
+# 服务端限速不计入重试次数，但连续被要求等待超过该次数时放弃这条译文，避免无限等待
+MAX_RATE_LIMIT_WAITS = 20
+
+class RateLimited(Exception):
+    """服务端要求等待后重试"""
+
+    def __init__(self, wait_seconds: int, message: str = ""):
+        super().__init__(message or f"需要等待 {wait_seconds} 秒")
+        self.wait_seconds = wait_seconds
+
+class HTTPTranslationSubmitter:
+    """HTTP 翻译提交器"""
+
+    def __init__(self, game_name: str, client: BGALogin, language: str = "zh", workers: int = 4,
+                 rps: float = 2.0, max_retries: int = 3, backoff: float = 2.0, restart: bool = False,
+                 table_path: Optional[str] = None, tm_threshold: Optional[float] = None,
+                 check_placeholders: bool = True, rate_limiter: Optional[TokenBucket] = None):
+        """
+        初始化提交器
+
+        Args:
+            game_name: 游戏名称
+            client: BGA 登录客户端，使用其会话和 request_token 发送请求
+            language: 目标语言
+            workers: 并发提交的工作线程数
+            rps: 所有工作线程共享的每秒请求上限
+            max_retries: 每条译文的最大尝试次数，服务端要求等待（限速）的请求不计入
+            backoff: 指数退避的基础秒数
+            restart: 是否忽略提交日志从头提交并清空提交结果文件，默认跳过日志中已确认的条目并追加结果
+            table_path: 填写好译文的翻译表（Markdown、CSV、TSV、JSON Lines 或 XLIFF），默认为 untranslated.md
+            tm_threshold: 翻译表中没有译文的条目，使用相似度不低于该值的翻译记忆译文，默认不使用
+            check_placeholders: 提交前检查译文的占位符和标签是否与原文一致，不一致时不提交
+            rate_limiter: 与其他任务共享的令牌桶，提供时忽略 rps；服务端要求等待时暂停的是这个共享的令牌桶
+        """
+        self.game_name = game_name
+        self.client = client
+        self.language = language
+        self.workers = max(1, workers)
+        self.rate_limiter = rate_limiter or TokenBucket(rps)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.restart = restart
+        self.tm_threshold = tm_threshold
+        self.check_placeholders = check_placeholders
+
+        self.game_dir = Path(f"data/games/{game_name}")
+        self.untranslated_path = Path(table_path) if table_path else self.game_dir / "translations/untranslated.md"
+        self.untranslated_json_path = self.game_dir / "translations/untranslated.json"
+        self.results_path = self.game_dir / "translations/submit_results.jsonl"
+        self._results_lock = threading.Lock()
+        # 逐条的限速、重试和失败日志按每秒条数限流，完整结果见 submit_results.jsonl
+        self.rate_limit_log = LogSampler(logger, per_second=1)
+        self.retry_log = LogSampler(logger, per_second=5)
+        self.failure_log = LogSampler(logger, per_second=5)
+
+    @classmethod
+    def from_env(cls, game_name: str, base_url: Optional[str] = None, **kwargs) -> "HTTPTranslationSubmitter":
+        """
+        使用 .env 中的账号信息创建提交器
+
+        Args:
+            game_name: 游戏名称
+            base_url: BGA 站点地址，默认读取 BGA_BASE_URL 环境变量，未设置时使用 BGALogin 的地址
+
+        Returns:
+            HTTPTranslationSubmitter: 提交器实例
+        """
+        return cls(game_name, BGALogin.from_env(base_url), **kwargs)
+
+    def build_jobs(self) -> List[Dict]:
+        """
+        根据未翻译条目和填写好的对照表生成待提交任务
+
+        Returns:
+            List[Dict]: 每项包含 id、original、translation
+        """
+        with open(self.untranslated_json_path, 'r', encoding='utf-8') as f:
+            untranslated = json.load(f)
+        table = read_table(self.untranslated_path)
+        table.log_problems()
+
+        prefilled = {}
+        if self.tm_threshold:
+            from ..translator.translation_memory import load_memory, prefill_translations
+            missing = {key: item for key, item in untranslated.items() if not table.lookup(key, item["original"])}
+            prefilled = prefill_translations(missing, {}, load_memory(), self.tm_threshold)
+
+        jobs = []
+        for original_id, item in untranslated.items():
+            # 翻译表带字符串 ID 时按 ID 匹配，否则按原文匹配
+            translation = table.lookup(original_id, item["original"])
+            source = "table"
+            if not translation and item["original"] in prefilled:
+                translation = prefilled[item["original"]]["translation"]
+                source = "tm"
+            if not translation:
+                continue
+            jobs.append({
+                "id": original_id.split("_")[1],
+                "original": item["original"],
+                "translation": translation,
+                "source": source
+            })
+        logger.info(f"共 {len(untranslated)} 条未翻译条目，其中 {len(jobs)} 条已填写译文"
+                    + (f"（{len(prefilled)} 条来自翻译记忆）" if prefilled else ""))
+        return jobs
+
+    def _save_once(self, job: Dict):
+        """发送一次保存请求，失败时抛出异常"""
+        # 会话已经由 throttle_session 按同一个令牌桶限速时不再重复取令牌
+        if getattr(self.client.session, "rate_limiter", None) is not self.rate_limiter:
+            with metrics.span("rate_wait"):
+                self.rate_limiter.acquire()
+        with metrics.span("save", id=job["id"]):
+            response = self.client.session.post(
+                f"{self.client.base_url}{SAVE_TRANSLATION_PATH}",
+                data={
+                    'id': job["id"],
+                    'language': self.language,
+                    'translation': job["translation"]
+                },
+                headers={
+                    'x-request-token': self.client.request_token or '',
+                    'content-type': 'application/x-www-form-urlencoded;charset=UTF-8',
+                    'x-requested-with': 'XMLHttpRequest'
+                },
+                timeout=30
+            )
+
+        try:
+            result = response.json()
+        except ValueError:
+            result = {}
+
+        if 'wait_until' in result or response.status_code == 429:
+            raise RateLimited(self.client._handle_rate_limit(result), result.get('error', ''))
+        if response.status_code != 200:
+            raise Exception(f"状态码: {response.status_code}")
+        if result.get('status') != 1:
+            raise Exception(result.get('error', '未知错误'))
+
+    def _submit_one(self, job: Dict) -> Dict:
+        """
+        提交一条译文，按需重试
+
+        Args:
+            job: 待提交任务
+
+        Returns:
+            Dict: 提交结果
+        """
+        error = ""
+        attempt = rate_limited = 0
+        while attempt < self.max_retries:
+            try:
+                self._save_once(job)
+                metrics.count("saves", engine="http", status="ok")
+                return {"id": job["id"], "original": job["original"], "status": "ok", "attempts": attempt + 1,
+                        "rate_limited": rate_limited, "source": job.get("source", "table")}
+            except RateLimited as e:
+                error = str(e)
+                rate_limited += 1
+                metrics.count("saves", engine="http", status="rate_limited")
+                if rate_limited > MAX_RATE_LIMIT_WAITS:
+                    break
+                # 服务端要求等待时暂停整个令牌桶，让所有工作线程一起退避；这次请求不计入重试次数
+                self.rate_limit_log.warning("触发频率限制，等待 %s 秒", e.wait_seconds)
+                self.rate_limiter.pause_for(e.wait_seconds)
+            except Exception as e:
+                error = str(e)
+                attempt += 1
+                metrics.count("saves", engine="http", status="error")
+                if attempt < self.max_retries:
+                    wait_seconds = self.backoff * (2 ** (attempt - 1)) * (1 + random.random() * 0.5)
+                    self.retry_log.warning("提交 %s 失败: %s，%.1f 秒后重试", job['id'], error, wait_seconds)
+                    time.sleep(wait_seconds)
+        return {"id": job["id"], "original": job["original"], "status": "failed", "attempts": attempt,
+                "rate_limited": rate_limited, "error": error}
+
+    def _write_result(self, result: Dict):
+        """追加一条提交结果"""
+        with self._results_lock:
+            with open(self.results_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+    def submit_translations(self) -> bool:
+        """
+        提交所有已填写的译文
+
+        Returns:
+            bool: 是否全部提交成功
+        """
+        try:
+            logger.info("HTTP 提交引擎为实验功能，保存接口未经真实站点核实，出现异常时请改用浏览器引擎")
+            jobs = self.build_jobs()
+            if not jobs:
+                logger.error("没有可用的翻译内容")
+                return False
+            if self.check_placeholders and not validate_for_submit(
+                    self.game_name, ((self.game_name, job["id"], job["original"], job["translation"]) for job in jobs)):
+                return False
+            
+            journal = SubmissionJournal(self.game_name, restart=self.restart, language=self.language)
+            pending = [job for job in jobs if not journal.is_confirmed(job["id"], job["translation"])]
+            if len(pending) < len(jobs):
+                logger.info(f"跳过提交日志中已确认的 {len(jobs) - len(pending)} 条，剩余 {len(pending)} 条")
+            if not pending:
+                journal.close()
+                logger.info("所有译文均已提交")
+                return True
+
+            if not self.client.request_token and not self.client.login():
+                logger.error("BGALogin登录失败")
+                journal.close()
+                return False
+
+            self.results_path.parent.mkdir(parents=True, exist_ok=True)
+            # 续传时保留之前的提交结果，只有从头提交时才清空
+            if self.restart:
+                self.results_path.write_text("", encoding="utf-8")
+
+            succeeded = failed = 0
+            started = time.monotonic()
+            translations = {job["id"]: job["translation"] for job in pending}
+            with journal, ThreadPoolExecutor(max_workers=self.workers) as executor:
+                futures = [executor.submit(self._submit_one, job) for job in pending]
+                for future in as_completed(futures):
+                    result = future.result()
+                    self._write_result(result)
+                    if result["status"] == "ok":
+                        succeeded += 1
+                        journal.record(result["id"], STATUS_CONFIRMED, translation=translations[result["id"]])
+                    else:
+                        failed += 1
+                        journal.record(result["id"], STATUS_FAILED, translation=translations[result["id"]])
+                        self.failure_log.log(logging.ERROR, "提交失败: %s - %s", result['id'], result['error'])
+
+            elapsed = time.monotonic() - started
+            self.rate_limit_log.flush("另有 %d 次频率限制未逐条输出")
+            self.retry_log.flush("另有 %d 次重试未逐条输出")
+            self.failure_log.flush("另有 %d 条提交失败未逐条输出，详见提交结果文件", logging.ERROR)
+            logger.info(f"提交完成：成功 {succeeded} 条，失败 {failed} 条，耗时 {elapsed:.1f} 秒")
+            logger.info(f"提交结果已保存至: {self.results_path}")
+            return failed == 0
+
+        except Exception as e:
+            logger.error(f"提交翻译失败: {e}")
+            return False
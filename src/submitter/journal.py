@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+提交日志模块
+以追加写入的 JSON Lines 记录每条译文的提交进度，中断后重新运行可以跳过已确认的条目；
+每条记录带有译文的摘要，确认之后又修改过的译文会重新提交；
+启用翻译数据库时，每次落盘同时把这批状态批量写入数据库的 submissions 表
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from ..translator.store import TranslationStore
+
+logger = logging.getLogger(__name__)
+
+STATUS_SUBMITTED = "submitted"
+STATUS_CONFIRMED = "confirmed"
+STATUS_FAILED = "failed"
+
+def _digest(text: str) -> str:
+    return hashlib.sha1((text or "").encode("utf-8")).hexdigest()[:16]
+
+class SubmissionJournal:
+    """译文提交日志"""
+
+    def __init__(self, game_name: str, restart: bool = False, fsync_every: int = 50, language: str = "zh"):
+        """
+        初始化提交日志，并加载已有记录
+
+        Args:
+            game_name: 游戏名称
+            restart: 是否清空已有记录，从头开始
+            fsync_every: 每追加多少条记录落盘一次
+            language: 译文语言，写入数据库时使用
+        """
+        self.path = Path(f"data/games/{game_name}/translations/submit_journal.jsonl")
+        self.fsync_every = max(1, fsync_every)
+        self.status: Dict[str, str] = {}
+        # 字符串 ID -> 最后一次记录的译文摘要，旧版日志的记录没有摘要
+        self.digests: Dict[str, Optional[str]] = {}
+        self._pending = 0
+        self.game_name = game_name
+        self.language = language
+        self.store = TranslationStore.from_env()
+        self._store_buffer: List[Tuple] = []
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if restart:
+            if self.path.exists():
+                self.path.unlink()
+            if self.store is not None:
+                self.store.clear_submissions(game_name, language)
+            logger.info("已清空提交日志，将从头开始提交")
+        self._load()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def _load(self):
+        """读取已有记录，同一条目以最后一条记录为准"""
+        if not self.path.exists():
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # 进程崩溃时最后一行可能只写了一半
+                    logger.warning(f"忽略提交日志第 {line_no} 行的不完整记录")
+                    continue
+                if not isinstance(record, dict) or "id" not in record or "status" not in record:
+                    logger.warning(f"忽略提交日志第 {line_no} 行缺少 id 或 status 的记录")
+                    continue
+                self.status[str(record["id"])] = record["status"]
+                self.digests[str(record["id"])] = record.get("hash")
+        if self.status:
+            logger.info(f"已加载提交日志：{len(self.confirmed_ids)} 条已确认，共 {len(self.status)} 条记录")
+
+    @property
+    def confirmed_ids(self) -> Set[str]:
+        """已确认保存的条目 ID"""
+        return {string_id for string_id, status in self.status.items() if status == STATUS_CONFIRMED}
+
+    def is_confirmed(self, string_id, translation: Optional[str] = None) -> bool:
+        """
+        条目是否已确认保存
+
+        Args:
+            string_id: 字符串 ID
+            translation: 当前要提交的译文，提供时还要求与确认保存的译文一致；
+                没有摘要的旧记录无法比较，仍视为已确认
+
+        Returns:
+            bool: 是否可以跳过该条目
+        """
+        string_id = str(string_id)
+        if self.status.get(string_id) != STATUS_CONFIRMED:
+            return False
+        digest = self.digests.get(string_id)
+        return translation is None or digest is None or digest == _digest(translation)
+
+    def record(self, string_id, status: str, page: Optional[int] = None, translation: Optional[str] = None):
+        """
+        追加一条记录
+
+        Args:
+            string_id: 字符串 ID
+            status: submitted、confirmed 或 failed
+            page: 条目所在页码
+            translation: 提交的译文，只记录摘要
+        """
+        string_id = str(string_id)
+        digest = _digest(translation) if translation is not None else None
+        self.status[string_id] = status
+        self.digests[string_id] = digest
+        entry = {"id": string_id, "status": status, "ts": round(time.time(), 3)}
+        if page is not None:
+            entry["page"] = page
+        if digest is not None:
+            entry["hash"] = digest
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        if self.store is not None:
+            self._store_buffer.append((string_id, status, page))
+        self._pending += 1
+        if self._pending >= self.fsync_every:
+            self.flush()
+
+    def flush(self):
+        """将缓冲的记录写入磁盘"""
+        if self._file.closed:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        if self._store_buffer:
+            self.store.record_submissions(self.game_name, self._store_buffer, self.language)
+            self._store_buffer = []
+
+    def close(self):
+        """落盘并关闭日志"""
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+            if self.store is not None:
+                self.store.close()
+
+    def __enter__(self) -> "SubmissionJournal":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
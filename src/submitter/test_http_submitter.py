@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+HTTP 提交引擎测试
+使用本地模拟服务器验证并发提交、限速退避、续传和结果文件
+
+用法:
+    python -m pytest src/submitter/test_http_submitter.py
+"""
+
+import json
+import pytest
+from src.bga_login import BGALogin
+from src.submitter.http_submitter import HTTPTranslationSubmitter
+from src.utils.fake_bga_server import FAKE_REQUEST_TOKEN, FakeBGAServer, make_strings
+
+TRANSLATIONS_DIR = "data/games/demo/translations"
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """提交器使用相对路径，在临时目录中运行"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("TRANSLATION_STORE", "0")
+    (tmp_path / TRANSLATIONS_DIR).mkdir(parents=True)
+    return tmp_path
+
+def make_module(count):
+    strings = make_strings(count, translated_ratio=0)
+    # 对照表单元格中的竖线需要转义，这里直接避开
+    for item in strings:
+        item["original"] = item["original"].replace(" | ", " / ")
+    return strings
+
+def write_tables(workdir, strings, filled):
+    """写出未翻译条目和填写了前 filled 条译文的对照表；译文保留原文中的占位符"""
+    translations_dir = workdir / TRANSLATIONS_DIR
+    untranslated = {f"toTranslate_{item['id']}": dict(item, translation="") for item in strings}
+    (translations_dir / "untranslated.json").write_text(json.dumps(untranslated, ensure_ascii=False),
+                                                        encoding="utf-8")
+    rows = "".join(f"| {item['original']} | {item['context']} | "
+                   f"{'译文 ' + str(item['id']) + '：' + item['original'] if index < filled else ''} |\n"
+                   for index, item in enumerate(strings))
+    (translations_dir / "untranslated.md").write_text("| 原文 | 原文出处 | 译文 |\n|---|---|---|\n" + rows,
+                                                      encoding="utf-8")
+
+def read_results(submitter):
+    with open(submitter.results_path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def make_client(server):
+    client = BGALogin(username="tester", password="secret", base_url=server.url)
+    # 模拟服务器只校验 request_token，跳过带随机等待的登录流程
+    client.request_token = FAKE_REQUEST_TOKEN
+    return client
+
+def test_rate_limits_do_not_consume_retries(workdir):
+    strings = make_module(60)
+    write_tables(workdir, strings, filled=40)
+    # 模拟服务器每秒只允许 10 次保存，以 40 rps 请求必然触发 wait_until 退避
+    with FakeBGAServer(strings, save_rate_limit=10) as server:
+        submitter = HTTPTranslationSubmitter("demo", make_client(server), workers=8, rps=40, backoff=0.1,
+                                             max_retries=1)
+        assert submitter.submit_translations()
+        assert server.rate_limited > 0
+        assert len(server.saved) == 40
+    results = read_results(submitter)
+    assert len(results) == 40
+    assert all(result["status"] == "ok" and result["attempts"] == 1 for result in results)
+    assert sum(result["rate_limited"] for result in results) == server.rate_limited
+
+def test_resume_appends_results_and_restart_clears_them(workdir):
+    strings = make_module(10)
+    write_tables(workdir, strings, filled=4)
+    with FakeBGAServer(strings) as server:
+        client = make_client(server)
+        first = HTTPTranslationSubmitter("demo", client, rps=100)
+        assert first.submit_translations()
+        assert len(read_results(first)) == 4
+
+        # 补充译文后续传，只提交新增的条目，之前的结果保留在文件中
+        write_tables(workdir, strings, filled=7)
+        server.saved.clear()
+        resumed = HTTPTranslationSubmitter("demo", client, rps=100)
+        assert resumed.submit_translations()
+        assert len(server.saved) == 3
+        assert len(read_results(resumed)) == 7
+
+        restarted = HTTPTranslationSubmitter("demo", client, rps=100, restart=True)
+        assert restarted.submit_translations()
+        assert len(read_results(restarted)) == 7
+        assert sorted(result["id"] for result in read_results(restarted)) == sorted(
+            str(item["id"]) for item in strings[:7])
+
+def test_edited_translation_is_resubmitted(workdir):
+    strings = make_module(5)
+    write_tables(workdir, strings, filled=5)
+    with FakeBGAServer(strings) as server:
+        client = make_client(server)
+        assert HTTPTranslationSubmitter("demo", client, rps=100).submit_translations()
+        assert len(server.saved) == 5
+
+        # 检查后修改了一条已提交的译文，续传时只重新提交这一条
+        table = workdir / TRANSLATIONS_DIR / "untranslated.md"
+        edited = f"译文 {strings[2]['id']}：{strings[2]['original']}"
+        table.write_text(table.read_text(encoding="utf-8").replace(edited, "修改后 " + edited), encoding="utf-8")
+        server.saved.clear()
+        assert HTTPTranslationSubmitter("demo", client, rps=100).submit_translations()
+        assert list(server.saved) == [str(strings[2]["id"])]
+        assert server.saved[str(strings[2]["id"])].startswith("修改后 ")
+
+def test_failures_use_up_retries(workdir):
+    strings = make_module(3)
+    write_tables(workdir, strings, filled=3)
+    # 服务器上没有第一条字符串，保存时返回错误
+    with FakeBGAServer(strings[1:]) as server:
+        submitter = HTTPTranslationSubmitter("demo", make_client(server), rps=100, max_retries=2, backoff=0.01)
+        assert not submitter.submit_translations()
+    failed = [result for result in read_results(submitter) if result["status"] == "failed"]
+    assert [(result["id"], result["attempts"]) for result in failed] == [(str(strings[0]["id"]), 2)]
+    assert "Unknown string" in failed[0]["error"]
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+提交日志测试
+
+用法:
+    python -m pytest src/submitter/test_journal.py
+"""
+
+import json
+import pytest
+from src.submitter.journal import STATUS_CONFIRMED, STATUS_FAILED, STATUS_SUBMITTED, SubmissionJournal
+from src.translator.store import TranslationStore
+
+JOURNAL_PATH = "data/games/demo/translations/submit_journal.jsonl"
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """提交日志使用相对路径，在临时目录中运行"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("TRANSLATION_STORE", "0")
+    return tmp_path
+
+def test_resume_skips_confirmed(workdir):
+    with SubmissionJournal("demo", fsync_every=2) as journal:
+        journal.record(1, STATUS_SUBMITTED, page=1)
+        journal.record(1, STATUS_CONFIRMED, page=1)
+        journal.record(2, STATUS_FAILED)
+        journal.record("3", STATUS_CONFIRMED)
+
+    journal = SubmissionJournal("demo")
+    assert journal.confirmed_ids == {"1", "3"}
+    assert journal.is_confirmed(1) and not journal.is_confirmed(2)
+    journal.record(2, STATUS_CONFIRMED)
+    journal.close()
+    assert SubmissionJournal("demo").confirmed_ids == {"1", "2", "3"}
+
+def test_edited_translation_is_not_confirmed(workdir):
+    with SubmissionJournal("demo") as journal:
+        journal.record(1, STATUS_CONFIRMED, translation="旧译文")
+        journal.record(2, STATUS_CONFIRMED)
+    journal = SubmissionJournal("demo")
+    assert journal.is_confirmed(1, "旧译文")
+    assert not journal.is_confirmed(1, "新译文")
+    # 没有摘要的记录无法比较，仍然跳过
+    assert journal.is_confirmed(2, "任意译文")
+    journal.record(1, STATUS_CONFIRMED, translation="新译文")
+    journal.close()
+    assert SubmissionJournal("demo").is_confirmed(1, "新译文")
+
+def test_restart_clears_journal(workdir):
+    with SubmissionJournal("demo") as journal:
+        journal.record(1, STATUS_CONFIRMED)
+    with SubmissionJournal("demo", restart=True) as journal:
+        assert journal.status == {}
+    assert (workdir / JOURNAL_PATH).read_text(encoding="utf-8") == ""
+
+def test_load_skips_truncated_and_incomplete_lines(workdir):
+    path = workdir / JOURNAL_PATH
+    path.parent.mkdir(parents=True)
+    path.write_text("\n".join([
+        json.dumps({"id": "1", "status": STATUS_CONFIRMED}),
+        json.dumps({"status": STATUS_CONFIRMED}),
+        json.dumps({"id": "2"}),
+        json.dumps(["3", STATUS_CONFIRMED]),
+        '{"id": "4", "sta',
+    ]), encoding="utf-8")
+    assert SubmissionJournal("demo").status == {"1": STATUS_CONFIRMED}
+
+def test_records_are_mirrored_to_store(workdir, monkeypatch):
+    monkeypatch.setenv("TRANSLATION_STORE", "1")
+    monkeypatch.setenv("TRANSLATION_STORE_PATH", str(workdir / "t.db"))
+    with SubmissionJournal("demo", fsync_every=10) as journal:
+        journal.record(1, STATUS_CONFIRMED, page=2)
+        journal.record(2, STATUS_FAILED)
+    with TranslationStore(workdir / "t.db") as store:
+        assert store.submission_status("demo") == {"1": STATUS_CONFIRMED, "2": STATUS_FAILED}
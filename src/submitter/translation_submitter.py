@@ -2,27 +2,103 @@ import logging
 import json
 from pathlib import Path
 from typing import Optional
-from playwright.sync_api import sync_playwright, Page, Browser
+from playwright.sync_api import Page
 import os
+import time
 from dotenv import load_dotenv, find_dotenv
-
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),  # 输出到控制台
-        logging.FileHandler('translation.log')  # 输出到文件
-    ]
-)
+from ..bga_login import BGALogin
+from .journal import SubmissionJournal, STATUS_CONFIRMED, STATUS_SUBMITTED
+from ..translator.placeholders import validate_for_submit
+from ..translator.translation_files import load_translation_table
+from ..utils.browser_pool import BrowserPool
+from ..utils.log_policy import LogSampler, dom_dump_enabled, setup_file_logging
+from ..utils.metrics import metrics
+from ..utils.page_waiter import PageWaiter, SaveTracker
+from ..utils.session_store import SessionStore, restore_browser_session, save_browser_session
 
 logger = logging.getLogger(__name__)
 
+# 一次性读取当前页面所有原文输入框的 [ID, 原文]
+ORIGINALS_SCRIPT = """
+() => Array.from(document.querySelectorAll("textarea[id^='toTranslate_']"), node => [node.id, node.value])
+    .filter(row => row[0] && row[1])
+"""
+
+# 在页面内写入一批译文，并依次触发 input、change 和 blur 事件以驱动 BGA 的自动保存
+BATCH_FILL_SCRIPT = """
+(mapping) => {
+    const filled = [];
+    for (const [id, text] of Object.entries(mapping)) {
+        const node = document.getElementById(id);
+        if (!node) continue;
+        node.focus();
+        node.value = text;
+        node.dispatchEvent(new Event('input', {bubbles: true}));
+        node.dispatchEvent(new Event('change', {bubbles: true}));
+        node.blur();
+        filled.push(id);
+    }
+    return filled;
+}
+"""
+
+def load_submit_table(game_dir: Path, table_path: Path, tm_threshold: Optional[float] = None) -> dict:
+    """
+    加载待提交的原文到译文映射，按需用翻译记忆补全翻译表中没有译文的条目
+    
+    Args:
+        game_dir: 游戏数据目录
+        table_path: 填写好译文的翻译表
+        tm_threshold: 翻译记忆的最低相似度，None 表示不使用
+        
+    Returns:
+        dict: 原文到译文的映射
+    """
+    translations = load_translation_table(table_path)
+    logger.info(f"成功加载翻译对照表，共 {len(translations)} 条翻译")
+    untranslated_json_path = game_dir / "translations/untranslated.json"
+    if tm_threshold and untranslated_json_path.exists():
+        from ..translator.translation_memory import load_memory, prefill_translations
+        with open(untranslated_json_path, 'r', encoding='utf-8') as f:
+            untranslated = json.load(f)
+        prefilled = prefill_translations(untranslated, translations, load_memory(), tm_threshold)
+        translations.update((original, match["translation"]) for original, match in prefilled.items())
+    return translations
+
 class TranslationSubmitter:
-    def __init__(self, game_name: str):
+    def __init__(self, game_name: str, wait_timeout_ms: int = 15000, mode: str = "sequential",
+                 batch_size: int = 20, max_per_minute: int = 300, restart: bool = False,
+                 headless: Optional[bool] = None, client: Optional[BGALogin] = None,
+                 table_path: Optional[str] = None, tm_threshold: Optional[float] = None,
+                 check_placeholders: bool = True):
+        """
+        初始化翻译提交器
+        
+        Args:
+            game_name: 游戏名称
+            wait_timeout_ms: 等待页面就绪的上限（毫秒）
+            mode: 填写模式，sequential 逐条填写，batch 在页面内批量填写
+            batch_size: 批量模式下每次写入的条数，即同时触发的保存请求数
+            max_per_minute: 批量模式下每分钟最多填写的条数
+            restart: 是否忽略提交日志从头提交，默认跳过日志中已确认的条目
+            headless: 是否无头启动浏览器，默认读取 BGA_HEADLESS 环境变量（未设置时为无头）
+            client: 共享的 BGA 登录客户端，默认根据 .env 新建
+            table_path: 填写好译文的翻译表（Markdown、CSV、TSV、JSON Lines 或 XLIFF），默认为 untranslated.md
+            tm_threshold: 翻译表中没有译文的条目，使用相似度不低于该值的翻译记忆译文，默认不使用
+            check_placeholders: 提交前检查译文的占位符和标签是否与原文一致，不一致时不提交
+        """
+        setup_file_logging()
+        
         self.game_name = game_name
+        self.wait_timeout_ms = wait_timeout_ms
+        self.mode = mode
+        self.batch_size = max(1, batch_size)
+        self.max_per_minute = max(1, max_per_minute)
+        self.restart = restart
+        self.tm_threshold = tm_threshold
+        self.check_placeholders = check_placeholders
         self.game_dir = Path(f"data/games/{game_name}")
-        self.untranslated_path = self.game_dir / "translations/untranslated.md"
+        self.untranslated_path = Path(table_path) if table_path else self.game_dir / "translations/untranslated.md"
         self.game_info_path = self.game_dir / "metadata/game_info.json"
         
         # 加载环境变量
@@ -41,98 +117,80 @@ class TranslationSubmitter:
             
         logger.info(f"已加载配置: 用户名={self.username}")
         
-        # 初始化 Playwright
-        self.init_browser()
+        # 登录客户端用于校验和复用缓存的会话，批量任务中可传入共享的已登录客户端
+        self.client = client or BGALogin(
+            username=self.username,
+            password=self.password,
+            session_store=SessionStore.from_env(self.username, self.password)
+        )
+        
+        # Playwright 在首次访问 page/context 时才启动，只走 HTTP 接口的命令不会打开浏览器
+        self.headless = headless
+        # 未找到译文的原文可能成千上万条，逐条警告按每秒条数限流
+        self.missing_log = LogSampler(logger, per_second=5)
+        self._pool = None
+        self._context = None
+        self._page = None
+        self._waiter = None
         
     def init_browser(self):
         """初始化 Playwright 浏览器"""
         try:
-            self.playwright = sync_playwright().start()
-            self.browser = self.playwright.chromium.launch(
-                headless=False,
-                args=['--start-maximized']
-            )
-            self.context = self.browser.new_context(
-                viewport={'width': 1920, 'height': 1080}
-            )
-            self.page = self.context.new_page()
+            self._pool = BrowserPool(headless=self.headless).start()
+            self._context = self._pool.acquire_context()
+            self._page = self._context.new_page()
+            self._waiter = PageWaiter(self._page, timeout_ms=self.wait_timeout_ms)
             logger.info("成功初始化浏览器")
         except Exception as e:
             logger.error(f"初始化浏览器失败: {e}")
             raise
             
+    @property
+    def context(self):
+        """浏览器上下文，首次访问时启动浏览器"""
+        if self._context is None:
+            self.init_browser()
+        return self._context
+    
+    @property
+    def page(self) -> Page:
+        """当前页面，首次访问时启动浏览器"""
+        if self._page is None:
+            self.init_browser()
+        return self._page
+    
+    @property
+    def waiter(self) -> PageWaiter:
+        """页面等待器，首次访问时启动浏览器"""
+        if self._waiter is None:
+            self.init_browser()
+        return self._waiter
+    
+    def close(self):
+        """关闭浏览器；Playwright 对象只能在创建它的线程中关闭，多线程使用时应显式调用"""
+        if getattr(self, '_pool', None):
+            self._pool.close()
+            self._pool = None
+            self._context = self._page = self._waiter = None
+    
     def __del__(self):
         """析构函数，确保关闭浏览器"""
-        if hasattr(self, 'context'):
-            self.context.close()
-        if hasattr(self, 'browser'):
-            self.browser.close()
-        if hasattr(self, 'playwright'):
-            self.playwright.stop()
+        self.close()
             
-    def load_game_info(self) -> Optional[int]:
-        """加载游戏信息，返回module_id"""
+    @metrics.timed("login")
+    def login(self) -> bool:
+        """使用 Playwright 登录 BGA，优先复用缓存的会话"""
         try:
-            with open(self.game_info_path, 'r', encoding='utf-8') as f:
-                game_info = json.load(f)
-                module_id = game_info.get('id')
-                logger.info(f"成功加载游戏信息，module_id: {module_id}")
-                return module_id
-        except Exception as e:
-            logger.error(f"加载游戏信息失败: {e}")
-            return None
+            if restore_browser_session(self.client, self.context):
+                logger.info("已复用缓存的登录会话，跳过页面登录")
+                return True
             
-    def load_translation_table(self) -> dict:
-        """加载翻译对照表"""
-        translations = {}
-        try:
-            with open(self.untranslated_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                # 解析翻译对照表
-                for line in content.split('\n'):
-                    if '|' in line and '原文' in line and '译文' in line:
-                        continue
-                    if '|' in line and line.count('|') >= 3:  # 确保至少有3列
-                        parts = [part.strip() for part in line.split('|')]
-                        if len(parts) >= 4:  # 分割后应该至少有4部分：空、原文、原文出处、译文
-                            original = parts[1]  # 第2列是原文
-                            translation = parts[3]  # 第4列是译文
-                            if original and translation and translation != '':  # 确保译文不为空
-                                translations[original] = translation
-                                logger.debug(f"加载翻译: {original} -> {translation}")
-                logger.info(f"成功加载翻译对照表，共 {len(translations)} 条翻译")
-                # 打印前5条翻译作为示例
-                for i, (original, translation) in enumerate(list(translations.items())[:5]):
-                    logger.info(f"示例翻译 {i+1}:")
-                    logger.info(f"原文: {original}")
-                    logger.info(f"译文: {translation}")
-        except Exception as e:
-            logger.error(f"加载翻译对照表失败: {e}")
-        return translations
-        
-    def submit_translations(self) -> bool:
-        """提交翻译内容"""
-        try:
-            # 1. 加载必要数据
-            module_id = self.load_game_info()
-            if not module_id:
-                logger.error("无法获取module_id")
-                return False
-                
-            translations = self.load_translation_table()
-            if not translations:
-                logger.error("没有可用的翻译内容")
-                return False
-                
-            # 2. 登录并访问翻译页面
-            logger.info("正在登录...")
             # 打开登录页面
             logger.info("正在打开登录页面...")
             self.page.goto("https://boardgamearena.com/account")
-            self.page.wait_for_load_state("networkidle")
-            self.page.wait_for_timeout(2000)  # 等待2秒确保页面完全加载
+            self.waiter.wait_for_page_ready("登录页面加载")
             logger.info(f"当前页面URL: {self.page.url}")
-            
+        
             # 输入用户名
             logger.info("正在输入用户名...")
             username_input = self.page.locator("form").filter(has_text="下一个").get_by_placeholder("电子邮件或用户名")
@@ -140,19 +198,18 @@ class TranslationSubmitter:
             username_input.click()
             username_input.fill(self.username)
             logger.info("用户名输入完成")
-            
+        
             # 点击"下一个"按钮
             logger.info("正在点击'下一个'按钮...")
             next_button = self.page.get_by_role("link", name="下一个")
             next_button.wait_for(state="visible")  # 等待按钮可见
             next_button.click()
-            
+        
             # 等待页面响应
             logger.info("等待密码输入页面加载...")
-            self.page.wait_for_load_state("networkidle")
-            self.page.wait_for_timeout(2000)  # 等待2秒
+            self.waiter.wait_for_page_ready("密码页面加载")
             logger.info(f"当前页面URL: {self.page.url}")
-            
+        
             # 输入密码
             logger.info("正在输入密码...")
             password_input = self.page.get_by_role("textbox", name="密码")
@@ -160,58 +217,218 @@ class TranslationSubmitter:
             password_input.click()
             password_input.fill(self.password)
             logger.info("密码输入完成")
-            
+        
             # 点击登录按钮
             logger.info("正在点击登录按钮...")
             login_button = self.page.locator("#account-module").get_by_role("link", name="登录", exact=True)
             login_button.wait_for(state="visible")  # 等待登录按钮可见
             login_button.click()
-            
+        
             # 等待登录成功
             logger.info("等待登录完成...")
-            self.page.wait_for_load_state("networkidle")
-            self.page.wait_for_timeout(5000)  # 等待5秒确保登录完成
+            self.waiter.wait_for_page_ready("登录完成")
             logger.info(f"当前页面URL: {self.page.url}")
             logger.info("登录成功！")
-            
+        
             # 先访问主页，确保登录状态生效
             logger.info("访问主页，确认登录状态...")
             self.page.goto("https://boardgamearena.com/")
-            self.page.wait_for_load_state("networkidle")
-            self.page.wait_for_timeout(5000)  # 等待5秒
+            self.waiter.wait_for_page_ready("主页加载")
             logger.info(f"当前页面URL: {self.page.url}")
             
+            save_browser_session(self.client, self.context, self.page)
+            return True
+        except Exception as e:
+            logger.error(f"登录失败: {e}")
+            return False
+        
+    def load_game_info(self) -> Optional[int]:
+        """加载游戏信息，返回module_id"""
+        try:
+            with open(self.game_info_path, 'r', encoding='utf-8') as f:
+                game_info = json.load(f)
+                module_id = game_info.get('id')
+                logger.info(f"成功加载游戏信息，module_id: {module_id}")
+                return module_id
+        except Exception as e:
+            logger.error(f"加载游戏信息失败: {e}")
+            return None
+            
+    def load_translation_table(self) -> dict:
+        """加载翻译对照表"""
+        try:
+            return load_submit_table(self.game_dir, self.untranslated_path, self.tm_threshold)
+        except Exception as e:
+            logger.error(f"加载翻译对照表失败: {e}")
+            return {}
+        
+    @metrics.timed("fill")
+    def _fill_page_sequential(self, original_textareas: list, translations: dict, page_number: int):
+        """
+        逐条填写当前页的译文，每条等待自动保存返回
+        
+        Args:
+            original_textareas: 当前页的原文输入框
+            translations: 原文到译文的映射
+            page_number: 当前页码，记录到提交日志
+        """
+        for textarea in original_textareas:
+            try:
+                # 获取原文输入框的ID和内容
+                original_id = textarea.get_attribute("id")
+                if not original_id:
+                    logger.error("无法获取原文输入框ID")
+                    continue
+                
+                string_id = original_id.split("_")[1]
+                    
+                # 使用evaluate处理JavaScript来获取文本内容
+                original_text = textarea.evaluate("node => node.value")
+                if not original_text:
+                    logger.error(f"无法获取原文内容，ID: {original_id}")
+                    continue
+                    
+                logger.debug("原文: %s", original_text)
+                
+                # 查找对应的翻译
+                if original_text not in translations:
+                    self.missing_log.warning("未找到原文的翻译: %s", original_text)
+                    continue
+                    
+                translation = translations[original_text]
+                logger.debug("找到对应翻译: %s", translation)
+                
+                # 跳过提交日志中已确认保存、且之后没有修改过的译文
+                if self.journal.is_confirmed(string_id, translation):
+                    continue
+                
+                # 构造并定位译文输入框
+                translated_id = original_id.replace("toTranslate_", "translated_")
+                translated_textarea = self.page.locator(f"textarea#{translated_id}")
+                
+                # 填写译文，失去焦点触发自动保存，并等待保存请求返回
+                translated_textarea.wait_for(state="visible")
+                with self.waiter.expect_save() as outcome:
+                    translated_textarea.click()
+                    translated_textarea.fill(translation)
+                    translated_textarea.blur()
+                self.journal.record(string_id, STATUS_CONFIRMED if outcome["confirmed"] else STATUS_SUBMITTED, page_number,
+                                    translation)
+                metrics.count("strings_submitted", engine="browser", status="confirmed" if outcome["confirmed"] else "submitted")
+                logger.debug("已填写翻译到 %s", translated_id)
+                
+            except Exception as e:
+                logger.error(f"处理翻译块时出错: {e}")
+    
+    @metrics.timed("fill")
+    def _fill_page_batch(self, translations: dict, page_number: int) -> int:
+        """
+        批量填写当前页的译文：一次 evaluate 读取原文，按批次在页面内写入译文并
+        触发自动保存监听的事件，再通过网络响应确认保存结果
+        
+        Args:
+            translations: 原文到译文的映射
+            page_number: 当前页码，记录到提交日志
+            
+        Returns:
+            int: 确认保存成功的条数
+        """
+        rows = self.page.evaluate(ORIGINALS_SCRIPT)
+        mapping = {}
+        for original_id, original_text in rows:
+            if original_text not in translations:
+                self.missing_log.warning("未找到原文的翻译: %s", original_text)
+            elif not self.journal.is_confirmed(original_id.split("_")[1], translations[original_text]):
+                mapping[original_id.replace("toTranslate_", "translated_")] = translations[original_text]
+        
+        if not mapping:
+            return 0
+        
+        items = list(mapping.items())
+        tracker = SaveTracker(self.page)
+        filled = 0
+        try:
+            for start in range(0, len(items), self.batch_size):
+                chunk = dict(items[start:start + self.batch_size])
+                chunk_started = time.monotonic()
+                failed_before = tracker.failed
+                
+                filled_ids = self.page.evaluate(BATCH_FILL_SCRIPT, chunk)
+                filled += len(filled_ids)
+                missing = set(chunk) - set(filled_ids)
+                if missing:
+                    logger.warning(f"页面上找不到 {len(missing)} 个译文输入框: {sorted(missing)}")
+                
+                # 整批都收到成功响应才记为已确认，否则记为已提交，下次运行会重新填写
+                confirmed = self.waiter.wait_for_saves(tracker, filled) and tracker.failed == failed_before
+                for translated_id in filled_ids:
+                    self.journal.record(translated_id.split("_")[1], STATUS_CONFIRMED if confirmed else STATUS_SUBMITTED, page_number,
+                                        chunk[translated_id])
+                metrics.count("strings_submitted", len(filled_ids), engine="browser",
+                              status="confirmed" if confirmed else "submitted")
+                
+                # 按每分钟上限节流，避免触发 BGA 的频率限制
+                min_duration = len(chunk) * 60.0 / self.max_per_minute
+                remaining = min_duration - (time.monotonic() - chunk_started)
+                if remaining > 0 and start + self.batch_size < len(items):
+                    self.page.wait_for_timeout(remaining * 1000)
+        finally:
+            tracker.detach()
+        
+        logger.info(f"本页批量填写 {filled} 条，确认保存 {tracker.confirmed} 条，失败 {tracker.failed} 条")
+        return tracker.confirmed
+        
+    def submit_translations(self) -> bool:
+        """提交翻译内容"""
+        try:
+            # 1. 加载必要数据
+            module_id = self.load_game_info()
+            if not module_id:
+                logger.error("无法获取module_id")
+                return False
+                
+            translations = self.load_translation_table()
+            if not translations:
+                logger.error("没有可用的翻译内容")
+                return False
+            if self.check_placeholders and not validate_for_submit(
+                    self.game_name, ((self.game_name, original, original, translation)
+                                     for original, translation in translations.items())):
+                return False
+                
+            # 2. 登录并访问翻译页面
+            logger.info("正在登录...")
+            if not self.login():
+                return False
+            
             # 跳转到翻译页面
             logger.info("正在跳转到翻译页面...")
             translation_url = f"https://boardgamearena.com/translation?module_id={module_id}&source_locale=en_US&dest_locale=zh_CN&findtype=untranslated"
             logger.info(f"目标URL: {translation_url}")
-            self.page.goto(translation_url)
-            
-            # 等待页面完全加载
-            logger.info("等待页面加载...")
-            self.page.wait_for_load_state("networkidle")
-            self.page.wait_for_timeout(8000)  # 等待8秒，确保页面完全加载
+            with metrics.span("navigate", view="untranslated"):
+                self.page.goto(translation_url)
+                
+                # 等待页面完全加载
+                logger.info("等待页面加载...")
+                self.waiter.wait_for_textareas("翻译页面加载")
             logger.info(f"当前页面URL: {self.page.url}")
             
             # 检查是否成功跳转到翻译页面
             current_url = self.page.url
             if "translation" not in current_url or str(module_id) not in current_url:
                 logger.error(f"跳转失败，当前页面: {current_url}")
-                logger.error("页面内容:")
-                logger.error(self.page.content())
+                if dom_dump_enabled():
+                    logger.error("页面内容:\n%s", self.page.content())
                 return False
                 
             logger.info("成功跳转到翻译页面")
             
             # 等待翻译块加载
             logger.info("等待翻译块加载...")
+            self.journal = SubmissionJournal(self.game_name, restart=self.restart)
+            page_number = 1
             try:
                 while True:  # 循环处理每一页
-                    # 先检查页面内容
-                    logger.info("检查页面内容...")
-                    page_content = self.page.content()
-                    logger.info(f"页面内容长度: {len(page_content)}")
-                    
                     # 直接查找原文输入框
                     logger.info("查找原文输入框...")
                     original_textareas = self.page.locator("textarea[id^='toTranslate_']").all()
@@ -224,9 +441,10 @@ class TranslationSubmitter:
                         next_page = self.page.locator("a.pagination_next")
                         if next_page.count() > 0 and not next_page.is_disabled():
                             logger.info("找到下一页按钮，点击进入下一页...")
+                            marker = self.waiter.pagination_marker()
                             next_page.click()
-                            self.page.wait_for_load_state("networkidle")
-                            self.page.wait_for_timeout(5000)  # 等待页面加载
+                            self.waiter.wait_for_pagination_change(marker)
+                            page_number += 1
                             continue
                         else:
                             logger.info("没有下一页了，翻译任务完成")
@@ -234,45 +452,10 @@ class TranslationSubmitter:
                     
                     # 处理每个翻译块
                     logger.info("=== 开始处理翻译 ===")
-                    for textarea in original_textareas:
-                        try:
-                            # 获取原文输入框的ID和内容
-                            original_id = textarea.get_attribute("id")
-                            if not original_id:
-                                logger.error("无法获取原文输入框ID")
-                                continue
-                                
-                            # 使用evaluate处理JavaScript来获取文本内容
-                            original_text = textarea.evaluate("node => node.value")
-                            if not original_text:
-                                logger.error(f"无法获取原文内容，ID: {original_id}")
-                                continue
-                                
-                            logger.info(f"原文: {original_text}")
-                            
-                            # 查找对应的翻译
-                            if original_text not in translations:
-                                logger.warning(f"未找到原文的翻译: {original_text}")
-                                continue
-                                
-                            translation = translations[original_text]
-                            logger.info(f"找到对应翻译: {translation}")
-                            
-                            # 构造并定位译文输入框
-                            translated_id = original_id.replace("toTranslate_", "translated_")
-                            translated_textarea = self.page.locator(f"textarea#{translated_id}")
-                            
-                            # 填写译文
-                            translated_textarea.wait_for(state="visible")
-                            translated_textarea.click()
-                            translated_textarea.fill(translation)
-                            logger.info(f"已填写翻译到 {translated_id}")
-                            
-                            # 等待一小段时间，避免操作太快
-                            self.page.wait_for_timeout(500)  # 等待0.5秒
-                            
-                        except Exception as e:
-                            logger.error(f"处理翻译块时出错: {e}")
+                    if self.mode == "batch":
+                        self._fill_page_batch(translations, page_number)
+                    else:
+                        self._fill_page_sequential(original_textareas, translations, page_number)
                             
                     logger.info("=== 当前页翻译处理结束 ===")
                     
@@ -280,9 +463,10 @@ class TranslationSubmitter:
                     next_page = self.page.locator("a.pagination_next")
                     if next_page.count() > 0 and not next_page.is_disabled():
                         logger.info("找到下一页按钮，点击进入下一页...")
+                        marker = self.waiter.pagination_marker()
                         next_page.click()
-                        self.page.wait_for_load_state("networkidle")
-                        self.page.wait_for_timeout(5000)  # 等待页面加载
+                        self.waiter.wait_for_pagination_change(marker)
+                        page_number += 1
                     else:
                         logger.info("没有下一页了，翻译任务完成")
                         break
@@ -290,6 +474,10 @@ class TranslationSubmitter:
             except Exception as e:
                 logger.error(f"查找翻译块时出错: {e}")
                 return False
+            finally:
+                self.journal.close()
+                self.missing_log.flush("另有 %d 条未找到译文的原文未逐条输出")
+                self.waiter.log_summary()
                 
             return True
             
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+批量任务测试
+
+用法:
+    python -m pytest src/test_batch_runner.py
+"""
+
+import json
+import time
+from src.batch_runner import BatchRunner, resolve_games
+from src.bga_login import BGALogin
+from src.submitter.http_submitter import HTTPTranslationSubmitter
+from src.utils.fake_bga_server import FakeBGAServer, make_strings
+from src.utils.rate_limiter import TokenBucket, throttle_session
+
+def test_resolve_games(tmp_path):
+    for name in ("azul", "agricola", "carcassonne"):
+        (tmp_path / name).mkdir()
+    assert resolve_games(["a*", "carcassonne", "# 注释", "azul"], str(tmp_path)) == ["agricola", "azul", "carcassonne"]
+
+def test_run_reports_in_game_order(tmp_path, monkeypatch):
+    runner = BatchRunner("fetch-game-info", ["slow", "broken", "fast"], workers=3,
+                         report_path=str(tmp_path / "report.json"))
+    monkeypatch.setattr(runner, "_prepare", lambda: None)
+
+    def run_step(game):
+        # 完成顺序与列表顺序相反
+        time.sleep({"slow": 0.2, "broken": 0.1, "fast": 0.0}[game])
+        if game == "broken":
+            raise Exception("接口返回错误")
+
+    monkeypatch.setattr(runner, "_run_step", run_step)
+    report = runner.run()
+    assert [item["game"] for item in report["results"]] == ["slow", "broken", "fast"]
+    assert (report["succeeded"], report["failed"]) == (2, 1)
+    assert report["results"][1]["error"] == "接口返回错误"
+    assert json.loads((tmp_path / "report.json").read_text(encoding="utf-8")) == report
+
+def test_failed_prepare_fails_every_game(tmp_path, monkeypatch):
+    runner = BatchRunner("submit", ["a", "b"], report_path=str(tmp_path / "report.json"))
+
+    def prepare():
+        raise Exception("BGALogin登录失败")
+
+    monkeypatch.setattr(runner, "_prepare", prepare)
+    report = runner.run()
+    assert report["failed"] == 2
+    assert all(item["error"] == "初始化失败: BGALogin登录失败" for item in report["results"])
+
+def test_browser_steps_run_one_game_at_a_time(tmp_path):
+    report_path = str(tmp_path / "report.json")
+    assert BatchRunner("submit", ["a"], workers=4, engine="browser", report_path=report_path).workers == 1
+    assert BatchRunner("fetch-translation", ["a"], workers=4, engine="http", report_path=report_path).workers == 4
+
+def test_rate_limit_pauses_shared_bucket(tmp_path, monkeypatch):
+    """某个游戏触发服务端限速时暂停的是批量任务共享的令牌桶"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("TRANSLATION_STORE", "0")
+    strings = make_strings(20, translated_ratio=0)
+    for item in strings:
+        item["original"] = item["original"].replace(" | ", " / ")
+    translations_dir = tmp_path / "data/games/demo/translations"
+    translations_dir.mkdir(parents=True)
+    untranslated = {f"toTranslate_{item['id']}": dict(item, translation="") for item in strings}
+    (translations_dir / "untranslated.json").write_text(json.dumps(untranslated, ensure_ascii=False), encoding="utf-8")
+    rows = "".join(f"| {item['original']} |  | 译文 {item['original']} |\n" for item in strings)
+    (translations_dir / "untranslated.md").write_text("| 原文 | 原文出处 | 译文 |\n|---|---|---|\n" + rows, encoding="utf-8")
+
+    with FakeBGAServer(strings, save_rate_limit=5) as server:
+        client = BGALogin(username="tester", password="secret", base_url=server.url)
+        assert client.login()
+        shared = TokenBucket(50)
+        pauses = []
+        pause_for = shared.pause_for
+        monkeypatch.setattr(shared, "pause_for", lambda seconds: (pauses.append(seconds), pause_for(seconds)))
+        throttle_session(client.session, shared)
+        submitter = HTTPTranslationSubmitter("demo", client, workers=4, backoff=0.1, rate_limiter=shared)
+        assert submitter.rate_limiter is shared
+        assert submitter.submit_translations()
+        assert server.rate_limited > 0
+        # 触发限速后暂停的是共享令牌桶，其他使用同一令牌桶的游戏也会一起退避
+        assert pauses
+        assert len(server.saved) == 20
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+浏览器抓取引擎测试：导入时不加载 Playwright，未翻译核对用假的分页视图代替 Playwright 页面
+
+用法:
+    python -m pytest src/test_bga_translator.py
+"""
+
+import logging
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from src import bga_translator
+from src.bga_translator import BGATranslator
+
+def test_import_does_not_load_playwright():
+    code = "import sys, src.bga_translator; print('playwright' in sys.modules)"
+    # 在仓库根目录运行，与 pytest 从哪个目录启动无关
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, timeout=60,
+                            cwd=Path(__file__).resolve().parents[1])
+    assert result.stdout.strip() == "False", result.stderr
+
+def entries(ids):
+    return {f"toTranslate_{i}": {"original": f"String {i}", "context": "", "translation": ""} for i in ids}
+
+class FakeView:
+    """按页返回条目的未翻译视图，记录翻阅了多少页"""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.current = 0
+        self.opened = 0
+        self.turned = 0
+
+    # Page
+    def goto(self, url):
+        self.opened += 1
+        self.current = 0
+
+    def locator(self, selector):
+        return self
+
+    def count(self):
+        return 1 if self.current + 1 < len(self.pages) else 0
+
+    def is_disabled(self):
+        return False
+
+    def click(self):
+        self.current += 1
+        self.turned += 1
+
+    # PageWaiter
+    def wait_for_textareas(self, name):
+        return True
+
+    def pagination_marker(self):
+        return str(self.current)
+
+    def wait_for_pagination_change(self, marker):
+        return True
+
+@pytest.fixture(autouse=True)
+def first_keys_sample(monkeypatch):
+    """抽样固定取排序后的前 k 个，使抽中的条目可以预期"""
+    monkeypatch.setattr(bga_translator.random, "sample", lambda population, k: list(population)[:k])
+
+def make_translator(view):
+    translator = BGATranslator.__new__(BGATranslator)
+    translator._page = view
+    translator._waiter = view
+    translator.max_pages = 1000
+    translator.logger = logging.getLogger("test")
+    translator._harvest_page = lambda with_translation=True: dict(view.pages[view.current])
+    return translator
+
+def paged(ids, size=10):
+    ids = list(ids)
+    return [entries(ids[start:start + size]) for start in range(0, len(ids), size)]
+
+def test_ordered_view_stops_after_sample():
+    view = FakeView(paged(range(100)))
+    derived = entries(range(100))
+    assert make_translator(view)._verify_untranslated(1, derived, 15) is derived
+    assert view.turned == 1
+
+def test_extra_local_entry_is_found_without_paging_everything():
+    # 服务器视图中没有 3 号，本地却把它算作未翻译
+    view = FakeView(paged(i for i in range(101) if i != 3))
+    derived = entries(range(101))
+    result = make_translator(view)._verify_untranslated(1, derived, 5)
+    # 第一页就发现不一致，改用服务器视图时重新翻完所有页
+    assert view.opened == 2
+    assert "toTranslate_3" not in result and len(result) == 100
+
+def test_missing_local_entry_switches_to_full_server_view():
+    view = FakeView(paged(range(100)))
+    derived = entries(range(1, 100))
+    result = make_translator(view)._verify_untranslated(1, derived, 10)
+    assert view.opened == 2
+    assert "toTranslate_0" in result and len(result) == 100
+
+def test_unordered_view_pages_everything():
+    view = FakeView(paged(reversed(range(100))))
+    derived = entries(range(100))
+    assert make_translator(view)._verify_untranslated(1, derived, 5) is derived
+    assert view.turned == 9
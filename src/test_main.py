@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+命令行入口测试：命令的结果决定退出状态
+
+用法:
+    python -m pytest src/test_main.py
+"""
+
+import argparse
+import pytest
+from src import async_engine
+from src.main import run_command
+
+def async_args(**overrides):
+    values = dict(command="fetch-translation", game_name="alpha", more_games=["beta"], use_async=True,
+                  incremental=False, concurrency=2, rps=1.0, task_timeout=0, wait_timeout=1.0, headed=False,
+                  max_pages=10)
+    values.update(overrides)
+    return argparse.Namespace(**values)
+
+@pytest.mark.parametrize("results, expected", [
+    ([("alpha", {}, None), ("beta", True, None)], True),
+    ([("alpha", {}, None), ("beta", None, TimeoutError())], False),
+    ([("alpha", False, None), ("beta", True, None)], False),
+])
+def test_async_engine_result_reaches_exit_code(monkeypatch, results, expected):
+    monkeypatch.setattr(async_engine, "run_games", lambda action, games, **kwargs: results)
+    assert run_command(async_args(), parser=None) is expected
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+翻译表导出模块
+以流式方式逐条写出 Markdown 对照表、JSON 和 JSON Lines，条目边到达边写入缓冲区，不在内存中拼接整个文件
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 写文件的缓冲区大小，攒够后才真正写入磁盘
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+ALL_MD_HEADER = "| 原文 | 原文出处 | 当前译文 |\n|------|----------|----------|\n"
+UNTRANSLATED_MD_HEADER = "| 原文 | 原文出处 | 译文 |\n|------|----------|------|\n"
+
+_CELL_ESCAPES = str.maketrans({"\\": "\\\\", "|": "\\|", "\n": "\\n", "\r": "\\r"})
+_CELL_UNESCAPES = {"\\": "\\", "|": "|", "n": "\n", "r": "\r"}
+_ESCAPE_RE = re.compile(r"\\([\\|nr])")
+# 一个单元格：非竖线、非反斜杠字符或任意转义序列
+_CELL_RE = re.compile(r"(?:[^|\\]|\\.)*")
+
+def escape_cell(text: Optional[str]) -> str:
+    """
+    转义 Markdown 表格单元格中的反斜杠、竖线和换行，使对照表可以无损读回
+
+    Args:
+        text: 单元格原始内容
+
+    Returns:
+        str: 转义后的内容
+    """
+    return (text or "").translate(_CELL_ESCAPES)
+
+def unescape_cell(text: str) -> str:
+    """
+    还原 escape_cell 转义的内容，未知的转义序列原样保留
+
+    Args:
+        text: 转义后的单元格内容
+
+    Returns:
+        str: 原始内容
+    """
+    if "\\" not in text:
+        return text
+    return _ESCAPE_RE.sub(lambda m: _CELL_UNESCAPES[m.group(1)], text)
+
+def split_markdown_row(line: str) -> List[str]:
+    """
+    按未转义的竖线拆分 Markdown 表格行，返回还原后的各单元格（已去除首尾空白）
+
+    Args:
+        line: 表格行，如 "| a | b | c |"
+
+    Returns:
+        List[str]: 单元格内容，不含行首和行尾竖线外侧的空字段
+    """
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|") and not _ends_with_escape(line[:-1]):
+        line = line[:-1]
+    # 大多数行没有转义，直接按竖线拆分
+    if "\\" not in line:
+        return [cell.strip() for cell in line.split("|")]
+    cells = []
+    position = 0
+    while True:
+        match = _CELL_RE.match(line, position)
+        cells.append(unescape_cell(match.group(0).strip()))
+        # 单元格之后要么是行尾，要么是未转义的分隔竖线
+        position = match.end() + 1
+        if position > len(line):
+            return cells
+
+def _ends_with_escape(text: str) -> bool:
+    """末尾是否有奇数个反斜杠，即紧随其后的字符被转义"""
+    return (len(text) - len(text.rstrip("\\"))) % 2 == 1
+
+class MarkdownTableWriter:
+    """逐行写出 Markdown 对照表"""
+
+    def __init__(self, path: Path, with_translation: bool = True):
+        """
+        打开输出文件并写入表头
+
+        Args:
+            path: 输出路径
+            with_translation: 是否写出当前译文；为 False 时译文列留空，供填写
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.with_translation = with_translation
+        self.count = 0
+        self._file = open(self.path, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE)
+        self._file.write(ALL_MD_HEADER if with_translation else UNTRANSLATED_MD_HEADER)
+
+    def write(self, key: str, item: Dict):
+        """写出一条翻译条目"""
+        translation = escape_cell(item.get("translation")) if self.with_translation else ""
+        self._file.write(f"| {escape_cell(item['original'])} | {escape_cell(item.get('context'))} | {translation} |\n")
+        self.count += 1
+
+    def close(self):
+        """写完剩余缓冲并关闭文件"""
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self) -> "MarkdownTableWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+class JSONObjectWriter:
+    """逐条写出以条目键为键的 JSON 对象，输出与 json.dump(indent=2) 相同"""
+
+    def __init__(self, path: Path):
+        """
+        打开输出文件
+
+        Args:
+            path: 输出路径
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.count = 0
+        self._file = open(self.path, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE)
+        self._file.write("{")
+
+    def write(self, key: str, item: Dict):
+        """写出一条翻译条目"""
+        value = json.dumps(item, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+        self._file.write(f"{',' if self.count else ''}\n  {json.dumps(key, ensure_ascii=False)}: {value}")
+        self.count += 1
+
+    def close(self):
+        """补全对象结尾并关闭文件"""
+        if not self._file.closed:
+            self._file.write("\n}" if self.count else "}")
+            self._file.close()
+
+    def __enter__(self) -> "JSONObjectWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+class JSONLinesWriter:
+    """逐行写出 JSON Lines，每行一条包含 key 的条目，可以追加写入"""
+
+    def __init__(self, path: Path, append: bool = False):
+        """
+        打开输出文件
+
+        Args:
+            path: 输出路径
+            append: 是否追加到已有文件末尾
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.count = 0
+        self._file = open(self.path, "a" if append else "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE)
+
+    def write(self, key: str, item: Dict):
+        """写出一条翻译条目"""
+        self._file.write(json.dumps(dict(item, key=key), ensure_ascii=False) + "\n")
+        self.count += 1
+
+    def close(self):
+        """写完剩余缓冲并关闭文件"""
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self) -> "JSONLinesWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+EXPORT_FORMATS = {
+    "md": MarkdownTableWriter,
+    "json": JSONObjectWriter,
+    "jsonl": JSONLinesWriter
+}
+
+def export_entries(entries: Iterable[Tuple[str, Dict]], path: Path, fmt: str = "json", **kwargs) -> int:
+    """
+    把条目流写出到文件
+
+    Args:
+        entries: (条目键, 翻译条目) 序列，可以是生成器
+        path: 输出路径
+        fmt: 输出格式，md、json 或 jsonl
+        **kwargs: 传给对应写出器的参数，如 Markdown 的 with_translation
+
+    Returns:
+        int: 写出的条目数
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"不支持的导出格式: {fmt}")
+    with EXPORT_FORMATS[fmt](path, **kwargs) as writer:
+        for key, item in entries:
+            writer.write(key, item)
+    return writer.count
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+术语库模块
+把术语表按单词编译成 Aho-Corasick 自动机，一遍扫描原文的单词序列找出出现的全部术语，
+报告原文出现了术语但译文中没有规定译法的条目
+"""
+
+import json
+import logging
+import re
+import time
+from collections import Counter, deque
+from pathlib import Path
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+from .table_reader import read_table
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GLOSSARY_PATH = "data/glossary.md"
+DEFAULT_REPORT_PATH = "data/glossary_report.json"
+
+_WORD_RE = re.compile(r"\w+")
+
+def tokenize(text: str) -> List[str]:
+    """把文本切成小写单词序列，标点和空白只起分隔作用"""
+    return _WORD_RE.findall(text.lower())
+
+class Automaton:
+    """Aho-Corasick 多模式匹配自动机，模式和文本都是符号序列（字符串或单词列表）"""
+
+    def __init__(self, patterns: Iterable[Sequence[Hashable]]):
+        """
+        编译模式
+
+        Args:
+            patterns: 模式，按出现顺序编号，空模式被忽略
+        """
+        self.lengths: List[int] = []
+        goto: List[Dict[Hashable, int]] = [{}]
+        # 状态 -> 以该状态结尾的模式编号
+        output: List[List[int]] = [[]]
+        for pattern in patterns:
+            index = len(self.lengths)
+            self.lengths.append(len(pattern))
+            if not pattern:
+                continue
+            state = 0
+            for symbol in pattern:
+                next_state = goto[state].get(symbol)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][symbol] = next_state
+                    goto.append({})
+                    output.append([])
+                state = next_state
+            output[state].append(index)
+
+        # 按广度优先计算失败指针，并把转移补全成确定自动机：匹配时每个符号只查一次字典
+        fail = [0] * len(goto)
+        delta: List[Optional[Dict[Hashable, int]]] = [dict(goto[0])] + [None] * (len(goto) - 1)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            fallback = delta[fail[state]]
+            transitions = dict(fallback) if state else {}
+            for symbol, child in goto[state].items():
+                fail[child] = fallback.get(symbol, 0)
+                transitions[symbol] = child
+                queue.append(child)
+            delta[state] = transitions
+            output[state] = output[state] + output[fail[state]]
+        self._delta = delta
+        # 没有输出的状态为 None，扫描时直接跳过
+        self._output = [tuple(out) if out else None for out in output]
+
+    def __len__(self) -> int:
+        return len(self._delta)
+
+    def scan(self, symbols: Sequence[Hashable]) -> List[Tuple[int, int]]:
+        """
+        线性扫描符号序列
+
+        Args:
+            symbols: 待扫描的序列
+
+        Returns:
+            List[Tuple[int, int]]: (模式编号, 结束位置（不含）) 列表，按结束位置升序
+        """
+        delta = self._delta
+        output = self._output
+        matches = []
+        state = 0
+        for position, symbol in enumerate(symbols, 1):
+            state = delta[state].get(symbol, 0)
+            out = output[state]
+            if out is not None:
+                matches.extend((index, position) for index in out)
+        return matches
+
+def _plural_forms(words: Tuple[str, ...]) -> List[Tuple[str, ...]]:
+    """术语本身及最后一个单词加 s/es 的形式"""
+    *head, last = words
+    return [words, (*head, last + "s"), (*head, last + "es")]
+
+class Glossary:
+    """术语表：原文术语到规定译法"""
+
+    def __init__(self):
+        # 原文术语（小写）-> [原文术语, 允许的译法列表]
+        self.terms: Dict[str, List] = {}
+        self._automaton: Optional[Automaton] = None
+        # 自动机模式编号 -> 术语编号（每个术语有单数和复数几个模式）
+        self._term_of: List[int] = []
+        self._entries: List[List] = []
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def add(self, term: str, translation: str):
+        """
+        加入一条术语，同一术语多次加入时每个译法都被接受
+
+        Args:
+            term: 原文术语，按单词匹配且不区分大小写，也匹配最后一个单词加 s/es 的复数
+            translation: 规定译法，可用 / 分隔多个可接受的译法
+        """
+        term = term.strip()
+        targets = [target.strip() for target in translation.split("/") if target.strip()]
+        if not tokenize(term) or not targets:
+            return
+        entry = self.terms.setdefault(" ".join(tokenize(term)), [term, []])
+        entry[1].extend(target for target in targets if target not in entry[1])
+        self._automaton = None
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_GLOSSARY_PATH) -> "Glossary":
+        """
+        读取术语表文件，格式与翻译表相同（Markdown、CSV、TSV、JSON Lines 或 XLIFF），原文列为术语、译文列为译法
+
+        Args:
+            path: 术语表路径
+
+        Returns:
+            Glossary: 术语表
+        """
+        table = read_table(Path(path))
+        table.log_problems()
+        glossary = cls()
+        for row in table.rows:
+            glossary.add(row["original"], row["translation"])
+        logger.info(f"已加载术语表 {path}：{len(glossary)} 条术语")
+        return glossary
+
+    def compile(self):
+        """把所有术语编译成一个自动机"""
+        patterns = []
+        self._term_of = []
+        self._entries = list(self.terms.values())
+        for index, key in enumerate(self.terms):
+            forms = _plural_forms(tuple(key.split(" ")))
+            patterns.extend(forms)
+            self._term_of.extend([index] * len(forms))
+        self._automaton = Automaton(patterns)
+
+    def terms_in(self, original: str) -> List[Tuple[int, int, int]]:
+        """
+        找出原文中出现的术语。重叠的匹配取最靠左、最长的一个，因此 "Victory Point" 不会同时算作 "Point"
+
+        Args:
+            original: 原文
+
+        Returns:
+            List[Tuple[int, int, int]]: (术语编号, 开始单词位置, 结束单词位置) 列表
+        """
+        if self._automaton is None:
+            self.compile()
+        matches = self._automaton.scan(tokenize(original))
+        if not matches:
+            return []
+        lengths = self._automaton.lengths
+        term_of = self._term_of
+        # 匹配按结束位置升序到达：包含前面匹配的更长匹配替换掉前者，与前面部分重叠的匹配丢弃。
+        # 先找到开始位置在新匹配之前的最后一个已保留匹配，确定新匹配会被保留后才移除被它包含的匹配，
+        # 避免新匹配被丢弃时连带丢掉仍然有效的短匹配
+        kept = []
+        for index, end in matches:
+            start = end - lengths[index]
+            contained = len(kept)
+            while contained and kept[contained - 1][1] >= start:
+                contained -= 1
+            if contained and kept[contained - 1][2] > start:
+                continue
+            del kept[contained:]
+            kept.append((term_of[index], start, end))
+        return kept
+
+    def check_pair(self, original: str, translation: str) -> List[Dict]:
+        """
+        检查一对原文和译文
+
+        Args:
+            original: 原文
+            translation: 译文
+
+        Returns:
+            List[Dict]: 缺少规定译法的术语，每项包含 term 和 expected
+        """
+        issues = []
+        seen = set()
+        for index, _, _ in self.terms_in(original):
+            if index in seen:
+                continue
+            seen.add(index)
+            term, expected = self._entries[index]
+            for target in expected:
+                if target in translation:
+                    break
+            else:
+                issues.append({"term": term, "expected": expected})
+        return issues
+
+    def check(self, pairs: Iterable[Tuple[str, str, str, str]]) -> Dict:
+        """
+        检查一批条目，只检查已有译文的条目
+
+        Args:
+            pairs: (游戏, 条目键, 原文, 译文) 序列
+
+        Returns:
+            Dict: 报告，包含检查条数、问题条目列表和按术语汇总的问题数
+        """
+        if self._automaton is None:
+            self.compile()
+        started = time.monotonic()
+        checked = 0
+        issues = []
+        by_term = Counter()
+        for game, key, original, translation in pairs:
+            if not translation:
+                continue
+            checked += 1
+            missing = self.check_pair(original, translation)
+            if not missing:
+                continue
+            issues.append({"game": game, "key": key, "original": original, "translation": translation,
+                           "missing": missing})
+            by_term.update(item["term"] for item in missing)
+        return {
+            "terms": len(self.terms),
+            "checked": checked,
+            "inconsistent": len(issues),
+            "seconds": round(time.monotonic() - started, 3),
+            "by_term": dict(by_term.most_common()),
+            "issues": issues
+        }
+
+def iter_game_pairs(games: List[str], games_dir: str = "data/games") -> Iterable[Tuple[str, str, str, str]]:
+    """
+    依次读取各游戏 all_translations.json 中的条目
+
+    Args:
+        games: 游戏名列表
+        games_dir: 游戏数据目录
+
+    Yields:
+        Tuple[str, str, str, str]: (游戏, 条目键, 原文, 译文)
+    """
+    for game in games:
+        path = Path(games_dir) / game / "translations" / "all_translations.json"
+        if not path.exists():
+            logger.warning(f"跳过 {game}：没有 all_translations.json")
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        for key, item in entries.items():
+            yield game, key, item["original"], item.get("translation") or ""
+
+def iter_table_pairs(path: str) -> Iterable[Tuple[str, str, str, str]]:
+    """
+    读取翻译表中已填写的条目
+
+    Args:
+        path: 翻译表路径
+
+    Yields:
+        Tuple[str, str, str, str]: (表路径, 条目键或行号, 原文, 译文)
+    """
+    table = read_table(Path(path))
+    table.log_problems()
+    for row in table.rows:
+        yield str(path), row["id"] or f"line {row['line']}", row["original"], row["translation"]
+
+def write_report(report: Dict, path: str = DEFAULT_REPORT_PATH) -> Path:
+    """
+    保存检查报告
+
+    Args:
+        report: Glossary.check 返回的报告
+        path: 输出路径
+
+    Returns:
+        Path: 报告文件路径
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return path
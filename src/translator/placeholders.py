@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+占位符检查模块
+用一个预编译的正则提取原文和译文中的占位符（${player_name}、%s、{x}）和 HTML 标签，
+按多重集比较两者，译文丢失或多出占位符时不允许提交
+"""
+
+import json
+import logging
+import re
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REPORT_PATH = "data/placeholder_report.json"
+
+# 依次为 ${name}、printf 风格的 %s/%1$d/%.2f、{name} 和 HTML 标签
+_TOKEN_RE = re.compile(
+    r"\$\{[^{}]*\}"
+    r"|%(?:\d+\$)?[-+0]*\d*(?:\.\d+)?[sdifuxXc]"
+    r"|\{[A-Za-z_][\w.]*\}"
+    r"|</?[A-Za-z][A-Za-z0-9]*(?:\s[^<>]*)?/?>"
+)
+_TAG_SPACES = re.compile(r"\s+")
+
+def extract_tokens(text: str) -> List[str]:
+    """
+    提取文本中的占位符和标签，保持出现顺序
+
+    Args:
+        text: 原文或译文
+
+    Returns:
+        List[str]: 占位符和标签列表
+    """
+    return _TOKEN_RE.findall(text)
+
+def _normalize(token: str) -> str:
+    """标签不区分大小写，<br>、<br/> 和 <br /> 视为相同，其余占位符原样比较"""
+    if not token.startswith("<"):
+        return token
+    return _TAG_SPACES.sub(" ", token[1:-1].rstrip("/").strip()).lower()
+
+def compare_tokens(original: str, translation: str) -> Tuple[List[str], List[str]]:
+    """
+    比较原文和译文的占位符多重集，译文可以调整占位符的顺序
+
+    Args:
+        original: 原文
+        translation: 译文
+
+    Returns:
+        Tuple[List[str], List[str]]: (译文缺少的, 译文多出的)，一致时都为空
+    """
+    expected = _TOKEN_RE.findall(original)
+    actual = _TOKEN_RE.findall(translation)
+    # 绝大多数条目占位符完全相同或只是顺序不同，不必构建 Counter
+    if expected == actual or sorted(expected) == sorted(actual):
+        return [], []
+    expected_counts = Counter(map(_normalize, expected))
+    actual_counts = Counter(map(_normalize, actual))
+    if expected_counts == actual_counts:
+        return [], []
+    originals = {_normalize(token): token for token in expected}
+    originals.update((_normalize(token), token) for token in actual if _normalize(token) not in originals)
+    missing = [originals[token] for token in (expected_counts - actual_counts).elements()]
+    extra = [originals[token] for token in (actual_counts - expected_counts).elements()]
+    return missing, extra
+
+def check_pairs(pairs: Iterable[Tuple[str, str, str, str]]) -> Dict:
+    """
+    检查一批条目，只检查已有译文的条目
+
+    Args:
+        pairs: (游戏, 条目键, 原文, 译文) 序列
+
+    Returns:
+        Dict: 报告，包含检查条数、不一致条数和每条不一致条目缺少和多出的占位符
+    """
+    started = time.monotonic()
+    findall = _TOKEN_RE.findall
+    checked = 0
+    issues = []
+    for game, key, original, translation in pairs:
+        if not translation:
+            continue
+        checked += 1
+        # 先就地比较，只有占位符不同时才调用 compare_tokens 计算差异
+        expected = findall(original)
+        actual = findall(translation)
+        if expected == actual:
+            continue
+        missing, extra = compare_tokens(original, translation)
+        if missing or extra:
+            issues.append({"game": game, "key": key, "original": original, "translation": translation,
+                           "missing": missing, "extra": extra})
+    return {
+        "checked": checked,
+        "mismatched": len(issues),
+        "seconds": round(time.monotonic() - started, 3),
+        "issues": issues
+    }
+
+def write_report(report: Dict, path: str = DEFAULT_REPORT_PATH) -> Path:
+    """
+    保存检查报告
+
+    Args:
+        report: check_pairs 返回的报告
+        path: 输出路径
+
+    Returns:
+        Path: 报告文件路径
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return path
+
+def log_issues(report: Dict, limit: int = 20):
+    """输出不一致的条目，超过 limit 条时只输出数量"""
+    for issue in report["issues"][:limit]:
+        details = []
+        if issue["missing"]:
+            details.append(f"缺少 {' '.join(issue['missing'])}")
+        if issue["extra"]:
+            details.append(f"多出 {' '.join(issue['extra'])}")
+        logger.error(f"  {issue['key']}: {'，'.join(details)}：{issue['original'][:60]}")
+    if len(report["issues"]) > limit:
+        logger.error(f"  …… 另有 {len(report['issues']) - limit} 条未列出")
+
+def validate_for_submit(game_name: str, pairs: Iterable[Tuple[str, str, str, str]]) -> bool:
+    """
+    提交前检查占位符，不一致时把报告写入游戏的 translations/placeholder_report.json
+
+    Args:
+        game_name: 游戏名称
+        pairs: 待提交的 (游戏, 条目键, 原文, 译文) 序列
+
+    Returns:
+        bool: 全部一致时返回 True
+    """
+    report = check_pairs(pairs)
+    if not report["mismatched"]:
+        logger.info(f"占位符检查通过：{report['checked']} 条译文")
+        return True
+    path = write_report(report, f"data/games/{game_name}/translations/placeholder_report.json")
+    logger.error(f"{report['mismatched']} 条译文的占位符或标签与原文不一致，已停止提交，详见 {path}")
+    log_issues(report)
+    return False
@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+翻译存储模块
+用一个 SQLite 数据库保存所有游戏的字符串、出处、译文和提交状态，抓取结果以批量事务写入，
+JSON 和 Markdown 对照表改为按需从数据库导出
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from .exporters import export_entries
+from .translation_files import log_saved_files, write_json_table, write_markdown_table
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_PATH = "data/translations.db"
+DEFAULT_LANGUAGE = "zh"
+DEFAULT_BATCH_SIZE = 500
+KEY_PREFIX = "toTranslate_"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS contexts (
+    id INTEGER PRIMARY KEY,
+    text TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS strings (
+    game TEXT NOT NULL,
+    string_id TEXT NOT NULL,
+    original TEXT NOT NULL,
+    context_id INTEGER REFERENCES contexts(id),
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (game, string_id)
+);
+CREATE INDEX IF NOT EXISTS idx_strings_original ON strings(original);
+CREATE TABLE IF NOT EXISTS translations (
+    game TEXT NOT NULL,
+    string_id TEXT NOT NULL,
+    language TEXT NOT NULL,
+    translation TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (game, string_id, language)
+);
+CREATE TABLE IF NOT EXISTS submissions (
+    game TEXT NOT NULL,
+    string_id TEXT NOT NULL,
+    language TEXT NOT NULL,
+    status TEXT NOT NULL,
+    page INTEGER,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (game, string_id, language)
+);
+CREATE INDEX IF NOT EXISTS idx_submissions_status ON submissions(game, language, status);
+"""
+
+def string_id_of(key: str) -> str:
+    """条目键 toTranslate_<id> 转为字符串 ID"""
+    return key[len(KEY_PREFIX):] if key.startswith(KEY_PREFIX) else key
+
+def key_of(string_id: str) -> str:
+    """字符串 ID 转为条目键 toTranslate_<id>"""
+    return f"{KEY_PREFIX}{string_id}"
+
+def _chunks(items: List, size: int) -> Iterator[List]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+class TranslationStore:
+    """基于 SQLite 的翻译存储，同一实例可在多个线程中使用，写入时串行"""
+
+    def __init__(self, db_path: str = DEFAULT_STORE_PATH, batch_size: int = DEFAULT_BATCH_SIZE):
+        """
+        初始化存储，首次使用时创建数据库和表
+
+        Args:
+            db_path: 数据库文件路径
+            batch_size: 批量写入时每条 SQL 语句处理的行数
+        """
+        self.db_path = Path(db_path)
+        self.batch_size = max(1, batch_size)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # 批量任务中多个线程共用一个存储，写入由锁串行化；多个进程之间依靠 WAL 和 busy_timeout 协调
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    @classmethod
+    def from_env(cls) -> Optional["TranslationStore"]:
+        """
+        根据环境变量创建存储
+
+        TRANSLATION_STORE=0 时不使用数据库，直接写文件；TRANSLATION_STORE_PATH 指定数据库路径
+
+        Returns:
+            Optional[TranslationStore]: 存储实例，禁用时返回 None
+        """
+        if os.getenv("TRANSLATION_STORE", "1") == "0":
+            return None
+        return cls(os.getenv("TRANSLATION_STORE_PATH", DEFAULT_STORE_PATH))
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "TranslationStore":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _context_ids(self, texts: Iterable[str]) -> Dict[str, int]:
+        """写入出处文本并返回文本到 ID 的映射，需在事务中调用"""
+        texts = sorted({text for text in texts if text})
+        ids = {}
+        for chunk in _chunks(texts, self.batch_size):
+            self._conn.executemany("INSERT OR IGNORE INTO contexts (text) VALUES (?)", [(text,) for text in chunk])
+            placeholders = ",".join("?" * len(chunk))
+            ids.update((text, context_id) for context_id, text in self._conn.execute(
+                f"SELECT id, text FROM contexts WHERE text IN ({placeholders})", chunk))
+        return ids
+
+    def sync_game(self, game: str, all_translations: Dict[str, Dict], language: str = DEFAULT_LANGUAGE) -> Dict[str, int]:
+        """
+        用一次抓取的全部条目更新游戏数据，整个过程在一个事务中完成
+
+        原文和出处按条目覆盖写入；译文为空的条目删除对应译文；本次抓取中不存在的条目一并删除
+
+        Args:
+            game: 游戏名称
+            all_translations: 所有翻译内容，以 toTranslate_<id> 为键
+            language: 译文语言
+
+        Returns:
+            Dict[str, int]: 写入的条目数 strings、有译文的条目数 translated 和删除的条目数 removed
+        """
+        now = time.time()
+        rows: List[Tuple] = []
+        translated: List[Tuple] = []
+        blank: List[Tuple] = []
+        for key, item in all_translations.items():
+            string_id = string_id_of(key)
+            rows.append((string_id, item["original"], item.get("context") or ""))
+            translation = item.get("translation") or ""
+            if translation.strip():
+                translated.append((game, string_id, language, translation, now))
+            else:
+                blank.append((game, string_id, language))
+
+        with self._lock, self._conn:
+            context_ids = self._context_ids(context for _, _, context in rows)
+            for chunk in _chunks(rows, self.batch_size):
+                self._conn.executemany(
+                    "INSERT INTO strings (game, string_id, original, context_id, updated_at) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(game, string_id) DO UPDATE SET original = excluded.original, "
+                    "context_id = excluded.context_id, updated_at = excluded.updated_at "
+                    "WHERE original IS NOT excluded.original OR context_id IS NOT excluded.context_id",
+                    [(game, string_id, original, context_ids.get(context), now) for string_id, original, context in chunk])
+            for chunk in _chunks(translated, self.batch_size):
+                self._conn.executemany(
+                    "INSERT INTO translations (game, string_id, language, translation, updated_at) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(game, string_id, language) DO UPDATE SET translation = excluded.translation, "
+                    "updated_at = excluded.updated_at WHERE translation IS NOT excluded.translation",
+                    chunk)
+            for chunk in _chunks(blank, self.batch_size):
+                self._conn.executemany(
+                    "DELETE FROM translations WHERE game = ? AND string_id = ? AND language = ?", chunk)
+
+            # 临时表保存本次的字符串 ID，用一条语句删除模块中已不存在的条目
+            self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS current_ids (string_id TEXT PRIMARY KEY)")
+            self._conn.execute("DELETE FROM current_ids")
+            for chunk in _chunks(rows, self.batch_size):
+                self._conn.executemany("INSERT OR IGNORE INTO current_ids VALUES (?)", [(row[0],) for row in chunk])
+            removed = self._conn.execute(
+                "DELETE FROM strings WHERE game = ? AND string_id NOT IN (SELECT string_id FROM current_ids)",
+                (game,)).rowcount
+            self._conn.execute(
+                "DELETE FROM translations WHERE game = ? AND string_id NOT IN (SELECT string_id FROM current_ids)",
+                (game,))
+
+        logger.info(f"已写入翻译数据库：{game} 共 {len(rows)} 条，其中 {len(translated)} 条有译文，删除 {removed} 条")
+        return {"strings": len(rows), "translated": len(translated), "removed": removed}
+
+    def set_translations(self, game: str, translations: Dict[str, str], language: str = DEFAULT_LANGUAGE) -> int:
+        """
+        只更新部分条目的译文
+
+        Args:
+            game: 游戏名称
+            translations: 字符串 ID（或条目键）到译文的映射
+            language: 译文语言
+
+        Returns:
+            int: 更新的条目数
+        """
+        now = time.time()
+        rows = [(game, string_id_of(str(key)), language, translation, now)
+                for key, translation in translations.items()]
+        with self._lock, self._conn:
+            for chunk in _chunks(rows, self.batch_size):
+                self._conn.executemany(
+                    "INSERT INTO translations (game, string_id, language, translation, updated_at) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(game, string_id, language) DO UPDATE SET translation = excluded.translation, "
+                    "updated_at = excluded.updated_at",
+                    chunk)
+        return len(rows)
+
+    def record_submissions(self, game: str, records: Iterable[Tuple], language: str = DEFAULT_LANGUAGE):
+        """
+        批量记录提交状态
+
+        Args:
+            game: 游戏名称
+            records: (字符串 ID, 状态, 页码) 序列，页码可为 None
+            language: 译文语言
+        """
+        now = time.time()
+        rows = [(game, str(string_id), language, status, page, now) for string_id, status, page in records]
+        with self._lock, self._conn:
+            for chunk in _chunks(rows, self.batch_size):
+                self._conn.executemany(
+                    "INSERT INTO submissions (game, string_id, language, status, page, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(game, string_id, language) DO UPDATE SET "
+                    "status = excluded.status, page = COALESCE(excluded.page, page), updated_at = excluded.updated_at",
+                    chunk)
+
+    def clear_submissions(self, game: str, language: str = DEFAULT_LANGUAGE):
+        """清空游戏的提交状态，用于从头提交"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM submissions WHERE game = ? AND language = ?", (game, language))
+
+    def submission_status(self, game: str, language: str = DEFAULT_LANGUAGE) -> Dict[str, str]:
+        """
+        读取游戏的提交状态
+
+        Args:
+            game: 游戏名称
+            language: 译文语言
+
+        Returns:
+            Dict[str, str]: 字符串 ID 到状态的映射
+        """
+        with self._lock:
+            return dict(self._conn.execute(
+                "SELECT string_id, status FROM submissions WHERE game = ? AND language = ?", (game, language)))
+
+    def iter_entries(self, game: str, language: str = DEFAULT_LANGUAGE,
+                     untranslated_only: bool = False) -> Iterator[Tuple[str, Dict]]:
+        """
+        按字符串 ID 顺序逐条读取游戏的条目
+
+        Args:
+            game: 游戏名称
+            language: 译文语言
+            untranslated_only: 是否只读取没有译文的条目
+
+        Yields:
+            Tuple[str, Dict]: (条目键, {original, context, translation})
+        """
+        sql = ("SELECT s.string_id, s.original, COALESCE(c.text, ''), COALESCE(t.translation, '') "
+               "FROM strings s LEFT JOIN contexts c ON c.id = s.context_id "
+               "LEFT JOIN translations t ON t.game = s.game AND t.string_id = s.string_id AND t.language = ? "
+               "WHERE s.game = ?")
+        if untranslated_only:
+            sql += " AND t.translation IS NULL"
+        sql += " ORDER BY CAST(s.string_id AS INTEGER), s.string_id"
+        # 分批从游标读取，导出大模块时内存占用不随条目数增长
+        with self._lock:
+            cursor = self._conn.execute(sql, (language, game))
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(self.batch_size)
+            if not rows:
+                break
+            for string_id, original, context, translation in rows:
+                yield key_of(string_id), {"original": original, "context": context, "translation": translation}
+
+    def get_entries(self, game: str, language: str = DEFAULT_LANGUAGE, untranslated_only: bool = False) -> Dict[str, Dict]:
+        """读取游戏的全部条目，见 iter_entries"""
+        return dict(self.iter_entries(game, language, untranslated_only))
+
+    def lookup(self, original: str, language: str = DEFAULT_LANGUAGE, game: Optional[str] = None) -> List[Dict]:
+        """
+        按原文查找已有译文，不指定游戏时跨所有游戏查找
+
+        Args:
+            original: 原文
+            language: 译文语言
+            game: 游戏名称
+
+        Returns:
+            List[Dict]: 每项包含 game、key、translation
+        """
+        sql = ("SELECT s.game, s.string_id, t.translation FROM strings s "
+               "JOIN translations t ON t.game = s.game AND t.string_id = s.string_id AND t.language = ? "
+               "WHERE s.original = ?")
+        params: List = [language, original]
+        if game:
+            sql += " AND s.game = ?"
+            params.append(game)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY s.game", params).fetchall()
+        return [{"game": row[0], "key": key_of(row[1]), "translation": row[2]} for row in rows]
+
+    def games(self) -> List[str]:
+        """数据库中的所有游戏"""
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT game FROM strings ORDER BY game")]
+
+    def stats(self, language: str = DEFAULT_LANGUAGE) -> List[Dict]:
+        """
+        统计每个游戏的条目数、已翻译数和已确认提交数
+
+        Args:
+            language: 译文语言
+
+        Returns:
+            List[Dict]: 每项包含 game、strings、translated、confirmed
+        """
+        sql = ("SELECT s.game, COUNT(*), COUNT(t.string_id), "
+               "(SELECT COUNT(*) FROM submissions m WHERE m.game = s.game AND m.language = ? AND m.status = 'confirmed') "
+               "FROM strings s LEFT JOIN translations t "
+               "ON t.game = s.game AND t.string_id = s.string_id AND t.language = ? "
+               "GROUP BY s.game ORDER BY s.game")
+        with self._lock:
+            rows = self._conn.execute(sql, (language, language)).fetchall()
+        return [{"game": game, "strings": total, "translated": translated, "confirmed": confirmed}
+                for game, total, translated, confirmed in rows]
+
+    def export_json(self, game: str, path: Path, language: str = DEFAULT_LANGUAGE,
+                    untranslated_only: bool = False) -> Path:
+        """
+        导出游戏条目为 JSON，格式与抓取结果相同
+
+        Args:
+            game: 游戏名称
+            path: 输出路径
+            language: 译文语言
+            untranslated_only: 是否只导出没有译文的条目
+
+        Returns:
+            Path: 输出路径
+        """
+        return write_json_table(path, self.iter_entries(game, language, untranslated_only))
+
+    def export_markdown(self, game: str, path: Path, language: str = DEFAULT_LANGUAGE,
+                        untranslated_only: bool = False) -> Path:
+        """
+        导出游戏条目为 Markdown 对照表；只导出未翻译条目时译文列留空，供填写
+
+        Args:
+            game: 游戏名称
+            path: 输出路径
+            language: 译文语言
+            untranslated_only: 是否只导出没有译文的条目
+
+        Returns:
+            Path: 输出路径
+        """
+        return write_markdown_table(path, self.iter_entries(game, language, untranslated_only),
+                                    with_translation=not untranslated_only)
+
+    def export_file(self, game: str, path: Path, fmt: str = "jsonl", language: str = DEFAULT_LANGUAGE,
+                    untranslated_only: bool = False) -> int:
+        """
+        按指定格式导出游戏条目
+
+        Args:
+            game: 游戏名称
+            path: 输出路径
+            fmt: 输出格式，md、json 或 jsonl
+            language: 译文语言
+            untranslated_only: 是否只导出没有译文的条目
+
+        Returns:
+            int: 导出的条目数
+        """
+        kwargs = {"with_translation": not untranslated_only} if fmt == "md" else {}
+        return export_entries(self.iter_entries(game, language, untranslated_only), path, fmt, **kwargs)
+
+    def export_game(self, game: str, translations_dir: Path, language: str = DEFAULT_LANGUAGE,
+                    untranslated: Optional[Dict[str, Dict]] = None) -> Dict[str, Path]:
+        """
+        导出游戏的全部对照文件，文件名与 save_translation_files 相同
+
+        Args:
+            game: 游戏名称
+            translations_dir: 翻译目录
+            language: 译文语言
+            untranslated: 已确定的未翻译内容（如浏览器引擎核对后采用的服务器视图），默认按数据库中是否有译文筛选
+
+        Returns:
+            Dict[str, Path]: 生成的文件路径
+        """
+        translations_dir = Path(translations_dir)
+        paths = {
+            "all_json": self.export_json(game, translations_dir / "all_translations.json", language),
+            "all_md": self.export_markdown(game, translations_dir / "all_translations.md", language)
+        }
+        if untranslated is None:
+            paths["untranslated_json"] = self.export_json(game, translations_dir / "untranslated.json", language,
+                                                          untranslated_only=True)
+            paths["untranslated_md"] = self.export_markdown(game, translations_dir / "untranslated.md", language,
+                                                            untranslated_only=True)
+        else:
+            paths["untranslated_json"] = write_json_table(translations_dir / "untranslated.json", untranslated)
+            paths["untranslated_md"] = write_markdown_table(translations_dir / "untranslated.md", untranslated,
+                                                            with_translation=False)
+        log_saved_files(translations_dir, paths)
+        return paths
+
+    def import_game(self, game: str, translations_dir: Path, language: str = DEFAULT_LANGUAGE) -> Dict[str, int]:
+        """
+        把已有的 all_translations.json 导入数据库，用于迁移旧数据
+
+        Args:
+            game: 游戏名称
+            translations_dir: 翻译目录
+            language: 译文语言
+
+        Returns:
+            Dict[str, int]: 见 sync_game
+        """
+        with open(Path(translations_dir) / "all_translations.json", "r", encoding="utf-8") as f:
+            return self.sync_game(game, json.load(f), language)
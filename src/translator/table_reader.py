@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+翻译表读取模块
+单遍流式读取 Markdown 对照表、CSV、TSV、JSON Lines 和 XLIFF，按字符串 ID 和原文建立索引，
+格式错误的行连同行号一起记录，不会被静默丢弃
+"""
+
+import csv
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from xml.parsers import expat
+from .exporters import split_markdown_row
+from .store import string_id_of
+
+logger = logging.getLogger(__name__)
+
+TABLE_FORMATS = ("md", "csv", "tsv", "jsonl", "xliff")
+
+_SUFFIX_FORMATS = {
+    ".md": "md", ".markdown": "md",
+    ".csv": "csv",
+    ".tsv": "tsv", ".tab": "tsv",
+    ".jsonl": "jsonl", ".ndjson": "jsonl",
+    ".xliff": "xliff", ".xlf": "xliff"
+}
+
+# 表头名称到字段的映射，兼容项目生成的中文表头、常见的英文表头和术语表（术语/译法）的表头
+_HEADER_FIELDS = {
+    "id": "id", "key": "id", "string_id": "id", "字符串id": "id",
+    "原文": "original", "original": "original", "source": "original", "英文": "original",
+    "原文出处": "context", "出处": "context", "context": "context", "note": "context",
+    "译文": "translation", "当前译文": "translation", "translation": "translation", "target": "translation",
+    "中文": "translation",
+    "术语": "original", "term": "original", "译法": "translation"
+}
+# 没有可识别表头时按列的位置解析
+_POSITIONAL_FIELDS = ("original", "context", "translation")
+
+class TableError(Exception):
+    """翻译表无法读取"""
+
+def detect_format(path: Path) -> str:
+    """
+    按文件后缀判断翻译表格式
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        str: md、csv、tsv、jsonl 或 xliff
+    """
+    fmt = _SUFFIX_FORMATS.get(Path(path).suffix.lower())
+    if fmt is None:
+        raise TableError(f"无法根据后缀判断翻译表格式: {path}")
+    return fmt
+
+def _header_fields(cells: List[str]) -> Optional[List[Optional[str]]]:
+    """识别表头，至少要有原文列，否则返回 None"""
+    fields = [_HEADER_FIELDS.get(cell.strip().lower()) for cell in cells]
+    return fields if "original" in fields else None
+
+def _make_row(fields, cells: List[str], line: int) -> Dict:
+    row = {"id": None, "original": "", "context": "", "translation": "", "line": line}
+    for field, cell in zip(fields, cells):
+        if field:
+            row[field] = cell
+    if row["id"]:
+        row["id"] = string_id_of(str(row["id"]).strip())
+    return row
+
+class TranslationTable:
+    """读取后的翻译表，按字符串 ID 和原文索引"""
+
+    def __init__(self, path: Path, fmt: str):
+        self.path = Path(path)
+        self.format = fmt
+        self.rows: List[Dict] = []
+        self.by_id: Dict[str, Dict] = {}
+        self.by_original: Dict[str, Dict] = {}
+        # (行号, 说明)
+        self.errors: List[Tuple[int, str]] = []
+        # 同一原文填写了不同译文的行，以后出现的为准
+        self.conflicts: List[Tuple[int, str]] = []
+
+    def add(self, row: Dict):
+        """加入一行并更新索引"""
+        self.rows.append(row)
+        if row["id"]:
+            self.by_id[row["id"]] = row
+        previous = self.by_original.get(row["original"])
+        if previous is not None and previous["translation"] and row["translation"] \
+                and previous["translation"] != row["translation"]:
+            self.conflicts.append((row["line"], f"原文与第 {previous['line']} 行相同但译文不同: {row['original'][:60]}"))
+        if previous is None or row["translation"] or not previous["translation"]:
+            self.by_original[row["original"]] = row
+
+    def error(self, line: int, message: str):
+        """记录一行格式错误"""
+        self.errors.append((line, message))
+
+    def translations(self) -> Dict[str, str]:
+        """
+        原文到译文的映射，只包含已填写译文的条目
+
+        Returns:
+            Dict[str, str]: 原文到译文的映射
+        """
+        return {original: row["translation"] for original, row in self.by_original.items() if row["translation"]}
+
+    def lookup(self, string_id: Optional[str] = None, original: Optional[str] = None) -> Optional[str]:
+        """
+        查找译文，优先按字符串 ID，其次按原文
+
+        Args:
+            string_id: 字符串 ID 或条目键 toTranslate_<id>
+            original: 原文
+
+        Returns:
+            Optional[str]: 已填写的译文，没有时返回 None
+        """
+        if string_id is not None:
+            row = self.by_id.get(string_id_of(str(string_id)))
+            if row is not None and row["translation"]:
+                return row["translation"]
+        if original is not None:
+            row = self.by_original.get(original)
+            if row is not None and row["translation"]:
+                return row["translation"]
+        return None
+
+    def log_problems(self, limit: int = 20):
+        """输出格式错误和译文冲突，超过 limit 条时只输出数量"""
+        for label, problems in (("格式错误", self.errors), ("译文冲突", self.conflicts)):
+            if not problems:
+                continue
+            logger.warning(f"{self.path} 中有 {len(problems)} 行{label}")
+            for line, message in problems[:limit]:
+                logger.warning(f"  第 {line} 行: {message}")
+            if len(problems) > limit:
+                logger.warning(f"  …… 另有 {len(problems) - limit} 行未列出")
+
+def _read_markdown(f, table: TranslationTable):
+    fields = None
+    for line_no, line in enumerate(f, 1):
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if "|" not in stripped:
+            table.error(line_no, "不是表格行")
+            continue
+        if not stripped.strip("|:- "):
+            continue  # 分隔行
+        cells = split_markdown_row(stripped)
+        if fields is None:
+            fields = _header_fields(cells)
+            if fields is not None:
+                continue
+            fields = list(_POSITIONAL_FIELDS)
+        _add_cells(table, fields, cells, line_no)
+
+def _read_delimited(f, table: TranslationTable, delimiter: str):
+    reader = csv.reader(f, delimiter=delimiter)
+    fields = None
+    for cells in reader:
+        # 带引号的单元格可以跨行，记录的是该行结束时的行号
+        line_no = reader.line_num
+        if not cells or not any(cell.strip() for cell in cells):
+            continue
+        if fields is None:
+            fields = _header_fields(cells)
+            if fields is not None:
+                continue
+            fields = list(_POSITIONAL_FIELDS)
+        _add_cells(table, fields, [cell.strip() for cell in cells], line_no)
+
+def _add_cells(table: TranslationTable, fields: List[Optional[str]], cells: List[str], line_no: int):
+    if len(cells) != len(fields):
+        table.error(line_no, f"列数为 {len(cells)}，应为 {len(fields)}")
+        return
+    row = _make_row(fields, cells, line_no)
+    if not row["original"]:
+        table.error(line_no, "原文为空")
+        return
+    table.add(row)
+
+def _read_jsonl(f, table: TranslationTable):
+    for line_no, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            table.error(line_no, f"JSON 解析失败: {e}")
+            continue
+        if not isinstance(record, dict) or not record.get("original"):
+            table.error(line_no, "缺少 original 字段")
+            continue
+        key = record.get("key") or record.get("id")
+        row = {
+            "id": string_id_of(str(key)) if key else None,
+            "original": record["original"],
+            "context": record.get("context") or "",
+            "translation": record.get("translation") or "",
+            "line": line_no
+        }
+        table.add(row)
+
+def _read_xliff(f, table: TranslationTable):
+    """用 expat 流式解析 XLIFF 1.2（trans-unit）和 2.0（unit/segment）"""
+    parser = expat.ParserCreate()
+    state = {"unit": None, "field": None, "text": []}
+
+    def local(name: str) -> str:
+        return name.rsplit("}", 1)[-1].rsplit(":", 1)[-1]
+
+    def start(name, attrs):
+        tag = local(name)
+        if tag in ("trans-unit", "unit"):
+            state["unit"] = {"id": attrs.get("resname") or attrs.get("id"), "original": None, "context": "",
+                             "translation": "", "line": parser.CurrentLineNumber}
+        elif state["unit"] is not None and tag in ("source", "target", "note"):
+            state["field"] = tag
+            state["text"] = []
+
+    def end(name):
+        tag = local(name)
+        unit = state["unit"]
+        if unit is None:
+            return
+        if tag == state["field"]:
+            text = "".join(state["text"]).strip()
+            if tag == "source":
+                # 2.0 的一个 unit 可能有多个 segment，依次拼接
+                unit["original"] = (unit["original"] or "") + text
+            elif tag == "target":
+                unit["translation"] += text
+            else:
+                unit["context"] = unit["context"] or text
+            state["field"] = None
+        elif tag in ("trans-unit", "unit"):
+            state["unit"] = None
+            if not unit["original"]:
+                table.error(unit["line"], "缺少 source")
+                return
+            if unit["id"]:
+                unit["id"] = string_id_of(unit["id"])
+            table.add(unit)
+
+    def text(data):
+        if state["field"]:
+            state["text"].append(data)
+
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    parser.CharacterDataHandler = text
+    try:
+        parser.ParseFile(f)
+    except expat.ExpatError as e:
+        table.error(e.lineno, f"XML 解析失败: {expat.ErrorString(e.code)}")
+
+def read_table(path: Path, fmt: Optional[str] = None) -> TranslationTable:
+    """
+    读取翻译表
+
+    Args:
+        path: 文件路径
+        fmt: 格式，默认按后缀判断
+
+    Returns:
+        TranslationTable: 读取结果，格式错误记录在 errors 中
+    """
+    path = Path(path)
+    fmt = fmt or detect_format(path)
+    if fmt not in TABLE_FORMATS:
+        raise TableError(f"不支持的翻译表格式: {fmt}")
+    table = TranslationTable(path, fmt)
+    if fmt == "xliff":
+        with open(path, "rb") as f:
+            _read_xliff(f, table)
+    else:
+        # utf-8-sig 兼容表格软件导出时带的 BOM
+        with open(path, "r", encoding="utf-8-sig", newline="" if fmt in ("csv", "tsv") else None) as f:
+            if fmt == "md":
+                _read_markdown(f, table)
+            elif fmt == "jsonl":
+                _read_jsonl(f, table)
+            else:
+                _read_delimited(f, table, "," if fmt == "csv" else "\t")
+    return table
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+翻译表导出测试
+
+用法:
+    python -m pytest src/translator/test_exporters.py
+"""
+
+import json
+import pytest
+from src.translator.exporters import escape_cell, export_entries, split_markdown_row, unescape_cell
+
+ENTRIES = {
+    "toTranslate_1": {"original": "Pay 1 | 2 coins", "context": "a\\b", "translation": "支付 1 | 2 枚硬币"},
+    "toTranslate_2": {"original": "First line\nSecond line\r", "context": "", "translation": ""},
+    "toTranslate_3": {"original": "ends with \\", "context": None, "translation": "以 \\ 结尾"},
+}
+
+@pytest.mark.parametrize("text", ["", "plain", "a|b", "a\\|b", "\\", "x\\\\", "line\nbreak\r\n", "\\n literal"])
+def test_escape_round_trip(text):
+    escaped = escape_cell(text)
+    assert "\n" not in escaped and "\r" not in escaped
+    assert unescape_cell(escaped) == text
+
+def test_split_markdown_row():
+    assert split_markdown_row("| a | b | c |") == ["a", "b", "c"]
+    cells = [escape_cell(text) for text in ("a|b", "trailing \\", "x\ny")]
+    assert split_markdown_row(f"| {' | '.join(cells)} |") == ["a|b", "trailing \\", "x\ny"]
+    # 行尾竖线被转义时属于单元格内容
+    assert split_markdown_row("| a | b\\|") == ["a", "b|"]
+
+def test_markdown_round_trip(tmp_path):
+    path = tmp_path / "all.md"
+    assert export_entries(ENTRIES.items(), path, "md") == 3
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 2 + len(ENTRIES)
+    rows = [split_markdown_row(line) for line in lines[2:]]
+    assert rows == [[item["original"], item["context"] or "", item["translation"]] for item in ENTRIES.values()]
+
+def test_markdown_without_translation(tmp_path):
+    path = tmp_path / "untranslated.md"
+    export_entries(ENTRIES.items(), path, "md", with_translation=False)
+    assert all(split_markdown_row(line)[2] == "" for line in path.read_text(encoding="utf-8").splitlines()[2:])
+
+def test_json_matches_json_dump(tmp_path):
+    path = tmp_path / "all.json"
+    export_entries(ENTRIES.items(), path, "json")
+    assert path.read_text(encoding="utf-8") == json.dumps(ENTRIES, ensure_ascii=False, indent=2)
+    export_entries([], path, "json")
+    assert path.read_text(encoding="utf-8") == json.dumps({}, indent=2)
+
+def test_json_lines_streams_generator_and_appends(tmp_path):
+    path = tmp_path / "all.jsonl"
+    consumed = []
+
+    def entries():
+        for key, item in ENTRIES.items():
+            consumed.append(key)
+            yield key, item
+
+    assert export_entries(entries(), path, "jsonl") == 3
+    assert consumed == list(ENTRIES)
+    export_entries(list(ENTRIES.items())[:1], path, "jsonl", append=True)
+    rows = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [row["key"] for row in rows] == list(ENTRIES) + ["toTranslate_1"]
+    assert rows[1]["original"] == ENTRIES["toTranslate_2"]["original"]
+
+def test_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        export_entries([], tmp_path / "x.csv", "csv")
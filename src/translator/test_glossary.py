@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+术语表一致性检查测试
+
+用法:
+    python -m pytest src/translator/test_glossary.py
+"""
+
+from src.translator.glossary import Glossary
+
+def make_glossary(*terms):
+    glossary = Glossary()
+    for term in terms:
+        glossary.add(term, term.upper())
+    return glossary
+
+def matched_terms(glossary, original):
+    return [(glossary._entries[index][0], start, end) for index, start, end in glossary.terms_in(original)]
+
+def test_longest_match_replaces_contained_terms():
+    glossary = make_glossary("Victory Point", "Point")
+    assert matched_terms(glossary, "Gain a Victory Point") == [("Victory Point", 2, 4)]
+    assert matched_terms(glossary, "Gain a Point") == [("Point", 2, 3)]
+
+def test_skipped_overlapping_match_keeps_earlier_matches():
+    glossary = make_glossary("a b", "c", "b c d")
+    assert matched_terms(glossary, "a b c d") == [("a b", 0, 2), ("c", 2, 3)]
+
+    glossary = make_glossary("Victory Point", "Card", "Point Card Bonus")
+    assert matched_terms(glossary, "Victory Point Card Bonus") == [("Victory Point", 0, 2), ("Card", 2, 3)]
+
+def test_plural_and_case_insensitive():
+    glossary = make_glossary("worker")
+    assert matched_terms(glossary, "Place two Workers") == [("worker", 2, 3)]
+
+def test_check_reports_missing_translations():
+    glossary = Glossary()
+    glossary.add("Victory Point", "胜利点/胜利分")
+    glossary.add("Card", "卡牌")
+    report = glossary.check([
+        ("demo", "1", "Gain a Victory Point", "获得 1 胜利分"),
+        ("demo", "2", "Draw a card", "抽一张牌"),
+        ("demo", "3", "Draw a card", ""),
+    ])
+    assert report["checked"] == 2
+    assert report["inconsistent"] == 1
+    assert report["issues"][0]["key"] == "2"
+    assert report["by_term"] == {"Card": 1}
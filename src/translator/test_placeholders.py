@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+占位符检查测试
+
+用法:
+    python -m pytest src/translator/test_placeholders.py
+"""
+
+import argparse
+import json
+from src.bga_login import BGALogin
+from src.main import placeholders_command, run_command
+from src.submitter.http_submitter import HTTPTranslationSubmitter
+from src.translator.placeholders import check_pairs, compare_tokens, extract_tokens, validate_for_submit
+
+def test_extract_tokens():
+    text = "${player_name} gains %s and %1$d {x} <b>coins</b><br />, 100% sure"
+    assert extract_tokens(text) == ["${player_name}", "%s", "%1$d", "{x}", "<b>", "</b>", "<br />"]
+    assert extract_tokens("no placeholders {1} here") == []
+
+def test_compare_allows_reordering_and_tag_variants():
+    assert compare_tokens("${a} gives ${b}", "${b} 收到 ${a} 给的") == ([], [])
+    assert compare_tokens("Line<br/>break", "换行<BR>") == ([], [])
+
+def test_compare_reports_missing_and_extra_as_multisets():
+    assert compare_tokens("${a} and ${a}", "${a}") == (["${a}"], [])
+    assert compare_tokens("%s coins", "%d 枚硬币 {x}") == (["%s"], ["%d", "{x}"])
+
+def test_check_pairs_skips_untranslated():
+    report = check_pairs([
+        ("demo", "toTranslate_1", "${player_name} passes", "${player_name} 跳过"),
+        ("demo", "toTranslate_2", "${player_name} passes", "玩家跳过"),
+        ("demo", "toTranslate_3", "${player_name} passes", ""),
+    ])
+    assert report["checked"] == 2
+    assert report["mismatched"] == 1
+    assert report["issues"][0]["key"] == "toTranslate_2"
+    assert report["issues"][0]["missing"] == ["${player_name}"]
+
+def test_validate_for_submit_writes_report(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert validate_for_submit("demo", [("demo", "1", "%s", "%s")])
+    assert not (tmp_path / "data").exists()
+    assert not validate_for_submit("demo", [("demo", "1", "%s", "无")])
+    report = json.loads((tmp_path / "data/games/demo/translations/placeholder_report.json").read_text(encoding="utf-8"))
+    assert report["mismatched"] == 1
+
+def test_command_fails_on_mismatch(tmp_path):
+    translations_dir = tmp_path / "games/demo/translations"
+    translations_dir.mkdir(parents=True)
+    entries = {"toTranslate_1": {"original": "${player_name} passes", "translation": "${player_name} 跳过"}}
+    (translations_dir / "all_translations.json").write_text(json.dumps(entries), encoding="utf-8")
+    args = argparse.Namespace(table=None, games=[], games_dir=str(tmp_path / "games"),
+                              output=str(tmp_path / "report.json"))
+    assert placeholders_command(args) is True
+
+    entries["toTranslate_1"]["translation"] = "玩家跳过"
+    (translations_dir / "all_translations.json").write_text(json.dumps(entries), encoding="utf-8")
+    assert placeholders_command(args) is False
+    assert json.loads((tmp_path / "report.json").read_text(encoding="utf-8"))["mismatched"] == 1
+
+def test_blocked_submit_fails_the_command(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("TRANSLATION_STORE", "0")
+    translations_dir = tmp_path / "data/games/demo/translations"
+    translations_dir.mkdir(parents=True)
+    untranslated = {"toTranslate_1": {"original": "${player_name} passes", "context": "", "translation": ""}}
+    (translations_dir / "untranslated.json").write_text(json.dumps(untranslated), encoding="utf-8")
+    (translations_dir / "untranslated.md").write_text(
+        "| 原文 | 原文出处 | 译文 |\n|---|---|---|\n| ${player_name} passes |  | 玩家跳过 |\n", encoding="utf-8")
+    # 占位符检查在登录之前拦下提交，不需要 .env 和服务器
+    monkeypatch.setattr(HTTPTranslationSubmitter, "from_env",
+                        classmethod(lambda cls, game, **kwargs: cls(game, BGALogin("tester", "secret"), **kwargs)))
+    args = argparse.Namespace(command="submit-translations", game_name="demo", more_games=[], use_async=False,
+                              engine="http", workers=1, rps=1.0, restart=False, table=None, tm_threshold=None,
+                              skip_placeholder_check=False)
+    assert run_command(args, parser=None) is False
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+翻译存储测试
+
+用法:
+    python -m pytest src/translator/test_store.py
+"""
+
+import json
+from src.translator.store import TranslationStore
+
+ENTRIES = {
+    "toTranslate_1": {"original": "Draw a card", "context": "cards.js", "translation": "抽一张牌"},
+    "toTranslate_2": {"original": "Gain a Victory Point", "context": "scoring.js", "translation": ""},
+    "toTranslate_10": {"original": "Pass", "context": "cards.js", "translation": "   "},
+}
+
+def test_sync_game_counts_and_removes_missing(tmp_path):
+    with TranslationStore(tmp_path / "t.db", batch_size=2) as store:
+        assert store.sync_game("demo", ENTRIES) == {"strings": 3, "translated": 1, "removed": 0}
+        assert list(store.get_entries("demo", untranslated_only=True)) == ["toTranslate_2", "toTranslate_10"]
+
+        entries = dict(ENTRIES)
+        del entries["toTranslate_2"]
+        entries["toTranslate_1"] = dict(ENTRIES["toTranslate_1"], translation="")
+        assert store.sync_game("demo", entries) == {"strings": 2, "translated": 0, "removed": 1}
+        assert store.get_entries("demo") == {
+            "toTranslate_1": {"original": "Draw a card", "context": "cards.js", "translation": ""},
+            "toTranslate_10": {"original": "Pass", "context": "cards.js", "translation": ""},
+        }
+
+def test_games_are_isolated(tmp_path):
+    with TranslationStore(tmp_path / "t.db") as store:
+        store.sync_game("azul", ENTRIES)
+        store.sync_game("demo", {"toTranslate_1": {"original": "Draw a card", "translation": "摸一张牌"}})
+        assert store.games() == ["azul", "demo"]
+        assert [row["translation"] for row in store.lookup("Draw a card")] == ["抽一张牌", "摸一张牌"]
+        assert store.lookup("Draw a card", game="demo") == [
+            {"game": "demo", "key": "toTranslate_1", "translation": "摸一张牌"}]
+
+def test_translations_and_submissions(tmp_path):
+    with TranslationStore(tmp_path / "t.db") as store:
+        store.sync_game("demo", ENTRIES)
+        assert store.set_translations("demo", {"toTranslate_2": "获得 1 胜利分", "10": "跳过"}) == 2
+        assert store.get_entries("demo", untranslated_only=True) == {}
+
+        store.record_submissions("demo", [("1", "confirmed", 1), ("2", "failed", 1)])
+        store.record_submissions("demo", [("2", "confirmed", None)])
+        assert store.submission_status("demo") == {"1": "confirmed", "2": "confirmed"}
+        assert store.stats() == [{"game": "demo", "strings": 3, "translated": 3, "confirmed": 2}]
+        store.clear_submissions("demo")
+        assert store.submission_status("demo") == {}
+
+def test_export_and_import_round_trip(tmp_path):
+    with TranslationStore(tmp_path / "t.db") as store:
+        store.sync_game("demo", ENTRIES)
+        paths = store.export_game("demo", tmp_path / "out")
+    with open(paths["untranslated_json"], encoding="utf-8") as f:
+        assert list(json.load(f)) == ["toTranslate_2", "toTranslate_10"]
+    assert paths["all_md"].read_text(encoding="utf-8").count("\n") == 2 + len(ENTRIES)
+
+    with TranslationStore(tmp_path / "copy.db") as copy:
+        assert copy.import_game("demo", tmp_path / "out") == {"strings": 3, "translated": 1, "removed": 0}
+        assert copy.get_entries("demo")["toTranslate_1"]["translation"] == "抽一张牌"
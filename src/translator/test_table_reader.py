@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+翻译表读取测试
+
+用法:
+    python -m pytest src/translator/test_table_reader.py
+"""
+
+import pytest
+from src.translator.table_reader import TableError, read_table
+
+def write(tmp_path, name, text, encoding="utf-8"):
+    path = tmp_path / name
+    path.write_text(text, encoding=encoding)
+    return path
+
+def test_markdown_header_escapes_and_errors(tmp_path):
+    path = write(tmp_path, "untranslated.md",
+                 "| 原文 | 原文出处 | 译文 |\n"
+                 "|------|----------|------|\n"
+                 "| Pay 1 \\| 2 | cards.js | 支付 1 \\| 2 |\n"
+                 "| First\\nSecond |  |  |\n"
+                 "not a table row\n"
+                 "| only | two |\n"
+                 "|  | x | 空原文 |\n")
+    table = read_table(path)
+    assert table.format == "md"
+    assert [row["original"] for row in table.rows] == ["Pay 1 | 2", "First\nSecond"]
+    assert table.rows[0]["line"] == 3
+    assert table.translations() == {"Pay 1 | 2": "支付 1 | 2"}
+    assert [line for line, _ in table.errors] == [5, 6, 7]
+
+def test_markdown_without_header_is_positional(tmp_path):
+    table = read_table(write(tmp_path, "t.md", "| Draw a card | cards.js | 抽一张牌 |\n"))
+    assert table.lookup(original="Draw a card") == "抽一张牌"
+    assert table.rows[0]["context"] == "cards.js"
+
+def test_csv_with_bom_id_column_and_multiline_cell(tmp_path):
+    path = write(tmp_path, "t.csv",
+                 'key,source,中文\n'
+                 'toTranslate_7,"Line one\nLine two",第一行\n'
+                 '8,Pass,跳过\n', encoding="utf-8-sig")
+    table = read_table(path)
+    assert not table.errors
+    assert table.rows[0]["original"] == "Line one\nLine two"
+    assert table.rows[0]["line"] == 3
+    # 按 ID 查找时条目键和裸 ID 等价，ID 优先于原文
+    assert table.lookup("7") == "第一行"
+    assert table.lookup("toTranslate_8", "Something else") == "跳过"
+    assert table.lookup("9", "Pass") == "跳过"
+    assert table.lookup("9", "Unknown") is None
+
+def test_tsv(tmp_path):
+    table = read_table(write(tmp_path, "t.tsv", "原文\t译文\nGain\t获得\n"))
+    assert table.translations() == {"Gain": "获得"}
+
+def test_conflicts_keep_last_filled_translation(tmp_path):
+    path = write(tmp_path, "t.md",
+                 "| 原文 | 原文出处 | 译文 |\n|---|---|---|\n"
+                 "| Pass | a.js | 跳过 |\n"
+                 "| Pass | b.js | 过 |\n"
+                 "| Pass | c.js |  |\n")
+    table = read_table(path)
+    assert [line for line, _ in table.conflicts] == [4]
+    # 后面未填写译文的行不会覆盖已有译文
+    assert table.lookup(original="Pass") == "过"
+
+def test_jsonl(tmp_path):
+    path = write(tmp_path, "t.jsonl",
+                 '{"key": "toTranslate_1", "original": "Pass", "translation": "跳过"}\n'
+                 '\n'
+                 '{"original": ""}\n'
+                 '{broken\n')
+    table = read_table(path)
+    assert table.lookup("1") == "跳过"
+    assert [line for line, _ in table.errors] == [3, 4]
+
+def test_xliff_versions(tmp_path):
+    xliff12 = write(tmp_path, "t.xlf",
+                    '<?xml version="1.0"?>\n'
+                    '<xliff version="1.2" xmlns="urn:oasis:names:tc:xliff:document:1.2"><file><body>\n'
+                    '<trans-unit id="toTranslate_3"><source>Draw &amp; pass</source>'
+                    '<target>抽牌并跳过</target><note>cards.js</note></trans-unit>\n'
+                    '<trans-unit id="4"><target>无原文</target></trans-unit>\n'
+                    '</body></file></xliff>\n')
+    table = read_table(xliff12)
+    assert table.lookup("3") == "抽牌并跳过"
+    assert table.rows[0]["context"] == "cards.js"
+    assert [line for line, _ in table.errors] == [4]
+
+    xliff20 = write(tmp_path, "t.xliff",
+                    '<xliff version="2.0" xmlns="urn:oasis:names:tc:xliff:document:2.0"><file>'
+                    '<unit id="5"><segment><source>Hello</source><target>你好</target></segment>'
+                    '<segment><source>world</source><target>世界</target></segment></unit>'
+                    '</file></xliff>')
+    assert read_table(xliff20).translations() == {"Helloworld": "你好世界"}
+
+def test_malformed_xliff_is_reported(tmp_path):
+    table = read_table(write(tmp_path, "t.xlf", "<xliff><file>\n<unit id='1'>"))
+    assert table.errors and "XML" in table.errors[0][1]
+
+def test_unknown_suffix(tmp_path):
+    with pytest.raises(TableError):
+        read_table(write(tmp_path, "t.txt", ""))
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+翻译记忆测试
+
+用法:
+    python -m pytest src/translator/test_translation_memory.py
+"""
+
+import json
+import random
+from src.translator.translation_memory import (TranslationMemory, load_memory, normalize, prefill_translations,
+                                               trigrams)
+
+def dice(a: str, b: str) -> float:
+    grams_a, grams_b = trigrams(normalize(a)), trigrams(normalize(b))
+    return 2 * len(grams_a & grams_b) / (len(grams_a) + len(grams_b))
+
+def make_memory():
+    tm = TranslationMemory()
+    tm.add("Gain 1 Victory Point", "获得 1 胜利分", "azul")
+    tm.add("Gain 2 Victory Points", "获得 2 胜利分", "azul")
+    tm.add("Draw a card", "抽一张牌", "azul")
+    tm.add("draw  a CARD", "抽一张牌", "agricola")
+    tm.add("Draw a card", "摸一张牌", "carcassonne")
+    return tm
+
+def test_exact_match_ranks_first_and_merges_games():
+    tm = make_memory()
+    assert len(tm) == 4
+    matches = tm.query("Draw a card", k=5)
+    assert [match["score"] for match in matches] == [1.0, 1.0]
+    # 相似度相同时来源游戏多的排在前面
+    assert matches[0] == {"original": "Draw a card", "translation": "抽一张牌", "score": 1.0,
+                          "games": ["azul", "agricola"]}
+
+def test_similar_matches_are_ranked_by_score():
+    tm = make_memory()
+    matches = tm.query("Gain 3 Victory Points", k=5, min_score=0.5)
+    assert [match["original"] for match in matches] == ["Gain 2 Victory Points", "Gain 1 Victory Point"]
+    assert matches[0]["score"] > matches[1]["score"] >= 0.5
+    assert matches[0]["score"] == round(dice("Gain 3 Victory Points", "Gain 2 Victory Points"), 4)
+    assert tm.best("Gain 3 Victory Points", min_score=0.99) is None
+    assert tm.query("Completely unrelated text", min_score=0.5) == []
+
+def test_index_matches_brute_force():
+    rng = random.Random(7)
+    words = ["gain", "draw", "card", "point", "victory", "worker", "place", "take", "a", "two", "tiles", "from"]
+    originals = sorted({" ".join(rng.choices(words, k=rng.randint(1, 6))) for _ in range(400)})
+    tm = TranslationMemory()
+    for original in originals:
+        tm.add(original, f"译 {original}", "demo")
+    for _ in range(50):
+        text = " ".join(rng.choices(words, k=rng.randint(1, 6)))
+        for min_score in (0.3, 0.6, 0.9):
+            expected = sorted(original for original in originals if dice(text, original) >= min_score)
+            found = sorted(match["original"] for match in tm.query(text, k=len(originals), min_score=min_score))
+            assert found == expected
+
+def test_save_load_and_staleness(tmp_path):
+    games_dir = tmp_path / "games"
+    translations_dir = games_dir / "azul/translations"
+    translations_dir.mkdir(parents=True)
+    all_path = translations_dir / "all_translations.json"
+    all_path.write_text(json.dumps({
+        "toTranslate_1": {"original": "Draw a card", "translation": "抽一张牌"},
+        "toTranslate_2": {"original": "Pass", "translation": ""},
+    }), encoding="utf-8")
+    index_path = tmp_path / "tm/index.json"
+
+    tm = load_memory(str(games_dir), str(index_path))
+    assert index_path.exists() and len(tm) == 1
+    loaded = TranslationMemory.load(str(index_path))
+    assert not loaded.is_stale(str(games_dir))
+    assert loaded.query("Draw a card")[0]["translation"] == "抽一张牌"
+
+    (games_dir / "agricola/translations").mkdir(parents=True)
+    (games_dir / "agricola/translations/all_translations.json").write_text(json.dumps({
+        "toTranslate_1": {"original": "Pass", "translation": "跳过"}}), encoding="utf-8")
+    assert loaded.is_stale(str(games_dir))
+    assert len(load_memory(str(games_dir), str(index_path))) == 2
+
+def test_prefill_skips_filled_translations():
+    tm = make_memory()
+    untranslated = {
+        "toTranslate_1": {"original": "Draw a card"},
+        "toTranslate_2": {"original": "Gain 2 Victory Points"},
+        "toTranslate_3": {"original": "Something new"},
+    }
+    prefilled = prefill_translations(untranslated, {"Draw a card": "抽牌"}, tm, min_score=0.9)
+    assert list(prefilled) == ["Gain 2 Victory Points"]
+    assert prefilled["Gain 2 Victory Points"]["translation"] == "获得 2 胜利分"
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+翻译文件模块
+负责将抓取到的翻译内容保存为 JSON 和 Markdown 对照表，以及读取填写好的对照表
+"""
+
+import hashlib
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from .exporters import export_entries
+from ..utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINTS_FILE = "fingerprints.json"
+DELTA_FILE = "delta.json"
+
+def _pairs(entries) -> Iterable[Tuple[str, Dict]]:
+    return entries.items() if isinstance(entries, dict) else entries
+
+def write_json_table(path: Path, entries) -> Path:
+    """
+    把翻译条目流式写为 JSON 文件
+
+    Args:
+        path: 输出路径
+        entries: 翻译条目字典，或 (条目键, 翻译条目) 序列
+
+    Returns:
+        Path: 输出路径
+    """
+    export_entries(_pairs(entries), path, "json")
+    return Path(path)
+
+def write_markdown_table(path: Path, entries, with_translation: bool = True) -> Path:
+    """
+    把翻译条目流式写为 Markdown 对照表，单元格中的竖线、反斜杠和换行会被转义
+
+    Args:
+        path: 输出路径
+        entries: 翻译条目字典，或 (条目键, 翻译条目) 序列
+        with_translation: 是否写出当前译文；为 False 时译文列留空，供填写
+
+    Returns:
+        Path: 输出路径
+    """
+    export_entries(_pairs(entries), path, "md", with_translation=with_translation)
+    return Path(path)
+
+def log_saved_files(translations_dir: Path, paths: Dict[str, Path]):
+    """输出保存的文件列表"""
+    logger.info(f"成功保存翻译内容到 {translations_dir}")
+    logger.info(f"- 所有翻译JSON：{paths['all_json']}")
+    logger.info(f"- 所有翻译Markdown：{paths['all_md']}")
+    logger.info(f"- 未翻译JSON：{paths['untranslated_json']}")
+    logger.info(f"- 未翻译Markdown：{paths['untranslated_md']}")
+
+def save_translation_files(translations_dir: Path, all_translations: Dict[str, Dict], untranslated: Dict[str, Dict]) -> Dict[str, Path]:
+    """
+    保存翻译内容到翻译目录
+
+    Args:
+        translations_dir: 翻译目录
+        all_translations: 所有翻译内容
+        untranslated: 未翻译内容
+
+    Returns:
+        Dict[str, Path]: 生成的文件路径
+    """
+    translations_dir = Path(translations_dir)
+    paths = {
+        "all_json": write_json_table(translations_dir / "all_translations.json", all_translations),
+        "all_md": write_markdown_table(translations_dir / "all_translations.md", all_translations),
+        "untranslated_json": write_json_table(translations_dir / "untranslated.json", untranslated),
+        "untranslated_md": write_markdown_table(translations_dir / "untranslated.md", untranslated,
+                                                with_translation=False)
+    }
+    log_saved_files(translations_dir, paths)
+    return paths
+
+def _numeric_id(key: str):
+    """条目键形如 toTranslate_<id>，按数字 ID 排序，非数字 ID 排在最后"""
+    suffix = key.rsplit("_", 1)[-1]
+    return (0, int(suffix), "") if suffix.isdigit() else (1, 0, key)
+
+def merge_pages(pages: List[Dict[str, Dict]]) -> Dict[str, Dict]:
+    """
+    合并多页抓取结果，按字符串的数字 ID 排序，结果与抓取顺序无关
+
+    Args:
+        pages: 每页的翻译条目
+
+    Returns:
+        Dict[str, Dict]: 合并后的翻译条目
+    """
+    merged = {}
+    for page_entries in pages:
+        merged.update(page_entries)
+    return {key: merged[key] for key in sorted(merged, key=_numeric_id)}
+
+def derive_untranslated(all_translations: Dict[str, Dict]) -> Dict[str, Dict]:
+    """
+    从所有翻译内容中筛选未翻译的条目，无需再抓取一次未翻译视图
+
+    Args:
+        all_translations: 所有翻译内容
+
+    Returns:
+        Dict[str, Dict]: 未翻译内容，译文字段为空
+    """
+    return {
+        original_id: dict(item, translation="")
+        for original_id, item in all_translations.items()
+        if not (item.get("translation") or "").strip()
+    }
+
+def _digest(text: str) -> str:
+    return hashlib.sha1((text or "").encode("utf-8")).hexdigest()[:16]
+
+def build_fingerprints(all_translations: Dict[str, Dict]) -> Dict[str, List[str]]:
+    """
+    计算每条字符串的指纹
+
+    Args:
+        all_translations: 所有翻译内容
+
+    Returns:
+        Dict[str, List[str]]: 条目键到 [原文哈希, 译文哈希] 的映射
+    """
+    return {
+        key: [_digest(item["original"]), _digest(item["translation"])]
+        for key, item in all_translations.items()
+    }
+
+def load_fingerprints(translations_dir: Path) -> Dict:
+    """
+    读取上一次抓取保存的指纹
+
+    Args:
+        translations_dir: 翻译目录
+
+    Returns:
+        Dict: 包含 strings（条目指纹）、pages（分页信息）和 fetched_at，不存在时各项为空
+    """
+    path = Path(translations_dir) / FINGERPRINTS_FILE
+    if not path.exists():
+        return {"strings": {}, "pages": {}, "fetched_at": None}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except ValueError:
+        logger.warning(f"指纹文件损坏，将全量比较: {path}")
+        return {"strings": {}, "pages": {}, "fetched_at": None}
+    data.setdefault("strings", {})
+    data.setdefault("pages", {})
+    data.setdefault("fetched_at", None)
+    return data
+
+def load_previous_translations(translations_dir: Path) -> Dict[str, Dict]:
+    """
+    读取上一次保存的所有翻译内容
+
+    Args:
+        translations_dir: 翻译目录
+
+    Returns:
+        Dict[str, Dict]: 所有翻译内容，不存在时为空
+    """
+    path = Path(translations_dir) / "all_translations.json"
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def compute_delta(previous: Dict[str, List[str]], all_translations: Dict[str, Dict]) -> Dict:
+    """
+    比较指纹，得出新增、变化和删除的条目
+
+    Args:
+        previous: 上一次的条目指纹
+        all_translations: 本次抓取的所有翻译内容
+
+    Returns:
+        Dict: 包含 added、changed（带 original_changed/translation_changed 标记）、removed 和 unchanged 计数
+    """
+    current = build_fingerprints(all_translations)
+    added, changed = {}, {}
+    unchanged = 0
+    for key, fingerprint in current.items():
+        old = previous.get(key)
+        if old is None:
+            added[key] = all_translations[key]
+        elif list(old) != fingerprint:
+            changed[key] = dict(
+                all_translations[key],
+                original_changed=old[0] != fingerprint[0],
+                translation_changed=old[1] != fingerprint[1]
+            )
+        else:
+            unchanged += 1
+    removed = sorted(key for key in previous if key not in current)
+    return {"added": added, "changed": changed, "removed": removed, "unchanged": unchanged}
+
+@metrics.timed("export")
+def save_translation_snapshot(translations_dir: Path, all_translations: Dict[str, Dict], untranslated: Dict[str, Dict],
+                              pages: Optional[Dict] = None, force: bool = True, store=None,
+                              game: Optional[str] = None, language: str = "zh") -> Dict:
+    """
+    与上一次抓取比较后保存翻译内容，同时写出指纹文件和变更文件 delta.json
+
+    Args:
+        translations_dir: 翻译目录
+        all_translations: 所有翻译内容
+        untranslated: 未翻译内容
+        pages: 分页信息（每页的 ETag 和条目键），供下次增量抓取跳过未变化的页
+        force: 是否总是重写翻译文件；为 False 时内容无变化则保留原文件
+        store: 翻译数据库（TranslationStore），提供时先写入数据库，再从数据库导出对照文件
+        game: 写入数据库时使用的游戏名称，默认取翻译目录的上级目录名
+        language: 写入数据库时的译文语言
+
+    Returns:
+        Dict: 变更内容，见 compute_delta
+    """
+    translations_dir = Path(translations_dir)
+    previous = load_fingerprints(translations_dir)
+    delta = compute_delta(previous["strings"], all_translations)
+    has_changes = bool(delta["added"] or delta["changed"] or delta["removed"])
+
+    if store is not None:
+        game = game or translations_dir.resolve().parent.name
+        store.sync_game(game, all_translations, language)
+
+    if force or has_changes or not (translations_dir / "all_translations.json").exists():
+        if store is not None:
+            store.export_game(game, translations_dir, language, untranslated=untranslated)
+        else:
+            save_translation_files(translations_dir, all_translations, untranslated)
+    else:
+        logger.info("翻译内容无变化，保留现有文件")
+
+    now = time.strftime('%Y-%m-%d %H:%M:%S')
+    translations_dir.mkdir(parents=True, exist_ok=True)
+    with open(translations_dir / FINGERPRINTS_FILE, "w", encoding="utf-8") as f:
+        json.dump({"fetched_at": now, "strings": build_fingerprints(all_translations), "pages": pages or {}}, f)
+
+    delta_doc = dict(delta, generated_at=now, previous_fetched_at=previous["fetched_at"])
+    with open(translations_dir / DELTA_FILE, "w", encoding="utf-8") as f:
+        json.dump(delta_doc, f, ensure_ascii=False, indent=2)
+
+    logger.info(f"变更：新增 {len(delta['added'])} 条，修改 {len(delta['changed'])} 条，"
+                f"删除 {len(delta['removed'])} 条，未变 {delta['unchanged']} 条")
+    return delta
+
+def load_translation_table(table_path: Path) -> Dict[str, str]:
+    """
+    加载翻译对照表，支持 Markdown、CSV、TSV、JSON Lines 和 XLIFF，格式错误的行会连同行号输出警告
+
+    Args:
+        table_path: 对照表路径
+
+    Returns:
+        Dict[str, str]: 原文到译文的映射，只包含已填写译文的条目
+    """
+    from .table_reader import read_table
+    table = read_table(table_path)
+    table.log_problems()
+    return table.translations()
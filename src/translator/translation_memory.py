@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+翻译记忆模块
+汇总所有游戏 all_translations.json 中已有的译文，建立字符三元组倒排索引并保存到磁盘，
+按 Dice 相似度返回与给定原文最相近的已有译文，供提交时预填几乎相同的字符串
+"""
+
+import json
+import logging
+import math
+import re
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from itertools import chain
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = "data/tm/index.json"
+INDEX_VERSION = 1
+# 查询时为了筛选候选额外扫描的倒排表条目数上限
+CANDIDATE_SCAN_BUDGET = 1000
+# 长度区间和最少共享数由浮点除法得到，放宽这一点，避免相似度恰好等于阈值的记忆被截掉
+_BOUND_EPSILON = 1e-9
+
+_SPACES = re.compile(r"\s+")
+
+def normalize(text: str) -> str:
+    """小写并合并空白，作为匹配和去重的依据"""
+    return _SPACES.sub(" ", text).strip().lower()
+
+def trigrams(text: str) -> set:
+    """
+    计算规范化文本的字符三元组集合，首尾补空格使短字符串也有三元组
+
+    Args:
+        text: 规范化后的文本
+
+    Returns:
+        set: 三元组集合
+    """
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class TranslationMemory:
+    """基于三元组倒排索引的翻译记忆"""
+
+    def __init__(self):
+        # 每条记忆：[原文, 译文, 来源游戏列表]，建立索引后按三元组数量升序排列
+        self.entries: List[List] = []
+        self.grams: List[str] = []
+        self._gram_ids: Dict[str, int] = {}
+        # 记忆 ID -> 三元组 ID
+        self._entry_grams: List[array] = []
+        # 三元组 ID -> 含有该三元组的记忆 ID（升序，因而也按三元组数量升序）
+        self._postings: List[array] = []
+        # 记忆 ID -> 三元组数量（升序）
+        self._sizes: List[int] = []
+        # 规范化原文 -> 记忆 ID 列表，用于精确匹配和合并重复条目
+        self._exact: Dict[str, List[int]] = {}
+        self._dirty = False
+        self.sources: Dict[str, float] = {}
+        self.built_at: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, original: str, translation: str, game: str):
+        """
+        加入一条记忆，原文（规范化后）和译文都相同的条目合并来源游戏
+
+        Args:
+            original: 原文
+            translation: 译文
+            game: 来源游戏
+        """
+        key = normalize(original)
+        if not key or not translation.strip():
+            return
+        for entry_id in self._exact.get(key, ()):
+            entry = self.entries[entry_id]
+            if entry[1] == translation:
+                if game not in entry[2]:
+                    entry[2].append(game)
+                return
+        self._exact.setdefault(key, []).append(len(self.entries))
+        self.entries.append([original, translation, [game]])
+        self._dirty = True
+
+    def _index(self, entry_grams: Optional[List[array]] = None):
+        """
+        按三元组数量重新排列记忆并建立倒排表
+
+        记忆按三元组数量排序后，长度过滤就变成记忆 ID 的一个区间，可以在倒排表上二分截取
+
+        Args:
+            entry_grams: 已知的每条记忆的三元组 ID（加载索引时提供），为 None 时重新计算
+        """
+        if entry_grams is None:
+            gram_ids = self._gram_ids
+            keyed = []
+            for entry in self.entries:
+                ids = array("I")
+                for gram in trigrams(normalize(entry[0])):
+                    gram_id = gram_ids.get(gram)
+                    if gram_id is None:
+                        gram_id = gram_ids[gram] = len(self.grams)
+                        self.grams.append(gram)
+                    ids.append(gram_id)
+                keyed.append((len(ids), entry, ids))
+            keyed.sort(key=lambda item: item[0])
+            self.entries = [entry for _, entry, _ in keyed]
+            entry_grams = [ids for _, _, ids in keyed]
+
+        self._entry_grams = entry_grams
+        self._sizes = [len(ids) for ids in entry_grams]
+        self._postings = [array("I") for _ in self.grams]
+        for entry_id, ids in enumerate(entry_grams):
+            for gram_id in ids:
+                self._postings[gram_id].append(entry_id)
+        self._exact = {}
+        for entry_id, entry in enumerate(self.entries):
+            self._exact.setdefault(normalize(entry[0]), []).append(entry_id)
+        self._dirty = False
+
+    def ingest_games(self, games_dir: str = "data/games") -> int:
+        """
+        读取所有游戏的 all_translations.json，加入已有译文
+
+        Args:
+            games_dir: 游戏数据目录
+
+        Returns:
+            int: 读取的游戏数
+        """
+        count = 0
+        for path in sorted(Path(games_dir).glob("*/translations/all_translations.json")):
+            game = path.parent.parent.name
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entries = json.load(f)
+            except ValueError as e:
+                logger.warning(f"跳过 {game}：all_translations.json 解析失败: {e}")
+                continue
+            for item in entries.values():
+                if item.get("translation"):
+                    self.add(item["original"], item["translation"], game)
+            self.sources[str(path)] = path.stat().st_mtime
+            count += 1
+        return count
+
+    def query(self, text: str, k: int = 5, min_score: float = 0.5) -> List[Dict]:
+        """
+        查找与原文最相近的已有译文
+
+        设查询有 a 个三元组、记忆有 b 个，Dice 相似度 2 * 共享数 / (a + b) 不低于 t 时，
+        b 必须在 [t * a / (2 - t), a * (2 - t) / t] 之间，且至少共享 m = ceil(t * a / (2 - t)) 个三元组。
+        因此只需在该长度区间内，遍历文档频率最低的 a - m + 1 个三元组的倒排表收集候选，再逐个计算精确的共享数
+
+        Args:
+            text: 原文
+            k: 最多返回的条数
+            min_score: 最低相似度（0 到 1）
+
+        Returns:
+            List[Dict]: 按相似度从高到低排列，每项包含 original、translation、score、games
+        """
+        if self._dirty:
+            self._index()
+        key = normalize(text)
+        if not key:
+            return []
+        results: Dict[int, float] = {entry_id: 1.0 for entry_id in self._exact.get(key, ())}
+
+        query_grams = trigrams(key)
+        size = len(query_grams)
+        query_ids = {self._gram_ids[gram] for gram in query_grams if gram in self._gram_ids}
+        min_score = min(max(min_score, 1e-6), 1.0)
+        required = max(1, math.ceil(min_score * size / (2 - min_score) - _BOUND_EPSILON))
+        if len(query_ids) >= required and len(results) < k:
+            first = bisect_left(self._sizes, min_score * size / (2 - min_score) - _BOUND_EPSILON)
+            last = bisect_right(self._sizes, size * (2 - min_score) / min_score + _BOUND_EPSILON)
+            ranges = []
+            for gram_id in query_ids:
+                postings = self._postings[gram_id]
+                start, end = bisect_left(postings, first), bisect_left(postings, last)
+                ranges.append((end - start, postings, start, end))
+            ranges.sort(key=lambda item: item[0])
+
+            # 至少要命中前 len - required + 1 个倒排表之一；在此基础上多取 extra 个较短的倒排表，
+            # 候选就必须命中其中至少 extra + 1 个，用计数先筛掉大部分候选
+            prefix = len(ranges) - required + 1
+            scanned = sum(item[0] for item in ranges[:prefix])
+            extra, budget = 0, scanned * 3 + CANDIDATE_SCAN_BUDGET
+            while prefix + extra < len(ranges) and scanned + ranges[prefix + extra][0] <= budget:
+                scanned += ranges[prefix + extra][0]
+                extra += 1
+            hits = Counter(chain.from_iterable(postings[start:end] for _, postings, start, end in ranges[:prefix + extra]))
+            candidates = [entry_id for entry_id, count in hits.items() if count > extra and entry_id not in results]
+
+            for entry_id in candidates:
+                shared = len(query_ids.intersection(self._entry_grams[entry_id]))
+                score = 2 * shared / (size + self._sizes[entry_id])
+                if score >= min_score:
+                    results[entry_id] = score
+
+        ranked = sorted(results.items(), key=lambda item: (-item[1], -len(self.entries[item[0]][2])))[:k]
+        return [{"original": self.entries[entry_id][0], "translation": self.entries[entry_id][1],
+                 "score": round(score, 4), "games": list(self.entries[entry_id][2])}
+                for entry_id, score in ranked]
+
+    def best(self, text: str, min_score: float) -> Optional[Dict]:
+        """返回相似度不低于 min_score 的最佳匹配，没有时返回 None"""
+        matches = self.query(text, k=1, min_score=min_score)
+        return matches[0] if matches else None
+
+    def save(self, path: str = DEFAULT_INDEX_PATH) -> Path:
+        """
+        把记忆和每条记忆的三元组保存到磁盘，倒排表在加载时由此重建
+
+        Args:
+            path: 索引文件路径
+
+        Returns:
+            Path: 索引文件路径
+        """
+        if self._dirty:
+            self._index()
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": INDEX_VERSION,
+            "built_at": self.built_at or time.strftime('%Y-%m-%d %H:%M:%S'),
+            "sources": self.sources,
+            "grams": self.grams,
+            "entries": self.entries,
+            "entry_grams": [ids.tolist() for ids in self._entry_grams]
+        }
+        temp_path = path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        temp_path.replace(path)
+        return path
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_INDEX_PATH) -> "TranslationMemory":
+        """
+        从磁盘加载索引
+
+        Args:
+            path: 索引文件路径
+
+        Returns:
+            TranslationMemory: 翻译记忆
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"翻译记忆索引版本不匹配，请重新执行 tm build: {path}")
+        tm = cls()
+        tm.entries = data["entries"]
+        tm.grams = data["grams"]
+        tm._gram_ids = {gram: gram_id for gram_id, gram in enumerate(tm.grams)}
+        tm._index([array("I", ids) for ids in data["entry_grams"]])
+        tm.sources = data.get("sources", {})
+        tm.built_at = data.get("built_at")
+        return tm
+
+    def is_stale(self, games_dir: str = "data/games") -> bool:
+        """游戏的翻译文件是否在建立索引之后有新增、修改或删除"""
+        paths = {str(path): path for path in Path(games_dir).glob("*/translations/all_translations.json")}
+        if set(paths) != set(self.sources):
+            return True
+        return any(self.sources[name] != path.stat().st_mtime for name, path in paths.items())
+
+def build_memory(games_dir: str = "data/games", index_path: str = DEFAULT_INDEX_PATH) -> TranslationMemory:
+    """
+    读取所有游戏的译文建立翻译记忆并保存
+
+    Args:
+        games_dir: 游戏数据目录
+        index_path: 索引文件路径
+
+    Returns:
+        TranslationMemory: 翻译记忆
+    """
+    started = time.monotonic()
+    tm = TranslationMemory()
+    games = tm.ingest_games(games_dir)
+    tm.built_at = time.strftime('%Y-%m-%d %H:%M:%S')
+    tm.save(index_path)
+    logger.info(f"翻译记忆已建立：{games} 个游戏，{len(tm)} 条译文，{len(tm.grams)} 个三元组，"
+                f"耗时 {time.monotonic() - started:.2f} 秒，保存至 {index_path}")
+    return tm
+
+def load_memory(games_dir: str = "data/games", index_path: str = DEFAULT_INDEX_PATH) -> TranslationMemory:
+    """
+    加载翻译记忆，索引不存在或游戏译文有更新时重新建立
+
+    Args:
+        games_dir: 游戏数据目录
+        index_path: 索引文件路径
+
+    Returns:
+        TranslationMemory: 翻译记忆
+    """
+    if Path(index_path).exists():
+        try:
+            tm = TranslationMemory.load(index_path)
+            if not tm.is_stale(games_dir):
+                return tm
+            logger.info("游戏译文有更新，重新建立翻译记忆")
+        except ValueError as e:
+            logger.warning(f"{e}")
+    return build_memory(games_dir, index_path)
+
+def prefill_translations(untranslated: Dict[str, Dict], translations: Dict[str, str], tm: TranslationMemory,
+                         min_score: float) -> Dict[str, Dict]:
+    """
+    为对照表中没有填写译文的条目从翻译记忆中取相似度足够高的译文
+
+    Args:
+        untranslated: 未翻译条目，以 toTranslate_<id> 为键
+        translations: 对照表中已填写的原文到译文映射
+        tm: 翻译记忆
+        min_score: 采用记忆译文的最低相似度
+
+    Returns:
+        Dict[str, Dict]: 原文到匹配结果（见 TranslationMemory.query）的映射
+    """
+    prefilled = {}
+    for item in untranslated.values():
+        original = item["original"]
+        if original in translations or original in prefilled:
+            continue
+        match = tm.best(original, min_score)
+        if match is not None:
+            prefilled[original] = match
+    if prefilled:
+        logger.info(f"翻译记忆预填 {len(prefilled)} 条（相似度不低于 {min_score}）")
+    return prefilled
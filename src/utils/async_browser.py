@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+异步浏览器模块
+基于 playwright.async_api 的浏览器池和页面等待器：一个浏览器、一个已登录的上下文，
+在同一个事件循环中同时驱动多个标签页；run_tasks 为每个任务加上超时和取消
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from playwright.async_api import async_playwright, BrowserContext, Page
+from .browser_pool import DEFAULT_VIEWPORT, FIRST_PARTY_DOMAINS, _env_flag, should_block
+from .metrics import metrics
+from .page_waiter import (PAGINATION_CHANGED_SCRIPT, PAGINATION_MARKER_SCRIPT, SETTLED_COUNT_SCRIPT,
+                          TEXTAREA_SELECTOR)
+
+logger = logging.getLogger(__name__)
+
+class AsyncBrowserPool:
+    """异步浏览器池，所有标签页共享同一个浏览器上下文（即同一份登录状态）"""
+
+    def __init__(self, pages: int = 4, headless: Optional[bool] = None, block_resources: Optional[bool] = None,
+                 viewport: Optional[Dict[str, int]] = None, allowed_domains: Sequence[str] = FIRST_PARTY_DOMAINS):
+        """
+        初始化浏览器池
+
+        Args:
+            pages: 同时打开的标签页上限
+            headless: 是否无头启动，默认读取 BGA_HEADLESS 环境变量（未设置时为无头）
+            block_resources: 是否拦截图片、字体、媒体和第三方脚本，默认读取 BGA_BLOCK_RESOURCES（未设置时拦截）
+            viewport: 上下文的视口大小
+            allowed_domains: 允许加载脚本的域名
+        """
+        self.pages = max(1, pages)
+        self.headless = _env_flag("BGA_HEADLESS", True) if headless is None else headless
+        self.block_resources = _env_flag("BGA_BLOCK_RESOURCES", True) if block_resources is None else block_resources
+        self.viewport = viewport or DEFAULT_VIEWPORT
+        self.allowed_domains = tuple(allowed_domains)
+        self.blocked = 0
+        self.playwright = None
+        self.browser = None
+        self.context: Optional[BrowserContext] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def start(self) -> "AsyncBrowserPool":
+        """启动 Playwright、浏览器和共享的上下文，重复调用无副作用"""
+        if self.browser is not None:
+            return self
+        self.playwright = await async_playwright().start()
+        args = [] if self.headless else ["--start-maximized"]
+        self.browser = await self.playwright.chromium.launch(headless=self.headless, args=args)
+        self.context = await self.browser.new_context(viewport=self.viewport)
+        if self.block_resources:
+            await self.context.route("**/*", self._route)
+        self._slots = asyncio.Semaphore(self.pages)
+        logger.info(f"浏览器已启动（{'无头' if self.headless else '有头'}模式，最多同时打开 {self.pages} 个页面）")
+        return self
+
+    async def _route(self, route):
+        request = route.request
+        if should_block(request.resource_type, request.url, self.allowed_domains):
+            self.blocked += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        """打开一个标签页，页数达到上限时等待其他任务归还；退出时关闭页面"""
+        await self.start()
+        async with self._slots:
+            page = await self.context.new_page()
+            try:
+                yield page
+            finally:
+                await page.close()
+
+    async def close(self):
+        """关闭上下文、浏览器和 Playwright"""
+        if self.context is not None:
+            try:
+                await self.context.close()
+            except Exception:
+                pass
+            self.context = None
+        if self.browser is not None:
+            await self.browser.close()
+            self.browser = None
+        if self.playwright is not None:
+            await self.playwright.stop()
+            self.playwright = None
+        if self.blocked:
+            logger.info(f"浏览器已关闭，共拦截 {self.blocked} 个请求")
+
+    async def __aenter__(self) -> "AsyncBrowserPool":
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+class AsyncPageWaiter:
+    """PageWaiter 的异步版本，等待条件与同步引擎相同"""
+
+    def __init__(self, page: Page, timeout_ms: int = 15000, settle_ms: int = 500, poll_ms: int = 100,
+                 save_fallback_ms: int = 300):
+        """
+        初始化等待器
+
+        Args:
+            page: Playwright 异步页面对象
+            timeout_ms: 页面加载类等待的上限（毫秒）
+            settle_ms: 元素数量保持不变多久视为加载完成（毫秒）
+            poll_ms: 轮询间隔（毫秒）
+            save_fallback_ms: 从未见过匹配的保存响应、第一次等待落空之后，每批保存改为固定等待的时长（毫秒）
+        """
+        self.page = page
+        self.timeout_ms = timeout_ms
+        self.settle_ms = settle_ms
+        self.poll_ms = poll_ms
+        self.save_fallback_ms = save_fallback_ms
+        self._token = 0
+        self._save_seen = False
+        self.save_pattern_missed = False
+
+    def _record(self, name: str, started: float, timed_out: bool):
+        elapsed = time.perf_counter() - started
+        metrics.observe(name, elapsed, timed_out=timed_out)
+        if timed_out:
+            metrics.count("wait_timeouts", wait=name)
+            logger.warning(f"等待 {name} 超时，已等待 {elapsed * 1000:.0f} 毫秒")
+
+    async def _wait_for(self, name: str, script: str, arg: Dict, timeout_ms: Optional[int]) -> bool:
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            await self.page.wait_for_function(script, arg=arg, polling=self.poll_ms,
+                                              timeout=timeout_ms or self.timeout_ms)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            timed_out = True
+        self._record(name, started, timed_out)
+        return not timed_out
+
+    async def wait_for_textareas(self, name: str = "翻译条目加载", selector: str = TEXTAREA_SELECTOR,
+                                 timeout_ms: Optional[int] = None) -> bool:
+        """等待翻译条目数量稳定，返回是否在上限内完成"""
+        self._token += 1
+        return await self._wait_for(name, SETTLED_COUNT_SCRIPT,
+                                    {"selector": selector, "settle": self.settle_ms, "token": f"wait_{self._token}"},
+                                    timeout_ms)
+
+    async def pagination_marker(self, selector: str = TEXTAREA_SELECTOR) -> str:
+        """获取当前页面的翻页标记，翻页前调用"""
+        return await self.page.evaluate(PAGINATION_MARKER_SCRIPT, selector)
+
+    async def wait_for_pagination_change(self, before: str, name: str = "翻页", selector: str = TEXTAREA_SELECTOR,
+                                         timeout_ms: Optional[int] = None) -> bool:
+        """等待翻页后条目发生变化并重新稳定，返回是否在上限内完成；条目没有变化时不再等待条目稳定"""
+        changed = await self._wait_for(name, PAGINATION_CHANGED_SCRIPT, {"selector": selector, "before": before},
+                                       timeout_ms)
+        return changed and await self.wait_for_textareas(f"{name}后条目加载", selector)
+
+    async def wait_for_saves(self, tracker, expected: int, timeout_ms: int = 5000,
+                             name: str = "批量保存确认") -> bool:
+        """
+        等待 SaveTracker 收到的保存响应数量达到预期
+
+        Args:
+            tracker: 保存请求统计器，响应事件由事件循环分发给它
+            expected: 预期的响应总数（成功与失败之和）
+            timeout_ms: 等待上限（毫秒）
+            name: 等待名称，用于耗时统计
+
+        Returns:
+            bool: 是否在上限内完成；URL 特征已确认不匹配时只固定等待 save_fallback_ms，返回 False
+        """
+        started = time.perf_counter()
+        if self.save_pattern_missed:
+            await asyncio.sleep(self.save_fallback_ms / 1000)
+            self._record(f"{name}（固定等待）", started, False)
+            return False
+        deadline = started + timeout_ms / 1000
+        while tracker.seen < expected and time.perf_counter() < deadline:
+            await asyncio.sleep(self.poll_ms / 1000)
+        timed_out = tracker.seen < expected
+        self._save_seen = self._save_seen or tracker.seen > 0
+        self._record(name, started, timed_out)
+        if timed_out and not self._save_seen:
+            # 从未见过匹配的保存响应，之后不再逐批等到超时，与 PageWaiter 相同
+            self.save_pattern_missed = True
+            metrics.count("save_pattern_missed")
+            logger.warning(f"没有收到匹配 {tracker.url_pattern.pattern} 的保存响应，之后每批保存改为固定等待 "
+                           f"{self.save_fallback_ms} 毫秒，提交日志中只记为已提交（未确认）")
+        return not timed_out
+
+async def run_tasks(jobs: Iterable[Any], handler: Callable[[Any], Awaitable[Any]], concurrency: int = 4,
+                    timeout: Optional[float] = None) -> List[Tuple[Any, Any, Optional[BaseException]]]:
+    """
+    在同一个事件循环中并发执行任务，每个任务单独计时，超时后取消该任务，不影响其他任务
+
+    Args:
+        jobs: 任务列表，如多个游戏名
+        handler: 异步处理函数，参数为任务，返回任务结果
+        concurrency: 同时执行的任务数
+        timeout: 每个任务的超时（秒），None 或 0 表示不限
+
+    Returns:
+        List[Tuple[Any, Any, Optional[BaseException]]]: 按任务顺序排列的 (任务, 结果, 异常)
+    """
+    jobs = list(jobs)
+    slots = asyncio.Semaphore(max(1, concurrency))
+
+    async def run_one(job):
+        async with slots:
+            try:
+                return job, await asyncio.wait_for(handler(job), timeout or None), None
+            except asyncio.TimeoutError:
+                logger.error(f"任务 {job} 超过 {timeout} 秒未完成，已取消")
+                return job, None, TimeoutError(f"超过 {timeout} 秒未完成")
+            except Exception as e:
+                logger.error(f"任务 {job} 失败: {e}")
+                return job, None, e
+
+    tasks = [asyncio.create_task(run_one(job), name=f"task-{job}") for job in jobs]
+    try:
+        return list(await asyncio.gather(*tasks))
+    finally:
+        # 外部取消（如 Ctrl+C）时取消所有未完成的任务，让页面和浏览器能正常关闭
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+浏览器池模块
+为 Playwright 引擎提供共享的浏览器实例：默认无头启动，按资源类型和域名拦截无关请求，
+复用浏览器上下文；需要同时处理多个页面时使用 async_browser 的异步浏览器池
+"""
+
+import logging
+import os
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Sequence
+from urllib.parse import urlparse
+
+if TYPE_CHECKING:
+    from playwright.sync_api import BrowserContext, Page
+
+logger = logging.getLogger(__name__)
+
+# 页面功能不依赖的资源类型
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+# 允许加载脚本的站点，其余域名的脚本（广告、统计等）一律拦截
+FIRST_PARTY_DOMAINS = ("boardgamearena.com", "boardgamearena.net")
+DEFAULT_VIEWPORT = {"width": 1920, "height": 1080}
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return value.lower() not in ("0", "false", "no", "off")
+
+def should_block(resource_type: str, url: str, allowed_domains: Sequence[str] = FIRST_PARTY_DOMAINS) -> bool:
+    """
+    判断请求是否应被拦截
+
+    Args:
+        resource_type: Playwright 的资源类型，如 image、script、xhr
+        url: 请求地址
+        allowed_domains: 允许加载脚本的域名
+
+    Returns:
+        bool: 是否拦截
+    """
+    if resource_type in BLOCKED_RESOURCE_TYPES:
+        return True
+    if resource_type == "script":
+        host = urlparse(url).hostname or ""
+        return not any(host == domain or host.endswith("." + domain) for domain in allowed_domains)
+    return False
+
+class BrowserPool:
+    """Playwright 浏览器池，同一个池只能在创建它的线程中使用"""
+
+    def __init__(self, headless: Optional[bool] = None, block_resources: Optional[bool] = None,
+                 viewport: Optional[Dict[str, int]] = None, allowed_domains: Sequence[str] = FIRST_PARTY_DOMAINS):
+        """
+        初始化浏览器池
+
+        Args:
+            headless: 是否无头启动，默认读取 BGA_HEADLESS 环境变量（未设置时为无头）
+            block_resources: 是否拦截图片、字体、媒体和第三方脚本，默认读取 BGA_BLOCK_RESOURCES（未设置时拦截）
+            viewport: 新建上下文的视口大小
+            allowed_domains: 允许加载脚本的域名
+        """
+        self.headless = _env_flag("BGA_HEADLESS", True) if headless is None else headless
+        self.block_resources = _env_flag("BGA_BLOCK_RESOURCES", True) if block_resources is None else block_resources
+        self.viewport = viewport or DEFAULT_VIEWPORT
+        self.allowed_domains = tuple(allowed_domains)
+        self.blocked = 0
+        self.playwright = None
+        self.browser = None
+        self._idle: List["BrowserContext"] = []
+        self._contexts: List["BrowserContext"] = []
+
+    def start(self) -> "BrowserPool":
+        """启动 Playwright 和浏览器，重复调用无副作用"""
+        if self.browser is not None:
+            return self
+        # Playwright 导入较慢，只在真正启动浏览器时导入
+        from playwright.sync_api import sync_playwright
+        self.playwright = sync_playwright().start()
+        # 有头模式便于人工观察，保留原来的最大化窗口
+        args = [] if self.headless else ["--start-maximized"]
+        self.browser = self.playwright.chromium.launch(headless=self.headless, args=args)
+        logger.info(f"浏览器已启动（{'无头' if self.headless else '有头'}模式，资源拦截{'开启' if self.block_resources else '关闭'}）")
+        return self
+
+    def _route(self, route):
+        request = route.request
+        if should_block(request.resource_type, request.url, self.allowed_domains):
+            self.blocked += 1
+            route.abort()
+        else:
+            route.continue_()
+
+    def new_context(self, storage_state: Optional[Dict] = None, **kwargs) -> "BrowserContext":
+        """
+        新建一个浏览器上下文并安装请求拦截
+
+        Args:
+            storage_state: 预置的 cookies 等登录状态
+            **kwargs: 传给 browser.new_context 的其他参数
+
+        Returns:
+            BrowserContext: 浏览器上下文
+        """
+        self.start()
+        kwargs.setdefault("viewport", self.viewport)
+        if storage_state is not None:
+            kwargs["storage_state"] = storage_state
+        context = self.browser.new_context(**kwargs)
+        if self.block_resources:
+            context.route("**/*", self._route)
+        self._contexts.append(context)
+        return context
+
+    def acquire_context(self, storage_state: Optional[Dict] = None) -> "BrowserContext":
+        """
+        取出一个空闲上下文，没有时新建；复用的上下文保留之前的 cookies
+
+        Args:
+            storage_state: 新建上下文时预置的登录状态
+
+        Returns:
+            BrowserContext: 浏览器上下文
+        """
+        if self._idle:
+            return self._idle.pop()
+        return self.new_context(storage_state=storage_state)
+
+    def release_context(self, context: "BrowserContext"):
+        """
+        归还上下文，关闭其中的页面以便下次复用
+
+        Args:
+            context: 浏览器上下文
+        """
+        for page in list(context.pages):
+            page.close()
+        self._idle.append(context)
+
+    @contextmanager
+    def page(self, storage_state: Optional[Dict] = None) -> Iterator["Page"]:
+        """
+        在复用的上下文中打开一个页面，退出时关闭页面并归还上下文
+
+        Args:
+            storage_state: 新建上下文时预置的登录状态
+        """
+        context = self.acquire_context(storage_state)
+        try:
+            yield context.new_page()
+        finally:
+            self.release_context(context)
+
+    def close(self):
+        """关闭所有上下文、浏览器和 Playwright"""
+        for context in self._contexts:
+            try:
+                context.close()
+            except Exception:
+                pass
+        self._contexts.clear()
+        self._idle.clear()
+        if self.browser is not None:
+            self.browser.close()
+            self.browser = None
+        if self.playwright is not None:
+            self.playwright.stop()
+            self.playwright = None
+        if self.blocked:
+            logger.info(f"浏览器已关闭，共拦截 {self.blocked} 个请求")
+
+    def __enter__(self) -> "BrowserPool":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+本地 BGA 模拟服务器
+在本机模拟登录、翻译字符串和译文保存接口，用于离线调试 HTTP 抓取和提交引擎
+
+用法:
+    python -m src.utils.fake_bga_server --strings 250 --page-size 100
+    python -m src.utils.fake_bga_server --recorded data/games/<game>/translations/all_translations.json --strings 5000 --pages 50 --latency 0.05
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+logger = logging.getLogger(__name__)
+
+FAKE_REQUEST_TOKEN = "fake-request-token"
+FAKE_SESSION_COOKIE = "fake_bga_session"
+
+def make_strings(count: int, translated_ratio: float = 0.5) -> List[Dict]:
+    """
+    生成模拟的翻译字符串
+
+    Args:
+        count: 字符串数量
+        translated_ratio: 已翻译字符串所占比例
+
+    Returns:
+        List[Dict]: 字符串列表，每项包含 id、original、context、translation
+    """
+    translated_count = int(count * translated_ratio)
+    strings = []
+    for i in range(count):
+        string_id = 1000 + i
+        strings.append({
+            "id": string_id,
+            "original": f"${{player_name}} plays card #{i} | <b>{i % 7}</b> points",
+            "context": f"game.php line {i + 1}",
+            "translation": f"${{player_name}} 打出第 {i} 张牌 | <b>{i % 7}</b> 分" if i < translated_count else ""
+        })
+    return strings
+
+def load_recorded_strings(path: str, count: Optional[int] = None) -> List[Dict]:
+    """
+    读取抓取保存的 all_translations.json，作为模拟服务器回放的字符串
+
+    Args:
+        path: all_translations.json 路径
+        count: 需要的字符串数量，超过记录条数时循环复用原文（ID 依次递增），默认为记录条数
+
+    Returns:
+        List[Dict]: 字符串列表，每项包含 id、original、context、translation
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        recorded = list(json.load(f).values())
+    if not recorded:
+        raise ValueError(f"{path} 中没有记录的字符串")
+    count = len(recorded) if count is None else count
+    strings = []
+    for i in range(count):
+        item = recorded[i % len(recorded)]
+        strings.append({
+            "id": 1000 + i,
+            "original": item["original"],
+            "context": item.get("context") or "",
+            "translation": item.get("translation") or ""
+        })
+    return strings
+
+def page_size_for(count: int, pages: int) -> int:
+    """使 count 条字符串恰好分成 pages 页的每页条数"""
+    return max(1, -(-count // max(1, pages)))
+
+class FakeBGAServer:
+    """模拟 BGA 服务器"""
+
+    def __init__(self, strings: Optional[List[Dict]] = None, page_size: int = 100,
+                 response_format: str = "json", save_rate_limit: Optional[int] = None,
+                 etags: bool = True, latency: float = 0.0, strings_rate_limit: Optional[int] = None,
+                 host: str = "127.0.0.1", port: int = 0):
+        """
+        初始化模拟服务器
+
+        Args:
+            strings: 模块中的翻译字符串，默认生成 250 条
+            page_size: 每页返回的字符串数量
+            response_format: 字符串接口的返回格式，json 或 html
+            save_rate_limit: 保存接口每秒允许的请求数，超出时返回带 wait_until 的错误；None 表示不限制
+            etags: 字符串接口是否返回 ETag 并支持 If-None-Match 条件请求
+            latency: 每个请求在响应前等待的秒数，模拟网络往返
+            strings_rate_limit: 字符串接口每秒允许的请求数，超出时返回 429 和 wait_until；None 表示不限制
+            host: 监听地址
+            port: 监听端口，0 表示随机端口
+        """
+        self.strings = strings if strings is not None else make_strings(250)
+        self.page_size = page_size
+        self.response_format = response_format
+        self.save_rate_limit = save_rate_limit
+        self.etags = etags
+        self.latency = latency
+        self.strings_rate_limit = strings_rate_limit
+        self.not_modified = 0
+        self.requests = []
+        self.saved: Dict[str, str] = {}
+        self._by_id = {str(item["id"]): item for item in self.strings}
+        self.rate_limited = 0
+        self._save_times: List[float] = []
+        self._strings_times: List[float] = []
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """服务器根地址"""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def page_count(self) -> int:
+        """字符串接口的总页数"""
+        return max(1, (len(self.strings) + self.page_size - 1) // self.page_size)
+
+    def start(self) -> "FakeBGAServer":
+        """在后台线程中启动服务器"""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"模拟 BGA 服务器已启动: {self.url}")
+        return self
+
+    def stop(self):
+        """停止服务器"""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "FakeBGAServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _record(self, method: str, path: str):
+        """记录收到的请求，便于统计调用次数，并按配置模拟网络延迟"""
+        with self._lock:
+            self.requests.append((method, path))
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _allow(self, times: List[float], limit: Optional[int]) -> bool:
+        """滑动一秒窗口的限速判断，调用方需持有锁"""
+        if limit is None:
+            return True
+        now = time.time()
+        times[:] = [t for t in times if now - t < 1.0]
+        if len(times) >= limit:
+            self.rate_limited += 1
+            return False
+        times.append(now)
+        return True
+
+    def _save_translation(self, form: Dict[str, List[str]]) -> Dict:
+        """处理一次译文保存请求，返回接口响应"""
+        with self._lock:
+            if not self._allow(self._save_times, self.save_rate_limit):
+                return {"status": 0, "error": "Too many requests", "wait_until": int(time.time()) + 1}
+
+            string_id = form.get("id", [""])[0]
+            translation = form.get("translation", [""])[0]
+            item = self._by_id.get(string_id)
+            if item is None:
+                return {"status": 0, "error": f"Unknown string {string_id}"}
+
+            self.saved[string_id] = translation
+            item["translation"] = translation
+            return {"status": 1, "data": {"id": string_id}}
+
+    def _page_strings(self, page: int) -> List[Dict]:
+        start = (page - 1) * self.page_size
+        return self.strings[start:start + self.page_size]
+
+    def _render_strings(self, page: int) -> str:
+        """按配置的格式渲染某一页字符串"""
+        strings = self._page_strings(page)
+        if self.response_format == "html":
+            blocks = []
+            for item in strings:
+                blocks.append(
+                    f'<div class="translation_block">'
+                    f'<textarea id="toTranslate_{item["id"]}">{_escape_html(item["original"])}</textarea>'
+                    f'<div id="context_{item["id"]}">{_escape_html(item["context"])}</div>'
+                    f'<textarea id="translated_{item["id"]}">{_escape_html(item["translation"])}</textarea>'
+                    f'</div>'
+                )
+            if page < self.page_count:
+                blocks.append('<a class="pagination_next" href="#">下一页</a>')
+            return "<html><body>" + "".join(blocks) + "</body></html>"
+
+        return json.dumps({
+            "status": 1,
+            "data": {
+                "page": page,
+                "nbpages": self.page_count,
+                "strings": strings
+            }
+        }, ensure_ascii=False)
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                logger.debug(format, *args)
+
+            def _send(self, status: int, body: str, content_type: str = "application/json",
+                      extra_headers: Optional[Dict[str, str]] = None):
+                if status == 304:
+                    self.send_response(304)
+                    for name, value in (extra_headers or {}).items():
+                        self.send_header(name, value)
+                    self.end_headers()
+                    return
+                payload = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+                for name, value in (extra_headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                query = parse_qs(parsed.query)
+                server._record("GET", parsed.path)
+
+                if parsed.path == "/welcome":
+                    # 已登录的会话在页面配置中带有非零的 current_player_id
+                    player_id = 12345 if f"{FAKE_SESSION_COOKIE}=" in self.headers.get("Cookie", "") else 0
+                    self._send(200, f"<script>bgaConfig = {{requestToken: '{FAKE_REQUEST_TOKEN}', current_player_id: {player_id}}};</script>", "text/html")
+                elif parsed.path == "/translation/translation/getmodulestrings.html":
+                    page = int(query.get("page", ["1"])[0])
+                    with server._lock:
+                        allowed = server._allow(server._strings_times, server.strings_rate_limit)
+                    if not allowed:
+                        self._send(429, json.dumps({"status": 0, "error": "Too many requests",
+                                                    "wait_until": int(time.time()) + 1}))
+                        return
+                    content_type = "text/html" if server.response_format == "html" else "application/json"
+                    with server._lock:
+                        body = server._render_strings(page)
+                    if not server.etags:
+                        self._send(200, body, content_type)
+                        return
+                    etag = '"' + hashlib.sha1(body.encode("utf-8")).hexdigest()[:16] + '"'
+                    if self.headers.get("If-None-Match") == etag:
+                        with server._lock:
+                            server.not_modified += 1
+                        self._send(304, "", extra_headers={"ETag": etag})
+                    else:
+                        self._send(200, body, content_type, extra_headers={"ETag": etag})
+                else:
+                    self._send(404, json.dumps({"status": 0, "error": "Not found"}))
+
+            def do_POST(self):
+                parsed = urlparse(self.path)
+                length = int(self.headers.get("Content-Length", 0))
+                form = parse_qs(self.rfile.read(length).decode("utf-8"))
+                server._record("POST", parsed.path)
+
+                if parsed.path == "/account/auth/loginUserWithPassword.html":
+                    self._send(200, json.dumps({"status": 1, "data": {"success": True}}),
+                               extra_headers={"Set-Cookie": f"{FAKE_SESSION_COOKIE}=ok; Path=/"})
+                elif parsed.path == "/translation/translation/savetranslation.html":
+                    if self.headers.get("x-request-token") != FAKE_REQUEST_TOKEN:
+                        self._send(200, json.dumps({"status": 0, "error": "Invalid request token"}))
+                    else:
+                        self._send(200, json.dumps(server._save_translation(form), ensure_ascii=False))
+                else:
+                    self._send(404, json.dumps({"status": 0, "error": "Not found"}))
+
+        return Handler
+
+def _escape_html(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+def main():
+    """以独立进程运行模拟服务器"""
+    parser = argparse.ArgumentParser(description="本地 BGA 模拟服务器")
+    parser.add_argument("--strings", type=int, default=None, help="字符串数量，默认 250（回放时默认为记录条数）")
+    parser.add_argument("--page-size", type=int, default=100, help="每页字符串数量")
+    parser.add_argument("--pages", type=int, default=None, help="总页数，指定时忽略 --page-size")
+    parser.add_argument("--recorded", help="回放抓取保存的 all_translations.json，而不是生成的字符串")
+    parser.add_argument("--format", choices=["json", "html"], default="json", help="字符串接口返回格式")
+    parser.add_argument("--save-rate-limit", type=int, default=None, help="保存接口每秒允许的请求数")
+    parser.add_argument("--strings-rate-limit", type=int, default=None, help="字符串接口每秒允许的请求数")
+    parser.add_argument("--latency", type=float, default=0.0, help="每个请求的模拟延迟（秒）")
+    parser.add_argument("--port", type=int, default=8765, help="监听端口")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    strings = load_recorded_strings(args.recorded, args.strings) if args.recorded else make_strings(args.strings or 250)
+    page_size = page_size_for(len(strings), args.pages) if args.pages else args.page_size
+    server = FakeBGAServer(strings, page_size=page_size, response_format=args.format,
+                           save_rate_limit=args.save_rate_limit, strings_rate_limit=args.strings_rate_limit,
+                           latency=args.latency, port=args.port)
+    print(f"模拟 BGA 服务器运行于 {server.url}，按 Ctrl+C 退出")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+日志策略模块
+集中配置按大小轮转的日志文件，并为热路径提供延迟格式化和采样限流的日志输出：
+- 逐条字符串的日志用 LogSampler 按间隔采样、按每秒条数限流，被省略的条数在结束时汇总输出一次
+- 大对象（如接口响应 JSON）用 LazyJSON 包装，只有对应级别真正输出时才序列化
+- 整页 HTML 只在设置 BGA_DEBUG_DOM=1 或 --debug-dom 时才读取和输出
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+from typing import Any
+
+# 日志文件超过该大小后轮转，保留最近几个备份
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+def setup_file_logging(log_path: str = 'translation.log', max_bytes: int = LOG_MAX_BYTES,
+                       backup_count: int = LOG_BACKUP_COUNT):
+    """
+    配置日志输出到控制台和按大小轮转的文件，重复调用只添加一次文件处理器
+
+    在创建提交器时调用而不是在导入时，避免导入模块就创建日志文件
+
+    Args:
+        log_path: 日志文件路径
+        max_bytes: 单个日志文件的大小上限（字节）
+        backup_count: 保留的轮转备份数
+    """
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+    root = logging.getLogger()
+    target = os.path.abspath(log_path)
+    for handler in root.handlers:
+        if isinstance(handler, logging.FileHandler) and handler.baseFilename == target:
+            return
+    file_handler = RotatingFileHandler(log_path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    root.addHandler(file_handler)
+
+def enable_dom_dump(enabled: bool = True):
+    """开启或关闭整页 HTML 的调试输出"""
+    os.environ["BGA_DEBUG_DOM"] = "1" if enabled else "0"
+
+def dom_dump_enabled() -> bool:
+    """是否允许读取并输出整页 HTML，序列化整个 DOM 开销很大，默认关闭"""
+    return os.getenv("BGA_DEBUG_DOM") == "1"
+
+class LazyJSON:
+    """只在日志真正输出时才序列化的 JSON 包装"""
+
+    __slots__ = ("data", "indent")
+
+    def __init__(self, data: Any, indent: int = None):
+        self.data = data
+        self.indent = indent
+
+    def __str__(self) -> str:
+        return json.dumps(self.data, ensure_ascii=False, indent=self.indent, default=str)
+
+class LogSampler:
+    """
+    同一类日志的采样和限流：每 every 条输出一条，且每秒最多输出 per_second 条。
+    参数按 logging 的 % 风格传入，被省略的日志不会格式化
+    """
+
+    def __init__(self, logger: logging.Logger, every: int = 1, per_second: float = 5.0):
+        """
+        Args:
+            logger: 输出日志的 logger
+            every: 采样间隔，1 表示不按间隔采样
+            per_second: 每秒最多输出的条数，0 表示不限流
+        """
+        self.logger = logger
+        self.every = max(1, every)
+        self.per_second = per_second
+        self.seen = 0
+        self.suppressed = 0
+        self._window_start = 0.0
+        self._window_count = 0
+        self._lock = threading.Lock()
+
+    def log(self, level: int, msg: str, *args) -> bool:
+        """
+        按采样和限流规则输出一条日志
+
+        Args:
+            level: 日志级别
+            msg: % 风格的消息模板
+            *args: 模板参数
+
+        Returns:
+            bool: 是否输出
+        """
+        if not self.logger.isEnabledFor(level):
+            return False
+        with self._lock:
+            self.seen += 1
+            allowed = (self.seen - 1) % self.every == 0
+            if allowed and self.per_second:
+                now = time.monotonic()
+                if now - self._window_start >= 1.0:
+                    self._window_start = now
+                    self._window_count = 0
+                allowed = self._window_count < self.per_second
+                if allowed:
+                    self._window_count += 1
+            if not allowed:
+                self.suppressed += 1
+                return False
+        self.logger.log(level, msg, *args)
+        return True
+
+    def debug(self, msg: str, *args) -> bool:
+        return self.log(logging.DEBUG, msg, *args)
+
+    def info(self, msg: str, *args) -> bool:
+        return self.log(logging.INFO, msg, *args)
+
+    def warning(self, msg: str, *args) -> bool:
+        return self.log(logging.WARNING, msg, *args)
+
+    def flush(self, summary: str = "另有 %d 条同类日志已省略", level: int = logging.INFO):
+        """输出被省略的条数并清零"""
+        with self._lock:
+            suppressed, self.suppressed = self.suppressed, 0
+        if suppressed:
+            self.logger.log(level, summary, suppressed)
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+指标模块
+用 span 记录各阶段（登录、跳转、抓取、填写、保存确认、OCR、导出）的耗时，用计数器记录次数，
+可以逐条写入 JSON Lines 跟踪文件、导出 Prometheus 文本格式，并在命令结束时输出按调用层级汇总的耗时
+
+用法:
+    from src.utils.metrics import metrics
+
+    with metrics.span("harvest", page=3):
+        ...
+    metrics.count("saves", status="ok")
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# 跟踪文件的缓冲区大小，span 结束时只写入缓冲区
+TRACE_BUFFER_SIZE = 64 * 1024
+
+def _label_key(labels: Dict) -> Tuple:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+class Metrics:
+    """线程安全的 span 和计数器注册表"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._main_thread = threading.main_thread()
+        self._main_stack: List[str] = []
+        # 调用路径（以 ; 分隔）-> [次数, 累计秒数, 最长秒数]
+        self.stages: Dict[str, List[float]] = {}
+        # (计数器名, 标签) -> 累计值
+        self.counters: Dict[Tuple[str, Tuple], float] = {}
+        self.started = time.time()
+        self._trace_file = None
+        self.trace_path: Optional[Path] = None
+
+    def configure(self, trace_path: Optional[str] = None):
+        """
+        开始写入跟踪文件
+
+        Args:
+            trace_path: JSON Lines 跟踪文件路径，每个结束的 span 和计数器快照各占一行；None 表示不写文件
+        """
+        self.close()
+        if trace_path:
+            self.trace_path = Path(trace_path)
+            self.trace_path.parent.mkdir(parents=True, exist_ok=True)
+            self._trace_file = open(self.trace_path, "w", encoding="utf-8", buffering=TRACE_BUFFER_SIZE)
+
+    def _stack(self) -> List[str]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._main_stack if threading.current_thread() is self._main_thread else []
+            self._local.stack = stack
+        return stack
+
+    def _path(self, name: str) -> str:
+        """name 在当前调用路径下的完整路径"""
+        stack = self._stack()
+        if stack:
+            return f"{stack[-1]};{name}"
+        if stack is not self._main_stack and self._main_stack:
+            return f"{self._main_stack[-1]};{name}"
+        return name
+
+    def _finish(self, name: str, path: str, started: float, seconds: float, attrs: Dict,
+                error: Optional[str] = None):
+        with self._lock:
+            stage = self.stages.get(path)
+            if stage is None:
+                self.stages[path] = [1, seconds, seconds]
+            else:
+                stage[0] += 1
+                stage[1] += seconds
+                stage[2] = max(stage[2], seconds)
+            if self._trace_file is not None:
+                record = {"type": "span", "name": name, "path": path, "start": round(started, 6),
+                          "seconds": round(seconds, 6), "thread": threading.current_thread().name}
+                if attrs:
+                    record["attrs"] = attrs
+                if error:
+                    record["error"] = error
+                self._trace_file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        """
+        记录一个阶段的耗时，嵌套的 span 组成调用路径。
+        工作线程中最外层的 span 挂在主线程当前的 span 之下，因此并发阶段的累计耗时可能超过总耗时
+
+        Args:
+            name: 阶段名称
+            **attrs: 写入跟踪文件的附加属性，如页码
+        """
+        path = self._path(name)
+        stack = self._stack()
+        stack.append(path)
+        started = time.time()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            stack.pop()
+            self._finish(name, path, started, time.time() - started, attrs, error)
+
+    def observe(self, name: str, seconds: float, **attrs):
+        """
+        记录一个已经测得耗时的阶段，挂在当前 span 之下，供已有计时逻辑的代码（如页面等待）接入
+
+        Args:
+            name: 阶段名称
+            seconds: 耗时（秒）
+            **attrs: 写入跟踪文件的附加属性
+        """
+        self._finish(name, self._path(name), time.time() - seconds, seconds, attrs)
+
+    def timed(self, name: str):
+        """把整个函数记录为一个 span 的装饰器"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, name: str, value: float = 1, **labels):
+        """
+        累加计数器
+
+        Args:
+            name: 计数器名称
+            value: 增加的值
+            **labels: 标签，如 status="ok"
+        """
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def close(self):
+        """写入计数器快照并关闭跟踪文件"""
+        with self._lock:
+            if self._trace_file is None:
+                return
+            for (name, labels), value in sorted(self.counters.items()):
+                record = {"type": "counter", "name": name, "value": value}
+                if labels:
+                    record["labels"] = dict(labels)
+                self._trace_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._trace_file.close()
+            self._trace_file = None
+
+    def summary(self, min_share: float = 0.001) -> str:
+        """
+        按调用层级汇总各阶段耗时，类似火焰图的文本形式
+
+        Args:
+            min_share: 占总耗时比例低于该值的阶段不列出
+
+        Returns:
+            str: 多行汇总文本
+        """
+        elapsed = max(time.time() - self.started, 1e-9)
+        with self._lock:
+            stages = {path: list(stage) for path, stage in self.stages.items()}
+            counters = dict(self.counters)
+        lines = [
+            f"总耗时 {elapsed:.2f} 秒（并发阶段的累计耗时可能超过其上层）",
+            f"{'阶段':<40}{'次数':>8}{'累计秒':>10}{'占比':>8}{'最长秒':>10}"
+        ]
+        # 按上层路径分组后深度优先输出，同一层内按累计耗时降序
+        children: Dict[str, List[str]] = {}
+        for path in stages:
+            parent = path.rsplit(";", 1)[0] if ";" in path else ""
+            children.setdefault(parent, []).append(path)
+
+        def walk(parent: str, depth: int):
+            for path in sorted(children.get(parent, []), key=lambda p: -stages[p][1]):
+                count, total, longest = stages[path]
+                if total / elapsed >= min_share:
+                    label = "  " * depth + path.rsplit(";", 1)[-1]
+                    lines.append(f"{label:<40}{int(count):>8}{total:>10.2f}{total / elapsed:>8.1%}{longest:>10.2f}")
+                walk(path, depth + 1)
+
+        walk("", 0)
+        if counters:
+            lines.append("计数器:")
+            for (name, labels), value in sorted(counters.items()):
+                label_text = ",".join(f"{key}={val}" for key, val in labels)
+                lines.append(f"  {name}{'{' + label_text + '}' if label_text else ''} = {value:g}")
+        return "\n".join(lines)
+
+    def prometheus_text(self, prefix: str = "bga") -> str:
+        """
+        导出 Prometheus 文本格式
+
+        Args:
+            prefix: 指标名前缀
+
+        Returns:
+            str: 文本格式的指标
+        """
+        with self._lock:
+            stages = {path: list(stage) for path, stage in self.stages.items()}
+            counters = dict(self.counters)
+        lines = [
+            f"# HELP {prefix}_stage_seconds_total 各阶段累计耗时（秒）",
+            f"# TYPE {prefix}_stage_seconds_total counter"
+        ]
+        for path, (count, total, _) in sorted(stages.items()):
+            lines.append(f'{prefix}_stage_seconds_total{{stage="{_escape_label(path)}"}} {total:.6f}')
+        lines.append(f"# HELP {prefix}_stage_calls_total 各阶段执行次数")
+        lines.append(f"# TYPE {prefix}_stage_calls_total counter")
+        for path, (count, _, _) in sorted(stages.items()):
+            lines.append(f'{prefix}_stage_calls_total{{stage="{_escape_label(path)}"}} {int(count)}')
+        names = sorted({name for name, _ in counters})
+        for name in names:
+            metric = f"{prefix}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for (counter_name, labels), value in sorted(counters.items()):
+                if counter_name != name:
+                    continue
+                label_text = ",".join(f'{key}="{_escape_label(val)}"' for key, val in labels)
+                lines.append(f"{metric}{'{' + label_text + '}' if label_text else ''} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> Path:
+        """
+        把 Prometheus 文本格式的指标写入文件，可供 node_exporter 的 textfile 收集器读取
+
+        Args:
+            path: 输出路径
+
+        Returns:
+            Path: 文件路径
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # 先写临时文件再替换，避免收集器读到写了一半的文件
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_text(self.prometheus_text(), encoding="utf-8")
+        tmp_path.replace(path)
+        return path
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+# 进程内共享的注册表
+metrics = Metrics()
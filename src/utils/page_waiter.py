@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+页面等待模块
+用具体的页面就绪条件替代固定时长的 wait_for_timeout，并记录每次等待的实际耗时
+"""
+
+import logging
+import re
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Pattern
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+TEXTAREA_SELECTOR = "textarea[id^='toTranslate_']"
+
+# 翻译保存请求的 URL 特征（BGA 的自动保存通过 XHR 提交到翻译模块）。
+# 这是按翻译模块其他 AJAX 接口（/translation/translation/<动作>.html）的命名推断的，没有对照真实请求核实，
+# 只确认能匹配 FakeBGAServer 的 savetranslation.html；第一次等待落空后 PageWaiter 改为固定短暂等待
+SAVE_URL_PATTERN = re.compile(r"/translation/translation/.*save", re.IGNORECASE)
+
+# 数量在 settle 毫秒内保持不变即视为加载完成；状态按 token 隔离，避免多次等待互相干扰
+SETTLED_COUNT_SCRIPT = """
+({selector, settle, token}) => {
+    const state = window.__bgaWaitState || (window.__bgaWaitState = {});
+    const count = document.querySelectorAll(selector).length;
+    const now = performance.now();
+    const entry = state[token];
+    if (!entry || entry.count !== count) {
+        state[token] = {count: count, since: now};
+        return false;
+    }
+    return now - entry.since >= settle;
+}
+"""
+
+# 翻页标记：条目数量加首个条目的 ID，翻页后两者至少有一个会变化
+PAGINATION_MARKER_SCRIPT = """
+(selector) => {
+    const nodes = document.querySelectorAll(selector);
+    return `${nodes.length}:${nodes.length ? nodes[0].id : ''}`;
+}
+"""
+
+PAGINATION_CHANGED_SCRIPT = """
+({selector, before}) => {
+    const nodes = document.querySelectorAll(selector);
+    return `${nodes.length}:${nodes.length ? nodes[0].id : ''}` !== before;
+}
+"""
+
+class PageWaiter:
+    """页面就绪条件等待器"""
+
+    def __init__(self, page, timeout_ms: int = 15000, settle_ms: int = 500,
+                 save_timeout_ms: int = 5000, poll_ms: int = 100, save_fallback_ms: int = 300):
+        """
+        初始化等待器
+
+        Args:
+            page: Playwright 页面对象
+            timeout_ms: 页面加载类等待的上限（毫秒）
+            settle_ms: 元素数量保持不变多久视为加载完成（毫秒）
+            save_timeout_ms: 等待保存请求完成的上限（毫秒）
+            poll_ms: 轮询间隔（毫秒）
+            save_fallback_ms: 从未见过匹配的保存请求、第一次等待落空之后，每次保存改为固定等待的时长（毫秒）
+        """
+        self.page = page
+        self.timeout_ms = timeout_ms
+        self.settle_ms = settle_ms
+        self.save_timeout_ms = save_timeout_ms
+        self.poll_ms = poll_ms
+        self.save_fallback_ms = save_fallback_ms
+        self.timings: List[Dict] = []
+        self._token = 0
+        # 是否见过匹配的保存响应；从未见过且等待落空时，认为 URL 特征与站点不符
+        self._save_seen = False
+        self.save_pattern_missed = False
+
+    def _record(self, name: str, started: float, timed_out: bool):
+        """记录一次等待的耗时"""
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.timings.append({"name": name, "elapsed_ms": round(elapsed_ms, 1), "timed_out": timed_out})
+        metrics.observe(name, elapsed_ms / 1000, timed_out=timed_out)
+        if timed_out:
+            metrics.count("wait_timeouts", wait=name)
+            logger.warning(f"等待 {name} 超时，已等待 {elapsed_ms:.0f} 毫秒")
+        else:
+            logger.debug(f"等待 {name} 完成，耗时 {elapsed_ms:.0f} 毫秒")
+
+    def _next_token(self) -> str:
+        self._token += 1
+        return f"wait_{self._token}"
+
+    def _save_missed(self, url_pattern: Pattern):
+        """从未见过匹配的保存响应时，之后的保存不再等待响应，避免每条译文都等到超时"""
+        if self._save_seen or self.save_pattern_missed:
+            return
+        self.save_pattern_missed = True
+        metrics.count("save_pattern_missed")
+        logger.warning(f"没有收到匹配 {url_pattern.pattern} 的保存响应，之后每次保存改为固定等待 "
+                       f"{self.save_fallback_ms} 毫秒，提交日志中只记为已提交（未确认）")
+
+    def _save_fallback(self, name: str):
+        started = time.perf_counter()
+        self.page.wait_for_timeout(self.save_fallback_ms)
+        self._record(f"{name}（固定等待）", started, False)
+
+    def wait_for_page_ready(self, name: str = "页面加载", timeout_ms: Optional[int] = None) -> bool:
+        """
+        等待页面网络空闲
+
+        Args:
+            name: 等待名称，用于耗时统计
+            timeout_ms: 本次等待的上限，默认使用 timeout_ms
+
+        Returns:
+            bool: 是否在上限内完成
+        """
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            self.page.wait_for_load_state("networkidle", timeout=timeout_ms or self.timeout_ms)
+        except Exception:
+            timed_out = True
+        self._record(name, started, timed_out)
+        return not timed_out
+
+    def wait_for_textareas(self, name: str = "翻译条目加载", selector: str = TEXTAREA_SELECTOR,
+                           timeout_ms: Optional[int] = None) -> bool:
+        """
+        等待翻译条目数量稳定
+
+        Args:
+            name: 等待名称，用于耗时统计
+            selector: 条目选择器
+            timeout_ms: 本次等待的上限，默认使用 timeout_ms
+
+        Returns:
+            bool: 是否在上限内完成
+        """
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            self.page.wait_for_function(
+                SETTLED_COUNT_SCRIPT,
+                arg={"selector": selector, "settle": self.settle_ms, "token": self._next_token()},
+                polling=self.poll_ms,
+                timeout=timeout_ms or self.timeout_ms
+            )
+        except Exception:
+            timed_out = True
+        self._record(name, started, timed_out)
+        return not timed_out
+
+    def pagination_marker(self, selector: str = TEXTAREA_SELECTOR) -> str:
+        """获取当前页面的翻页标记，翻页前调用"""
+        return self.page.evaluate(PAGINATION_MARKER_SCRIPT, selector)
+
+    def wait_for_pagination_change(self, before: str, name: str = "翻页",
+                                   selector: str = TEXTAREA_SELECTOR,
+                                   timeout_ms: Optional[int] = None) -> bool:
+        """
+        等待翻页后条目发生变化并重新稳定
+
+        Args:
+            before: 翻页前的标记，由 pagination_marker 获取
+            name: 等待名称，用于耗时统计
+            selector: 条目选择器
+            timeout_ms: 本次等待的上限，默认使用 timeout_ms
+
+        Returns:
+            bool: 是否在上限内完成；条目没有变化时直接返回 False，不再等待条目稳定
+        """
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            self.page.wait_for_function(
+                PAGINATION_CHANGED_SCRIPT,
+                arg={"selector": selector, "before": before},
+                polling=self.poll_ms,
+                timeout=timeout_ms or self.timeout_ms
+            )
+        except Exception:
+            timed_out = True
+        self._record(name, started, timed_out)
+        if timed_out:
+            return False
+        return self.wait_for_textareas(f"{name}后条目加载", selector)
+
+    def wait_for_saves(self, tracker: "SaveTracker", expected: int, name: str = "批量保存确认",
+                       timeout_ms: Optional[int] = None) -> bool:
+        """
+        等待保存响应数量达到预期
+
+        Args:
+            tracker: 保存请求统计器
+            expected: 预期的响应总数（成功与失败之和）
+            name: 等待名称，用于耗时统计
+            timeout_ms: 本次等待的上限，默认使用 save_timeout_ms
+
+        Returns:
+            bool: 是否在上限内完成；URL 特征已确认不匹配时只固定等待 save_fallback_ms，返回 False
+        """
+        if self.save_pattern_missed:
+            self._save_fallback(name)
+            return False
+        started = time.perf_counter()
+        deadline = started + (timeout_ms or self.save_timeout_ms) / 1000
+        timed_out = False
+        while tracker.seen < expected:
+            remaining_ms = (deadline - time.perf_counter()) * 1000
+            if remaining_ms <= 0:
+                timed_out = True
+                break
+            try:
+                # 响应事件在等待期间分发给 tracker，这里只负责让出控制权
+                self.page.wait_for_event("response", timeout=remaining_ms)
+            except Exception:
+                timed_out = tracker.seen < expected
+                break
+        if tracker.seen:
+            self._save_seen = True
+        self._record(name, started, timed_out)
+        if timed_out:
+            self._save_missed(tracker.url_pattern)
+        return not timed_out
+
+    @contextmanager
+    def expect_save(self, name: str = "保存请求", url_pattern: Pattern = SAVE_URL_PATTERN,
+                    timeout_ms: Optional[int] = None):
+        """
+        在上下文中执行会触发自动保存的操作，退出时等待保存请求返回；
+        从未收到过匹配的保存响应且第一次等待落空后，改为固定等待 save_fallback_ms
+
+        Args:
+            name: 等待名称，用于耗时统计
+            url_pattern: 保存请求 URL 的匹配规则
+            timeout_ms: 本次等待的上限，默认使用 save_timeout_ms
+
+        Yields:
+            Dict: 退出上下文后，confirmed 表示是否收到成功的保存响应
+        """
+        outcome = {"confirmed": False}
+        if self.save_pattern_missed:
+            yield outcome
+            self._save_fallback(name)
+            return
+        timeout = timeout_ms or self.save_timeout_ms
+        started = time.perf_counter()
+        timed_out = False
+        body_done = False
+        try:
+            with self.page.expect_response(
+                lambda response: bool(url_pattern.search(response.url)),
+                timeout=timeout
+            ) as response_info:
+                yield outcome
+                body_done = True
+            self._save_seen = True
+            outcome["confirmed"] = response_info.value.ok
+        except Exception:
+            # 操作本身的异常照常抛出，只有等待保存响应阶段的失败才视为超时
+            if not body_done:
+                raise
+            timed_out = True
+        self._record(name, started, timed_out)
+        if timed_out:
+            self._save_missed(url_pattern)
+
+    def summary(self) -> Dict[str, Dict]:
+        """
+        按等待名称汇总耗时
+
+        Returns:
+            Dict[str, Dict]: 每类等待的次数、总耗时、最大耗时和超时次数
+        """
+        result = {}
+        for timing in self.timings:
+            stats = result.setdefault(timing["name"], {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "timeouts": 0})
+            stats["count"] += 1
+            stats["total_ms"] = round(stats["total_ms"] + timing["elapsed_ms"], 1)
+            stats["max_ms"] = max(stats["max_ms"], timing["elapsed_ms"])
+            stats["timeouts"] += int(timing["timed_out"])
+        return result
+
+    def log_summary(self):
+        """输出等待耗时汇总"""
+        for name, stats in self.summary().items():
+            logger.info(
+                f"等待统计 - {name}: {stats['count']} 次，共 {stats['total_ms']:.0f} 毫秒，"
+                f"最长 {stats['max_ms']:.0f} 毫秒，超时 {stats['timeouts']} 次"
+            )
+
+class SaveTracker:
+    """统计页面上自动保存请求的响应"""
+
+    def __init__(self, page, url_pattern: Pattern = SAVE_URL_PATTERN):
+        """
+        初始化统计器并开始监听响应
+
+        Args:
+            page: Playwright 页面对象
+            url_pattern: 保存请求 URL 的匹配规则
+        """
+        self.page = page
+        self.url_pattern = url_pattern
+        self.confirmed = 0
+        self.failed = 0
+        self.page.on("response", self._on_response)
+
+    @property
+    def seen(self) -> int:
+        """已收到的保存响应总数"""
+        return self.confirmed + self.failed
+
+    def _on_response(self, response):
+        if not self.url_pattern.search(response.url):
+            return
+        if response.ok:
+            self.confirmed += 1
+        else:
+            self.failed += 1
+            logger.warning(f"保存请求失败，状态码: {response.status}")
+
+    def detach(self):
+        """停止监听"""
+        self.page.remove_listener("response", self._on_response)
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+速率限制模块
+提供线程安全的令牌桶，用于在多个工作线程之间共享请求速率上限；
+异步引擎使用 AsyncTokenBucket 在同一事件循环的多个任务之间共享
+"""
+
+import asyncio
+import threading
+import time
+from typing import Optional
+
+class TokenBucket:
+    """令牌桶限速器"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        初始化令牌桶
+
+        Args:
+            rate: 每秒补充的令牌数，即平均每秒请求数
+            capacity: 桶容量，即允许的突发请求数，默认与 rate 相同（至少为 1）
+        """
+        if rate <= 0:
+            raise ValueError("rate 必须大于 0")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        获取令牌，不足时阻塞等待
+
+        Args:
+            tokens: 需要的令牌数
+
+        Returns:
+            float: 实际等待的秒数
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait_time = self._paused_until - now
+                else:
+                    self._refill(now)
+                    if self._tokens >= tokens:
+                        self._tokens -= tokens
+                        return waited
+                    wait_time = (tokens - self._tokens) / self.rate
+            time.sleep(wait_time)
+            waited += wait_time
+
+    def pause_for(self, seconds: float):
+        """
+        暂停发放令牌，用于服务端要求等待（如 wait_until）时让所有工作线程一起退避
+
+        Args:
+            seconds: 暂停的秒数
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+            self._updated = self._paused_until
+
+class AsyncTokenBucket:
+    """asyncio 令牌桶限速器，只能在创建后首次使用它的事件循环中使用"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        初始化令牌桶
+
+        Args:
+            rate: 每秒补充的令牌数，即平均每秒请求数
+            capacity: 桶容量，即允许的突发请求数，默认与 rate 相同（至少为 1）
+        """
+        if rate <= 0:
+            raise ValueError("rate 必须大于 0")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        # 排队的任务按到达顺序依次取令牌，等待期间不占用事件循环
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """
+        获取令牌，不足时挂起当前任务
+
+        Args:
+            tokens: 需要的令牌数，不能超过桶容量
+
+        Returns:
+            float: 实际等待的秒数，包括排在其他任务之后等待的时间
+        """
+        queued = time.monotonic()
+        async with self._lock:
+            waited = time.monotonic() - queued
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait_time = self._paused_until - now
+                else:
+                    self._refill(now)
+                    if self._tokens >= tokens:
+                        self._tokens -= tokens
+                        return waited
+                    wait_time = (tokens - self._tokens) / self.rate
+                await asyncio.sleep(wait_time)
+                waited += wait_time
+
+    def pause_for(self, seconds: float):
+        """
+        暂停发放令牌，用于服务端要求等待时让所有任务一起退避
+
+        Args:
+            seconds: 暂停的秒数
+        """
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+        self._updated = self._paused_until
+
+def throttle_session(session, bucket: TokenBucket, pool_size: int = 10):
+    """
+    让 requests 会话发出的每个请求先从令牌桶取令牌，用于多个任务共享同一个会话时统一限速
+
+    Args:
+        session: requests.Session
+        bucket: 共享的令牌桶
+        pool_size: 连接池大小，应不小于并发使用该会话的线程数
+    """
+    from requests.adapters import HTTPAdapter
+
+    class ThrottledAdapter(HTTPAdapter):
+        def send(self, request, **kwargs):
+            bucket.acquire()
+            return super().send(request, **kwargs)
+
+    adapter = ThrottledAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    # 记下会话使用的令牌桶，使用同一个令牌桶的调用方据此跳过重复的取令牌
+    session.rate_limiter = bucket
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+会话缓存模块
+将登录后的 cookies 和 request_token 加密保存到磁盘，供 requests 与 Playwright 两种引擎跨进程复用
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSION_PATH = "data/session/bga_session.bin"
+DEFAULT_COOKIE_DOMAIN = ".boardgamearena.com"
+
+class SessionStore:
+    """加密的登录会话缓存"""
+
+    def __init__(self, secret: str, path: str = DEFAULT_SESSION_PATH, ttl: int = 12 * 3600,
+                 cookie_domain: str = DEFAULT_COOKIE_DOMAIN):
+        """
+        初始化会话缓存
+
+        Args:
+            secret: 用于派生加密密钥的口令
+            path: 缓存文件路径
+            ttl: 缓存有效期（秒）
+            cookie_domain: 未指定域名的 cookie 在导出给浏览器时使用的域名
+        """
+        self.path = Path(path)
+        self.ttl = ttl
+        self.cookie_domain = cookie_domain
+        self._secret = secret
+        self._cipher = None
+
+    @property
+    def _fernet(self):
+        """加密器，首次读写缓存时才派生密钥，避免不需要会话的命令承担 PBKDF2 的开销"""
+        if self._cipher is None:
+            from cryptography.fernet import Fernet
+            key = hashlib.pbkdf2_hmac("sha256", self._secret.encode("utf-8"), b"bga-translation-helper", 200_000)
+            self._cipher = Fernet(base64.urlsafe_b64encode(key))
+        return self._cipher
+
+    @classmethod
+    def from_env(cls, username: str, password: str) -> Optional["SessionStore"]:
+        """
+        根据环境变量创建会话缓存
+
+        BGA_SESSION_CACHE=0 时禁用缓存；BGA_SESSION_KEY 指定加密口令，未设置时由账号密码派生；
+        BGA_SESSION_TTL 指定有效期（秒）
+
+        Args:
+            username: 用户名
+            password: 密码
+
+        Returns:
+            Optional[SessionStore]: 会话缓存，禁用时返回 None
+        """
+        if os.getenv("BGA_SESSION_CACHE", "1") == "0":
+            return None
+        secret = os.getenv("BGA_SESSION_KEY") or f"{username}:{password}"
+        ttl = int(os.getenv("BGA_SESSION_TTL", 12 * 3600))
+        return cls(secret, path=os.getenv("BGA_SESSION_PATH", DEFAULT_SESSION_PATH), ttl=ttl)
+
+    def load(self) -> Optional[Dict]:
+        """
+        读取未过期的会话
+
+        Returns:
+            Optional[Dict]: 包含 cookies、request_token 和 expires_at，不存在、已过期或无法解密时返回 None
+        """
+        if not self.path.exists():
+            return None
+        from cryptography.fernet import InvalidToken
+        try:
+            data = json.loads(self._fernet.decrypt(self.path.read_bytes()))
+        except (InvalidToken, ValueError) as e:
+            logger.warning(f"无法读取会话缓存，将重新登录: {e}")
+            return None
+
+        if data.get("expires_at", 0) <= time.time():
+            logger.info("会话缓存已过期")
+            return None
+        return data
+
+    def save(self, cookies: List[Dict], request_token: Optional[str]):
+        """
+        加密保存会话
+
+        Args:
+            cookies: cookie 列表，每项包含 name、value，以及可选的 domain、path、expires、secure
+            request_token: 请求令牌
+        """
+        now = time.time()
+        data = {
+            "cookies": cookies,
+            "request_token": request_token,
+            "saved_at": now,
+            "expires_at": now + self.ttl
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_bytes(self._fernet.encrypt(json.dumps(data).encode("utf-8")))
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, self.path)
+        logger.info(f"已保存会话缓存，有效期至 {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(data['expires_at']))}")
+
+    def clear(self):
+        """删除会话缓存"""
+        if self.path.exists():
+            self.path.unlink()
+
+    @staticmethod
+    def cookies_from_jar(jar) -> List[Dict]:
+        """
+        从 requests 的 CookieJar 导出 cookie 列表
+
+        Args:
+            jar: requests.cookies.RequestsCookieJar
+
+        Returns:
+            List[Dict]: cookie 列表
+        """
+        return [{
+            "name": cookie.name,
+            "value": cookie.value,
+            "domain": cookie.domain,
+            "path": cookie.path or "/",
+            "expires": cookie.expires,
+            "secure": bool(cookie.secure)
+        } for cookie in jar]
+
+    @staticmethod
+    def apply_to_jar(jar, cookies: List[Dict]):
+        """
+        将 cookie 列表写入 requests 的 CookieJar
+
+        Args:
+            jar: requests.cookies.RequestsCookieJar
+            cookies: cookie 列表
+        """
+        for cookie in cookies:
+            # Playwright 用 -1 表示会话 cookie，requests 中对应 None
+            expires = cookie.get("expires")
+            jar.set(
+                cookie["name"],
+                cookie["value"],
+                domain=cookie.get("domain") or "",
+                path=cookie.get("path") or "/",
+                expires=int(expires) if expires and expires > 0 else None,
+                secure=cookie.get("secure", False)
+            )
+
+    def to_storage_state(self, data: Dict) -> Dict:
+        """
+        转换为 Playwright 的 storage_state 格式
+
+        Args:
+            data: load 返回的会话数据
+
+        Returns:
+            Dict: 可传给 browser.new_context(storage_state=...) 的字典
+        """
+        cookies = []
+        for cookie in data["cookies"]:
+            cookies.append({
+                "name": cookie["name"],
+                "value": cookie["value"],
+                "domain": cookie.get("domain") or self.cookie_domain,
+                "path": cookie.get("path") or "/",
+                "expires": cookie.get("expires") or -1,
+                "httpOnly": cookie.get("httpOnly", False),
+                "secure": cookie.get("secure", False),
+                "sameSite": cookie.get("sameSite", "Lax")
+            })
+        return {"cookies": cookies, "origins": []}
+
+    def save_storage_state(self, storage_state: Dict, request_token: Optional[str]):
+        """
+        保存 Playwright 导出的 storage_state
+
+        Args:
+            storage_state: context.storage_state() 的返回值
+            request_token: 页面中的请求令牌
+        """
+        self.save(storage_state.get("cookies", []), request_token)
+
+# 浏览器页面中读取请求令牌
+PAGE_REQUEST_TOKEN_SCRIPT = "() => (window.bgaConfig && window.bgaConfig.requestToken) || null"
+
+def restore_browser_session(client, context) -> bool:
+    """
+    通过 BGALogin 恢复并校验缓存的会话，成功后把 cookies 注入 Playwright 上下文
+
+    Args:
+        client: BGALogin 登录客户端
+        context: Playwright 浏览器上下文
+
+    Returns:
+        bool: 是否成功复用缓存的会话
+    """
+    if not client.session_store or not client.restore_session():
+        return False
+    data = {"cookies": SessionStore.cookies_from_jar(client.session.cookies)}
+    context.add_cookies(client.session_store.to_storage_state(data)["cookies"])
+    return True
+
+def save_browser_session(client, context, page):
+    """
+    页面登录成功后，把浏览器的 storage_state 写入会话缓存
+
+    Args:
+        client: BGALogin 登录客户端
+        context: Playwright 浏览器上下文
+        page: 已登录的页面，用于读取 request_token
+    """
+    if not client.session_store:
+        return
+    try:
+        request_token = page.evaluate(PAGE_REQUEST_TOKEN_SCRIPT)
+        client.session_store.save_storage_state(context.storage_state(), request_token)
+    except Exception as e:
+        logger.warning(f"保存浏览器会话失败: {e}")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+启动耗时分析模块
+记录命令执行期间每个模块首次导入的耗时，用于定位拖慢 CLI 启动的依赖
+"""
+
+import builtins
+import importlib.util
+import sys
+import time
+from typing import Dict, List, Tuple
+
+class ImportProfiler:
+    """模块导入耗时统计"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        # 模块名 -> [累计耗时, 自身耗时]（秒）
+        self.timings: Dict[str, List[float]] = {}
+        self.marks: List[Tuple[str, float]] = []
+        self._stack: List[float] = []
+        self._original_import = None
+
+    def install(self) -> "ImportProfiler":
+        """替换内置 __import__ 开始统计"""
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._import
+        return self
+
+    def uninstall(self):
+        """恢复内置 __import__"""
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def mark(self, label: str):
+        """记录一个阶段的结束时间点"""
+        self.marks.append((label, time.perf_counter()))
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        try:
+            package = (globals or {}).get("__package__") if level else None
+            full_name = importlib.util.resolve_name("." * level + name, package) if level else name
+        except (ImportError, ValueError):
+            full_name = name
+        # 已加载的模块不计时，只统计真正执行了模块代码的首次导入
+        if full_name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        self._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            timing = self.timings.setdefault(full_name, [0.0, 0.0])
+            timing[0] += elapsed
+            timing[1] += elapsed - children
+
+    def report(self, top: int = 15) -> str:
+        """
+        生成耗时报告
+
+        Args:
+            top: 列出累计耗时最多的模块数
+
+        Returns:
+            str: 报告文本
+        """
+        total = time.perf_counter() - self.started
+        lines = [f"启动耗时分析（共 {total * 1000:.1f} ms，首次导入 {len(self.timings)} 个模块）"]
+
+        previous = self.started
+        for label, at in self.marks:
+            lines.append(f"  阶段 {label:<24} {(at - previous) * 1000:8.1f} ms")
+            previous = at
+
+        lines.append(f"  {'模块':<40} {'累计 ms':>9} {'自身 ms':>9}")
+        ranked = sorted(self.timings.items(), key=lambda item: item[1][0], reverse=True)
+        for module_name, (cumulative, own) in ranked[:top]:
+            lines.append(f"  {module_name:<40} {cumulative * 1000:9.1f} {own * 1000:9.1f}")
+        return "\n".join(lines)
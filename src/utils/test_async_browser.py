@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+异步任务调度测试
+
+用法:
+    python -m pytest src/utils/test_async_browser.py
+"""
+
+import asyncio
+import time
+import pytest
+from src.utils.async_browser import AsyncPageWaiter, run_tasks
+from src.utils.page_waiter import PAGINATION_CHANGED_SCRIPT
+
+def test_results_keep_job_order_and_isolate_failures():
+    async def handler(job):
+        await asyncio.sleep(0.01 * (5 - job))
+        if job == 2:
+            raise ValueError("boom")
+        return job * 10
+
+    results = asyncio.run(run_tasks(range(5), handler, concurrency=5))
+    assert [(job, result) for job, result, _ in results] == [(0, 0), (1, 10), (2, None), (3, 30), (4, 40)]
+    assert [type(exc) for _, _, exc in results] == [type(None)] * 2 + [ValueError] + [type(None)] * 2
+
+def test_concurrency_limit():
+    running = []
+    peak = []
+
+    async def handler(job):
+        running.append(job)
+        peak.append(len(running))
+        await asyncio.sleep(0.02)
+        running.remove(job)
+
+    asyncio.run(run_tasks(range(10), handler, concurrency=3))
+    assert max(peak) == 3
+
+def test_timeout_cancels_only_the_slow_task():
+    cancelled = []
+
+    async def handler(job):
+        try:
+            await asyncio.sleep(10 if job == "slow" else 0.01)
+        except asyncio.CancelledError:
+            cancelled.append(job)
+            raise
+        return job
+
+    started = time.monotonic()
+    results = asyncio.run(run_tasks(["fast", "slow", "other"], handler, concurrency=3, timeout=0.2))
+    assert time.monotonic() - started < 2
+    assert cancelled == ["slow"]
+    assert results[0] == ("fast", "fast", None)
+    assert results[2] == ("other", "other", None)
+    assert results[1][1] is None and isinstance(results[1][2], TimeoutError)
+
+def test_outer_cancel_cancels_running_tasks():
+    cancelled = []
+
+    async def handler(job):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(job)
+            raise
+
+    async def run():
+        task = asyncio.create_task(run_tasks(range(3), handler, concurrency=3))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert sorted(cancelled) == [0, 1, 2]
+
+class FunctionPage:
+    """记录 wait_for_function 的调用，stuck 中的脚本等待超时"""
+
+    def __init__(self, stuck=()):
+        self.stuck = set(stuck)
+        self.scripts = []
+
+    async def wait_for_function(self, script, arg=None, polling=None, timeout=None):
+        self.scripts.append(script)
+        if script in self.stuck:
+            raise TimeoutError(f"Timeout {timeout}ms exceeded")
+
+def test_stuck_pagination_skips_textarea_wait():
+    page = FunctionPage(stuck={PAGINATION_CHANGED_SCRIPT})
+    assert asyncio.run(AsyncPageWaiter(page).wait_for_pagination_change("marker")) is False
+    assert page.scripts == [PAGINATION_CHANGED_SCRIPT]
+    page = FunctionPage()
+    assert asyncio.run(AsyncPageWaiter(page).wait_for_pagination_change("marker")) is True
+    assert len(page.scripts) == 2
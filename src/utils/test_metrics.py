@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+指标模块测试
+
+用法:
+    python -m pytest src/utils/test_metrics.py
+"""
+
+import json
+import threading
+import pytest
+from src.utils.metrics import Metrics
+
+def test_nested_spans_build_paths():
+    metrics = Metrics()
+    with metrics.span("fetch"):
+        for _ in range(3):
+            with metrics.span("page"):
+                pass
+        metrics.observe("wait", 0.5)
+    assert sorted(metrics.stages) == ["fetch", "fetch;page", "fetch;wait"]
+    assert metrics.stages["fetch;page"][0] == 3
+    assert metrics.stages["fetch;wait"] == [1, 0.5, 0.5]
+
+def test_worker_thread_spans_hang_under_main_span():
+    metrics = Metrics()
+
+    def worker():
+        with metrics.span("save"):
+            with metrics.span("post"):
+                pass
+
+    with metrics.span("submit"):
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert metrics.stages["submit;save"][0] == 4
+    assert metrics.stages["submit;save;post"][0] == 4
+
+def test_timed_and_counters():
+    metrics = Metrics()
+
+    @metrics.timed("login")
+    def login(result):
+        return result
+
+    assert login(True) is True
+    metrics.count("saves", status="ok")
+    metrics.count("saves", 2, status="ok")
+    metrics.count("saves", status="error")
+    assert metrics.stages["login"][0] == 1
+    assert metrics.counters == {("saves", (("status", "ok"),)): 3, ("saves", (("status", "error"),)): 1}
+
+def test_trace_file_records_spans_errors_and_counters(tmp_path):
+    metrics = Metrics()
+    metrics.configure(str(tmp_path / "traces/run.jsonl"))
+    with pytest.raises(ValueError):
+        with metrics.span("harvest", page=3):
+            raise ValueError("boom")
+    metrics.count("retries", engine="http")
+    metrics.close()
+    records = [json.loads(line) for line in (tmp_path / "traces/run.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert records[0]["name"] == "harvest"
+    assert records[0]["attrs"] == {"page": 3}
+    assert records[0]["error"] == "ValueError"
+    assert records[1] == {"type": "counter", "name": "retries", "value": 1, "labels": {"engine": "http"}}
+    # 关闭后不再写文件
+    with metrics.span("after"):
+        pass
+    assert len((tmp_path / "traces/run.jsonl").read_text(encoding="utf-8").splitlines()) == 2
+
+def test_prometheus_text_escapes_labels(tmp_path):
+    metrics = Metrics()
+    metrics.observe('say "hi"', 1.25)
+    metrics.count("saves", status="ok")
+    text = metrics.prometheus_text()
+    assert 'bga_stage_seconds_total{stage="say \\"hi\\""} 1.250000' in text
+    assert 'bga_stage_calls_total{stage="say \\"hi\\""} 1' in text
+    assert 'bga_saves_total{status="ok"} 1' in text
+    path = metrics.write_prometheus(str(tmp_path / "metrics.prom"))
+    assert path.read_text(encoding="utf-8") == text
+    assert not (tmp_path / "metrics.prom.tmp").exists()
+
+def test_summary_orders_children_by_total():
+    metrics = Metrics()
+    metrics.started -= 10
+    with metrics.span("run"):
+        metrics.observe("fast", 1)
+        metrics.observe("slow", 5)
+    metrics.count("saves")
+    lines = metrics.summary(min_share=0).splitlines()
+    labels = [line.split()[0] for line in lines[2:5]]
+    assert labels == ["run", "slow", "fast"]
+    assert lines[-1] == "  saves = 1"
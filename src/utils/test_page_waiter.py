@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+页面等待测试，用最小的假页面代替 Playwright 页面
+
+用法:
+    python -m pytest src/utils/test_page_waiter.py
+"""
+
+from contextlib import contextmanager
+from types import SimpleNamespace
+import pytest
+from src.utils.page_waiter import PAGINATION_CHANGED_SCRIPT, SAVE_URL_PATTERN, PageWaiter
+
+SAVE_URL = "https://boardgamearena.com/translation/translation/savetranslation.html"
+
+class FakePage:
+    """每次等待依次取出一个响应：逐条模式为响应 URL，批量模式为收到的响应条数；None 或取完表示超时"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.expected = 0
+        self.fixed_waits = []
+
+    @contextmanager
+    def expect_response(self, predicate, timeout):
+        self.expected += 1
+        info = SimpleNamespace()
+        yield info
+        url = self.responses.pop(0) if self.responses else None
+        response = SimpleNamespace(url=url, ok=True)
+        if url is None or not predicate(response):
+            raise TimeoutError(f"Timeout {timeout}ms exceeded")
+        info.value = response
+
+    def wait_for_timeout(self, ms):
+        self.fixed_waits.append(ms)
+
+    def wait_for_event(self, event, timeout):
+        # 批量模式的响应由 SaveTracker 统计，这里直接把剩余的响应交给它
+        self.expected += 1
+        if not self.responses:
+            raise TimeoutError(f"Timeout {timeout}ms exceeded")
+        self.tracker.seen += self.responses.pop(0)
+
+class FunctionPage:
+    """记录 wait_for_function 的调用，stuck 中的脚本等待超时"""
+
+    def __init__(self, stuck=()):
+        self.stuck = set(stuck)
+        self.scripts = []
+
+    def wait_for_function(self, script, arg=None, polling=None, timeout=None):
+        self.scripts.append(script)
+        if script in self.stuck:
+            raise TimeoutError(f"Timeout {timeout}ms exceeded")
+
+def make_tracker(page):
+    page.tracker = SimpleNamespace(seen=0, url_pattern=SAVE_URL_PATTERN)
+    return page.tracker
+
+def save(waiter):
+    with waiter.expect_save() as outcome:
+        pass
+    return outcome["confirmed"]
+
+def test_confirmed_save():
+    waiter = PageWaiter(FakePage([SAVE_URL]))
+    assert save(waiter) is True
+    assert not waiter.save_pattern_missed
+
+def test_falls_back_after_first_miss():
+    page = FakePage([None, SAVE_URL])
+    waiter = PageWaiter(page, save_fallback_ms=200)
+    assert save(waiter) is False
+    assert waiter.save_pattern_missed
+    # 之后不再等待保存响应，只固定等待一小段时间
+    assert [save(waiter) for _ in range(3)] == [False] * 3
+    assert page.expected == 1
+    assert page.fixed_waits == [200] * 3
+
+def test_timeout_after_a_matching_save_is_just_slow():
+    page = FakePage([SAVE_URL, None, SAVE_URL])
+    waiter = PageWaiter(page)
+    assert [save(waiter) for _ in range(3)] == [True, False, True]
+    assert not waiter.save_pattern_missed
+    assert page.fixed_waits == []
+
+def test_errors_inside_the_block_propagate():
+    waiter = PageWaiter(FakePage([SAVE_URL]))
+    with pytest.raises(ValueError):
+        with waiter.expect_save():
+            raise ValueError("fill failed")
+    assert not waiter.save_pattern_missed
+
+def test_batch_wait_falls_back_when_nothing_ever_matched():
+    page = FakePage([])
+    tracker = make_tracker(page)
+    waiter = PageWaiter(page, save_fallback_ms=200)
+    assert waiter.wait_for_saves(tracker, 20) is False
+    assert waiter.save_pattern_missed
+    assert waiter.wait_for_saves(tracker, 40) is False
+    assert page.expected == 1
+    assert page.fixed_waits == [200]
+
+def test_batch_wait_partial_responses_keep_waiting_next_time():
+    page = FakePage([15])
+    tracker = make_tracker(page)
+    waiter = PageWaiter(page)
+    assert waiter.wait_for_saves(tracker, 20) is False
+    assert not waiter.save_pattern_missed
+    page.responses = [5, 20]
+    assert waiter.wait_for_saves(tracker, 40) is True
+    assert page.fixed_waits == []
+
+def test_stuck_pagination_skips_textarea_wait():
+    page = FunctionPage(stuck={PAGINATION_CHANGED_SCRIPT})
+    assert PageWaiter(page).wait_for_pagination_change("marker") is False
+    assert page.scripts == [PAGINATION_CHANGED_SCRIPT]
+
+def test_pagination_change_waits_for_textareas():
+    page = FunctionPage()
+    assert PageWaiter(page).wait_for_pagination_change("marker") is True
+    assert len(page.scripts) == 2 and page.scripts[0] == PAGINATION_CHANGED_SCRIPT
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+速率限制测试
+
+用法:
+    python -m pytest src/utils/test_rate_limiter.py
+"""
+
+import asyncio
+import threading
+import time
+import pytest
+import requests
+from src.utils import rate_limiter
+from src.utils.rate_limiter import AsyncTokenBucket, TokenBucket, throttle_session
+from src.utils.fake_bga_server import FakeBGAServer, make_strings
+
+class FakeClock:
+    """代替 time 模块，sleep 只推进时间"""
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    return clock
+
+def test_invalid_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+def test_burst_then_steady_rate(clock):
+    bucket = TokenBucket(2, capacity=3)
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert clock.now == pytest.approx(101.0)
+
+def test_refill_is_capped_by_capacity(clock):
+    bucket = TokenBucket(1)
+    bucket.acquire()
+    clock.now += 60
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == pytest.approx(1.0)
+
+def test_pause_for_blocks_then_resumes(clock):
+    bucket = TokenBucket(4)
+    bucket.pause_for(5)
+    # 暂停期间不发放令牌，暂停结束后令牌从零开始补充
+    assert bucket.acquire() == pytest.approx(5.25)
+    # 较短的暂停不会缩短已有的暂停
+    bucket.pause_for(3)
+    bucket.pause_for(1)
+    assert bucket.acquire() == pytest.approx(3.25)
+
+def test_threads_share_rate():
+    bucket = TokenBucket(50, capacity=1)
+    times = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(5):
+            bucket.acquire()
+            with lock:
+                times.append(time.monotonic())
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # 20 个令牌中第一个立即发放，其余按每秒 50 个补充
+    assert max(times) - min(times) >= 19 / 50 * 0.9
+
+def test_throttle_session_tags_session():
+    bucket = TokenBucket(1000)
+    acquired = []
+    original = bucket.acquire
+    bucket.acquire = lambda tokens=1.0: (acquired.append(tokens), original(tokens))[1]
+    session = requests.Session()
+    throttle_session(session, bucket)
+    assert session.rate_limiter is bucket
+    with FakeBGAServer(make_strings(1)) as server:
+        session.get(server.url, timeout=5)
+        session.get(server.url, timeout=5)
+    assert len(acquired) == 2
+
+def test_async_bucket_shares_rate_between_tasks():
+    async def run():
+        bucket = AsyncTokenBucket(50, capacity=1)
+        times = []
+
+        async def worker():
+            for _ in range(5):
+                await bucket.acquire()
+                times.append(time.monotonic())
+
+        await asyncio.gather(*(worker() for _ in range(4)))
+        return times
+
+    times = asyncio.run(run())
+    assert len(times) == 20
+    assert max(times) - min(times) >= 19 / 50 * 0.9
+
+def test_async_pause_for_delays_waiting_tasks():
+    async def run():
+        bucket = AsyncTokenBucket(100)
+        await bucket.acquire()
+        bucket.pause_for(0.2)
+        started = time.monotonic()
+        waited = await asyncio.gather(bucket.acquire(), bucket.acquire())
+        return time.monotonic() - started, waited
+
+    elapsed, waited = asyncio.run(run())
+    assert elapsed >= 0.2
+    assert all(seconds >= 0.2 for seconds in waited)
+
+def test_async_acquire_can_be_cancelled():
+    async def run():
+        bucket = AsyncTokenBucket(2, capacity=1)
+        await bucket.acquire()
+        task = asyncio.create_task(bucket.acquire())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # 被取消的任务释放了锁且没有消耗令牌，下一个任务只需等到令牌补满
+        return await asyncio.wait_for(bucket.acquire(), 1)
+
+    assert 0.3 < asyncio.run(run()) < 0.6
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+会话缓存测试
+
+用法:
+    python -m pytest src/utils/test_session_store.py
+"""
+
+import os
+import stat
+import time
+import requests
+from src.utils import session_store
+from src.utils.session_store import SessionStore
+
+COOKIES = [{"name": "PHPSESSID", "value": "abc", "domain": ".boardgamearena.com", "path": "/",
+            "expires": None, "secure": True}]
+
+def make_store(tmp_path, secret="tester:secret", **kwargs):
+    return SessionStore(secret, path=str(tmp_path / "session/bga_session.bin"), **kwargs)
+
+def test_round_trip_is_encrypted(tmp_path):
+    store = make_store(tmp_path)
+    store.save(COOKIES, "token-123")
+    raw = store.path.read_bytes()
+    assert b"token-123" not in raw and b"PHPSESSID" not in raw
+    data = make_store(tmp_path).load()
+    assert data["cookies"] == COOKIES
+    assert data["request_token"] == "token-123"
+    assert not store.path.with_suffix(".tmp").exists()
+
+def test_saved_file_is_private(tmp_path):
+    store = make_store(tmp_path)
+    store.save(COOKIES, "token")
+    assert stat.S_IMODE(os.stat(store.path).st_mode) == 0o600
+
+def test_expired_session_is_ignored(tmp_path, monkeypatch):
+    store = make_store(tmp_path, ttl=60)
+    store.save(COOKIES, "token")
+    assert store.load() is not None
+    now = time.time()
+    monkeypatch.setattr(session_store.time, "time", lambda: now + 61)
+    assert store.load() is None
+
+def test_wrong_key_and_corrupt_file_return_none(tmp_path):
+    make_store(tmp_path).save(COOKIES, "token")
+    assert make_store(tmp_path, secret="other:secret").load() is None
+    store = make_store(tmp_path)
+    store.path.write_bytes(b"not a fernet token")
+    assert store.load() is None
+    store.clear()
+    assert not store.path.exists()
+    assert store.load() is None
+
+def test_cookie_conversions(tmp_path):
+    jar = requests.Session().cookies
+    SessionStore.apply_to_jar(jar, [{"name": "a", "value": "1", "domain": ".boardgamearena.com", "expires": -1}])
+    cookies = SessionStore.cookies_from_jar(jar)
+    assert cookies[0]["name"] == "a" and cookies[0]["expires"] is None
+    state = make_store(tmp_path).to_storage_state({"cookies": [{"name": "b", "value": "2"}]})
+    assert state["cookies"][0]["domain"] == ".boardgamearena.com"
+    assert state["cookies"][0]["expires"] == -1